@@ -0,0 +1,113 @@
+##########################################################################
+#Modul Archive Writer (zip per PNG + final_output.zip, paralel)          #
+##########################################################################
+import io
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from checkpoint import atomic_output
+
+# PNG sudah terkompresi, deflate ulang hampir tidak mengecilkan file
+COMPRESSION_STORE = "store"
+COMPRESSION_DEFLATE = "deflate"
+DEFAULT_COMPRESSION = COMPRESSION_STORE
+DEFAULT_DEFLATE_LEVEL = 6
+
+
+def zip_options(compression=DEFAULT_COMPRESSION, level=None):
+    """Mengembalikan (compression, compresslevel) untuk zipfile.ZipFile."""
+    if compression == COMPRESSION_STORE:
+        return zipfile.ZIP_STORED, None
+    if compression == COMPRESSION_DEFLATE:
+        return zipfile.ZIP_DEFLATED, DEFAULT_DEFLATE_LEVEL if level is None else level
+    raise ValueError(f"Kompresi '{compression}' tidak dikenal, gunakan 'store' atau 'deflate'.")
+
+
+def inner_zip_bytes(member_name, data, compression=DEFAULT_COMPRESSION, level=None):
+    """Membuat zip berisi satu file di memori dan mengembalikan bytes-nya."""
+    method, compresslevel = zip_options(compression, level)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', method, compresslevel=compresslevel) as zipf:
+        zipf.writestr(member_name, data)
+    return buffer.getvalue()
+
+
+def _build_inner(png_path, compression, level):
+    start = time.perf_counter()
+    with open(png_path, 'rb') as f:
+        data = f.read()
+    read_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    member_name = os.path.basename(png_path)
+    inner = inner_zip_bytes(member_name, data, compression, level)
+    build_time = time.perf_counter() - start
+    return f"{os.path.splitext(member_name)[0]}.zip", inner, len(data), read_time, build_time
+
+
+def write_final_archive(png_paths, final_zip_path, compression=DEFAULT_COMPRESSION, level=None,
+                        workers=None, max_pending=None):
+    """
+    Membuat zip per PNG secara paralel dan langsung menuliskannya ke final_zip_path
+    (tanpa folder 'final' perantara). Urutan member mengikuti urutan png_paths.
+
+    :param workers: Jumlah thread (zlib melepas GIL saat kompresi), default jumlah CPU.
+    :param max_pending: Batas zip dalam antrian memori, default workers * 4.
+    :return: dict statistik byte dan waktu per tahap.
+    """
+    workers = workers or max(1, os.cpu_count() or 1)
+    max_pending = max_pending or workers * 4
+    method, compresslevel = zip_options(compression, level)
+
+    stats = {
+        "files": 0,
+        "bytes_read": 0,
+        "inner_bytes": 0,
+        "bytes_written": 0,
+        "read_seconds": 0.0,
+        "build_seconds": 0.0,
+        "write_seconds": 0.0,
+        "total_seconds": 0.0,
+    }
+    start_total = time.perf_counter()
+
+    def write_result(final_zip, result):
+        inner_name, inner, source_size, read_time, build_time = result
+        start = time.perf_counter()
+        final_zip.writestr(inner_name, inner)
+        stats["write_seconds"] += time.perf_counter() - start
+        stats["files"] += 1
+        stats["bytes_read"] += source_size
+        stats["inner_bytes"] += len(inner)
+        stats["read_seconds"] += read_time
+        stats["build_seconds"] += build_time
+
+    # Ditulis ke file sementara lalu os.replace: final_zip_path tidak pernah setengah jadi
+    with atomic_output(final_zip_path) as tmp_path, \
+            zipfile.ZipFile(tmp_path, 'w', method, compresslevel=compresslevel) as final_zip, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for png_path in png_paths:
+            pending.append(executor.submit(_build_inner, png_path, compression, level))
+            # Tulis yang paling awal dulu agar urutan tetap dan memori terbatas
+            if len(pending) >= max_pending:
+                write_result(final_zip, pending.popleft().result())
+        while pending:
+            write_result(final_zip, pending.popleft().result())
+
+    stats["bytes_written"] = os.path.getsize(final_zip_path)
+    stats["total_seconds"] = time.perf_counter() - start_total
+    return stats
+
+
+def format_stats(stats):
+    mb = 1024 * 1024
+    return (
+        f"{stats['files']} file | baca {stats['bytes_read'] / mb:.1f} MB ({stats['read_seconds']:.2f}s) | "
+        f"zip per file {stats['inner_bytes'] / mb:.1f} MB ({stats['build_seconds']:.2f}s) | "
+        f"tulis {stats['bytes_written'] / mb:.1f} MB ({stats['write_seconds']:.2f}s) | "
+        f"total {stats['total_seconds']:.2f}s"
+    )
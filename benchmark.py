@@ -0,0 +1,860 @@
+##########################################################################
+#Benchmark                                                               #
+##########################################################################
+# Contoh pemakaian:
+#   python benchmark.py menu3
+#   python benchmark.py menu3 --rows 10000 100000
+#   python benchmark.py tlv
+#   python benchmark.py blank --images unzipped_files
+#   python benchmark.py decode --images 100
+#   python benchmark.py compose --images 100 --levels 1 6 9 --optimize
+#   python benchmark.py store --rows 100000
+#   python benchmark.py memory --rows 100000 400000 1000000 --chunk-rows 50000
+#   python benchmark.py startup --repeat 10
+#   python benchmark.py tarif --rows 100000
+#   python benchmark.py suite --images 100 1000 --output reports/bench.json
+#   python benchmark.py compare reports/bench_lama.json reports/bench_baru.json
+import io
+import os
+import sys
+import json
+import logging
+import shutil
+import argparse
+import platform
+import subprocess
+import zipfile
+import multiprocessing
+import random
+import tempfile
+import time
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+import main
+import decoder
+import composer as composer_module
+from blanking import BlankingEngine
+from composer import TemplateComposer, encode_png
+from qr_render import render_qr
+from crc16 import crc16_hex
+from result_store import ResultStore, available_formats
+from checkpoint import CheckpointJournal
+from tarif import TarifClassifier
+from fixtures import generate_fixtures, merchant_payload
+from metrics import METRICS
+
+# Contoh payload QRIS statis (tanpa tarif), sama dengan isi listQr.xlsx
+SAMPLE_QR = (
+    "00020101021126690021ID.CO.BANKMANDIRI.WWW01189360000801715058110211717150581170303URE"
+    "51440014ID.CO.QRIS.WWW0215ID20253684458000303URE5204939953033605802ID5923KEMENHUB SBY "
+    "REGULER 016015JAKARTA SELATAN61051285062070703A01630455B1"
+)
+SAMPLE_TARIF = [6200, 2000, 3900, 4000, 4500, 3700, 4600]
+
+
+def make_qr_frame(rows, seed=0):
+    """Membuat DataFrame qrstring + tarif sintetis dengan NMID yang berbeda per baris."""
+    rng = random.Random(seed)
+    prefix, suffix = SAMPLE_QR[:113], SAMPLE_QR[126:-4]  # 13 digit NMID pada tag 51
+    qrstrings = []
+    for _ in range(rows):
+        payload = f"{prefix}{rng.randrange(10 ** 13):013d}{suffix}"
+        qrstrings.append(payload + crc16_hex(payload.encode("utf-8")))
+    return pd.DataFrame({
+        "qrstring": qrstrings,
+        "tarif": [rng.choice(SAMPLE_TARIF) for _ in range(rows)],
+    })
+
+
+def timed(func, *args, repeat=1):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+#############################################################################
+# Menu 3: edit_data_after_148th_char_tarif_and_crc
+def _legacy_edit_data_after_148th_char_tarif_and_crc(df, data_column, tarif_column):
+    # Implementasi lama (apply per baris + CRC bit per bit), sebagai pembanding
+    def calculate_crc(data, polynomial=0x1021, initial_value=0xFFFF):
+        crc = initial_value
+        for byte in data:
+            crc ^= (byte << 8)
+            for _ in range(8):
+                if crc & 0x8000:
+                    crc = (crc << 1) ^ polynomial
+                else:
+                    crc <<= 1
+                crc &= 0xFFFF
+        return f"{crc:04X}"
+
+    df[data_column] = df.apply(
+        lambda row: (
+            row[data_column][:10] + "12" + row[data_column][12:148] + "5404" + str(row[tarif_column]) + row[data_column][148:]
+        )[:-4] if len(row[data_column]) > 4 else row[data_column] + "5404" + str(row[tarif_column]),
+        axis=1
+    )
+    df[data_column] = df[data_column].astype(str).apply(
+        lambda x: x + calculate_crc(x.encode('utf-8'))
+    )
+
+
+def bench_menu3(rows_list):
+    print(f"{'rows':>10} {'lama (s)':>10} {'baru (s)':>10} {'speedup':>8}  sama")
+    for rows in rows_list:
+        base = make_qr_frame(rows)
+        legacy_df, new_df = base.copy(), base.copy()
+
+        legacy_time = timed(_legacy_edit_data_after_148th_char_tarif_and_crc, legacy_df, "qrstring", "tarif")
+        new_time = timed(main.edit_data_after_148th_char_tarif_and_crc, new_df, "qrstring", "tarif")
+        same = legacy_df["qrstring"].tolist() == new_df["qrstring"].tolist()
+
+        print(f"{rows:>10} {legacy_time:>10.3f} {new_time:>10.3f} {legacy_time / new_time:>7.1f}x  {same}")
+
+
+#############################################################################
+# Menu 4: parse TLV + modifikasi + encode
+def _legacy_parse_tlv(data):
+    parsed_data = []
+    index = 0
+    while index < len(data):
+        tag = data[index:index+2]
+        length = int(data[index+2:index+4])
+        value = data[index+4:index+4+length]
+        parsed_data.append({"tag": tag, "length": length, "value": value})
+        index += 4 + length
+    return parsed_data
+
+
+def _legacy_modify_qr_string(qr_string, row, modifications):
+    # Implementasi lama berbasis list of dict, CRC memakai engine yang sama agar adil
+    parsed = _legacy_parse_tlv(qr_string)
+    parsed_dict = {item["tag"]: item for item in parsed}
+
+    for mod in modifications:
+        if mod["action"] == "-":
+            parsed_dict.pop(mod["tag"], None)
+        elif mod["action"] == "+":
+            value = mod["value"]
+            if value.startswith("$"):
+                column_name = value[1:]
+                if column_name in row:
+                    value = str(row[column_name])
+                else:
+                    continue
+            parsed_dict[mod["tag"]] = {"tag": mod["tag"], "length": len(value), "value": value}
+
+    sorted_tags = sorted(parsed_dict.keys())
+    modified_qr = "".join(f"{parsed_dict[tag]['tag']}{parsed_dict[tag]['length']:02}{parsed_dict[tag]['value']}" for tag in sorted_tags)
+    return modified_qr[:-4] + main.calculate_crc2(modified_qr)
+
+
+def bench_tlv(rows_list):
+    modifications = [
+        {"action": "+", "tag": "54", "length": "", "value": "$tarif"},
+        {"action": "-", "tag": "62"},
+    ]
+    print(f"{'rows':>10} {'lama (s)':>10} {'baru (s)':>10} {'speedup':>8}  sama")
+    for rows in rows_list:
+        df = make_qr_frame(rows)
+        qr_strings = df["qrstring"].tolist()
+        records = df.to_dict("records")
+
+        start = time.perf_counter()
+        legacy = [_legacy_modify_qr_string(qr, row, modifications) for qr, row in zip(qr_strings, records)]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        plan = main.ModificationPlan.compile(modifications)
+        new = plan.apply_many(qr_strings, records)
+        new_time = time.perf_counter() - start
+
+        print(f"{rows:>10} {legacy_time:>10.3f} {new_time:>10.3f} {legacy_time / new_time:>7.1f}x  {legacy == new}")
+
+
+#############################################################################
+# Menu 2: overlay_images / process_images_hapusimages
+def _legacy_overlay_images(base_image_path, overlay_image_path, output_path, position):
+    # Implementasi lama: overlay dibuka + resize per gambar dan canvas RGBA tambahan
+    base_image = Image.open(base_image_path).convert("RGBA")
+    overlay_image = Image.open(overlay_image_path).convert("RGBA")
+
+    overlay_resized = overlay_image.resize((position['width'], position['height']))
+    position_tuple = (position['x'], position['y'])
+
+    combined = Image.new("RGBA", base_image.size)
+    combined.paste(base_image, (0, 0))
+    combined.paste(overlay_resized, position_tuple, mask=overlay_resized)
+
+    result = combined.convert("RGB")
+    if output_path is not None:
+        result.save(output_path)
+    return result
+
+
+def _peak_rss_mb():
+    # Linux: VmHWM per proses; ru_maxrss ikut mewarisi peak proses induk setelah fork + exec
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _run_blank_variant(variant, image_paths, overlay_image_path, position, output_folder, repeat):
+    # Dijalankan di proses baru agar peak RSS tiap varian terpisah
+    engine = BlankingEngine(overlay_image_path, position) if variant == "baru" else None
+
+    # Waktu blanking di memori saja (tanpa encode PNG)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for image_path in image_paths:
+            if engine is None:
+                _legacy_overlay_images(image_path, overlay_image_path, None, position)
+            else:
+                with Image.open(image_path) as base_image:
+                    engine.blank(base_image)
+    compose_time = time.perf_counter() - start
+
+    # Waktu total termasuk simpan PNG
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for image_path in image_paths:
+            output_path = os.path.join(output_folder, f"{variant}_{os.path.basename(image_path)}")
+            if engine is None:
+                _legacy_overlay_images(image_path, overlay_image_path, output_path, position)
+            else:
+                engine.blank_file(image_path, output_path)
+    total_time = time.perf_counter() - start
+    return compose_time, total_time, _peak_rss_mb()
+
+
+def bench_blank(image_folder, overlay_image_path, config_path, repeat):
+    position = main.load_config(config_path)['position']
+    image_paths = sorted(
+        os.path.join(image_folder, f) for f in os.listdir(image_folder) if f.lower().endswith(".png")
+    )
+    total = len(image_paths) * repeat
+    print(f"{len(image_paths)} gambar x {repeat} ulangan")
+    print(f"{'varian':>8} {'ms blank':>10} {'ms total':>10} {'peak RSS (MB)':>14}  sama")
+
+    with tempfile.TemporaryDirectory() as output_folder:
+        results = {}
+        for variant in ("lama", "baru"):
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                results[variant] = executor.submit(
+                    _run_blank_variant, variant, image_paths, overlay_image_path, position, output_folder, repeat
+                ).result()
+
+        same = all(
+            np.array_equal(
+                np.asarray(Image.open(os.path.join(output_folder, f"lama_{os.path.basename(p)}"))),
+                np.asarray(Image.open(os.path.join(output_folder, f"baru_{os.path.basename(p)}"))),
+            )
+            for p in image_paths
+        )
+        for variant, (compose_time, total_time, peak_rss) in results.items():
+            rss = "-" if peak_rss is None else f"{peak_rss:.1f}"
+            print(f"{variant:>8} {compose_time / total * 1000:>10.1f} {total_time / total * 1000:>10.1f} "
+                  f"{rss:>14}  {same}")
+
+
+#############################################################################
+# Decode: ROI + fallback lama vs semua strategi, pada fixture asli dan yang diturunkan kualitasnya
+def _degrade(gray, variant):
+    if variant == "asli":
+        return gray
+    if variant == "kontras rendah":
+        # Modul hitam/putih menjadi abu-abu 110/150
+        return (110 + (gray.astype(np.float32) / 255 * 40)).astype(np.uint8)
+    if variant == "blur":
+        return cv2.GaussianBlur(gray, (0, 0), 3)
+    if variant == "kecil":
+        # Scan resolusi rendah: gambar diperkecil lalu diperbesar kembali ke ukuran template
+        small = cv2.resize(gray, None, fx=0.22, fy=0.22, interpolation=cv2.INTER_AREA)
+        return cv2.resize(small, (gray.shape[1], gray.shape[0]), interpolation=cv2.INTER_LINEAR)
+    raise ValueError(variant)
+
+
+def bench_decode(count, fixtures_root, config_path, seed):
+    config = main.load_config(config_path)
+    roi = main.load_decode_roi(config)
+    fixture_folder = os.path.join(fixtures_root, f"n{count}_s{seed}")
+    manifest = generate_fixtures(fixture_folder, count, seed, config['position'])
+    images = []
+    for row in manifest:
+        with zipfile.ZipFile(os.path.join(fixture_folder, row["zip"])) as zip_ref:
+            data = zip_ref.read(row["member"])
+        images.append((cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE), row["payload"]))
+
+    ladders = {"roi+fallback": (decoder.STRATEGY_ROI, decoder.STRATEGY_FALLBACK),
+               "semua strategi": decoder.DEFAULT_STRATEGIES}
+    print(f"{count} fixture per varian")
+    print(f"{'varian':>15} {'strategi':>15} {'terbaca':>8} {'ms/img':>8} {'ms/hit':>8} {'ms/miss':>8}  per strategi")
+    for variant in ("asli", "kontras rendah", "blur", "kecil"):
+        degraded = [(_degrade(gray, variant), payload) for gray, payload in images]
+        for name, strategies in ladders.items():
+            hit_time = miss_time = 0.0
+            hits = 0
+            used = []
+            for gray, payload in degraded:
+                start = time.perf_counter()
+                qr_string, strategy = decoder.decode_image_array(gray, roi, strategies)
+                seconds = time.perf_counter() - start
+                if qr_string == payload:
+                    hits += 1
+                    hit_time += seconds
+                else:
+                    miss_time += seconds
+                used.append(strategy)
+            misses = count - hits
+            print(f"{variant:>15} {name:>15} {hits:>4}/{count:<3} {(hit_time + miss_time) / count * 1000:>8.1f} "
+                  f"{hit_time / hits * 1000 if hits else 0:>8.1f} {miss_time / misses * 1000 if misses else 0:>8.1f}  "
+                  f"{decoder.summarize_strategies(used)}")
+
+
+#############################################################################
+# Compose: menu 2 + menu 5 (dua kali encode) vs TemplateComposer (satu kali encode)
+def _timed_encode(image, options):
+    start = time.perf_counter()
+    data = encode_png(image, options)
+    return data, time.perf_counter() - start
+
+
+def bench_compose(count, fixtures_root, overlay_image_path, config_path, modes, levels, optimize, seed):
+    config = main.load_config(config_path)
+    position = config['position']
+    manifest = generate_fixtures(os.path.join(fixtures_root, f"n{count}_s{seed}"), count, seed, position)
+    templates = []
+    for row in manifest:
+        with zipfile.ZipFile(os.path.join(fixtures_root, f"n{count}_s{seed}", row["zip"])) as zip_ref:
+            templates.append((zip_ref.read(row["member"]), main.edit_qr_string_tarif_and_crc(row["payload"], row["tarif"])))
+
+    engine = BlankingEngine(overlay_image_path, position)
+    default_options = composer_module.DEFAULT_ENCODE_OPTIONS
+    variants = [composer_module.EncodeOptions(mode, level, opt)
+                for mode in modes for level in levels for opt in ([False, True] if optimize else [False])]
+
+    # Menu 2 + menu 5 lama: decode, blank, encode, decode lagi, tempel QR, encode lagi
+    legacy = {"decode": 0.0, "compose": 0.0, "encode": 0.0, "bytes": 0}
+    legacy_outputs = []
+    for data, payload in templates:
+        start = time.perf_counter()
+        with Image.open(io.BytesIO(data)) as template:
+            template.load()
+        legacy["decode"] += time.perf_counter() - start
+        start = time.perf_counter()
+        blank = engine.blank(template)
+        legacy["compose"] += time.perf_counter() - start
+        blank_png, seconds = _timed_encode(blank, default_options)
+        legacy["encode"] += seconds
+
+        start = time.perf_counter()
+        with Image.open(io.BytesIO(blank_png)) as blank_image:
+            attached = blank_image.convert("RGBA")
+        legacy["decode"] += time.perf_counter() - start
+        start = time.perf_counter()
+        attached.paste(render_qr(payload, position['width'], position['height']), (position['x'], position['y']))
+        legacy["compose"] += time.perf_counter() - start
+        output, seconds = _timed_encode(attached, default_options)
+        legacy["encode"] += seconds
+        legacy["bytes"] += len(output)
+        legacy_outputs.append(output)
+
+    print(f"{count} gambar fixture, waktu per gambar (ms)")
+    print(f"{'varian':>22} {'decode':>8} {'compose':>8} {'encode':>8} {'total':>8} {'KB/img':>8} "
+          f"{'hemat encode':>13}  sama")
+    per_image = lambda value: value / count * 1000
+    legacy_total = legacy["decode"] + legacy["compose"] + legacy["encode"]
+    print(f"{'menu 2 + menu 5':>22} {per_image(legacy['decode']):>8.1f} {per_image(legacy['compose']):>8.1f} "
+          f"{per_image(legacy['encode']):>8.1f} {per_image(legacy_total):>8.1f} "
+          f"{legacy['bytes'] / count / 1024:>8.1f} {'-':>13}  -")
+
+    for options in variants:
+        composer = TemplateComposer(engine, position, options)
+        stats = {"decode": 0.0, "compose": 0.0, "encode": 0.0, "bytes": 0}
+        same = True
+        for (data, payload), legacy_output in zip(templates, legacy_outputs):
+            start = time.perf_counter()
+            with Image.open(io.BytesIO(data)) as template:
+                template.load()
+            stats["decode"] += time.perf_counter() - start
+            start = time.perf_counter()
+            image = composer.compose(template, payload)
+            stats["compose"] += time.perf_counter() - start
+            output, seconds = _timed_encode(image, options)
+            stats["encode"] += seconds
+            stats["bytes"] += len(output)
+            if options.mode == composer_module.MODE_RGBA:
+                same = same and np.array_equal(np.asarray(Image.open(io.BytesIO(output))),
+                                               np.asarray(Image.open(io.BytesIO(legacy_output))))
+        total = stats["decode"] + stats["compose"] + stats["encode"]
+        name = f"{options.mode} level {options.compress_level}{' opt' if options.optimize else ''}"
+        saved = per_image(legacy["encode"] - stats["encode"])
+        print(f"{name:>22} {per_image(stats['decode']):>8.1f} {per_image(stats['compose']):>8.1f} "
+              f"{per_image(stats['encode']):>8.1f} {per_image(total):>8.1f} {stats['bytes'] / count / 1024:>8.1f} "
+              f"{saved:>10.1f} ms  {same if options.mode == composer_module.MODE_RGBA else '-'}")
+
+
+#############################################################################
+# Result store: listQr.xlsx vs Parquet/Feather/CSV
+def bench_store(rows_list, formats, include_excel):
+    print(f"{'rows':>10} {'format':>8} {'save (s)':>10} {'load (s)':>10} {'+kolom (s)':>11} "
+          f"{'load 1 kolom (s)':>17} {'MB':>8}  sama")
+    for rows in rows_list:
+        df = make_qr_frame(rows)
+        df.insert(0, "filename", [f"ID{i:013d}_A01.png" for i in range(rows)])
+        modified = df["qrstring"].str.slice(0, -4) + "ABCD"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            if include_excel:
+                # Cara lama: seluruh workbook ditulis ulang hanya untuk menambah modifiedQr
+                path = os.path.join(tmp, "listQr.xlsx")
+                save_time = timed(lambda: df.to_excel(path, index=False))
+                load_time = timed(lambda: pd.read_excel(path))
+                full = pd.read_excel(path)
+                full["modifiedQr"] = modified
+                add_time = timed(lambda: full.to_excel(path, index=False))
+                one_time = timed(lambda: pd.read_excel(path, usecols=["modifiedQr"]))
+                same = pd.read_excel(path)["modifiedQr"].tolist() == modified.tolist()
+                print(f"{rows:>10} {'xlsx':>8} {save_time:>10.3f} {load_time:>10.3f} {add_time:>11.3f} "
+                      f"{one_time:>17.3f} {os.path.getsize(path) / 2 ** 20:>8.1f}  {same}")
+
+            for fmt in formats:
+                store = ResultStore(os.path.join(tmp, fmt), fmt)
+                save_time = timed(store.save, df)
+                load_time = timed(store.load)
+                add_time = timed(store.add_columns, {"modifiedQr": modified})
+                one_time = timed(store.load, ["modifiedQr"])
+                loaded = store.load()
+                same = (loaded["qrstring"].tolist() == df["qrstring"].tolist()
+                        and loaded["modifiedQr"].tolist() == modified.tolist())
+                size = sum(os.path.getsize(os.path.join(store.root, f)) for f in os.listdir(store.root))
+                print(f"{rows:>10} {fmt:>8} {save_time:>10.3f} {load_time:>10.3f} {add_time:>11.3f} "
+                      f"{one_time:>17.3f} {size / 2 ** 20:>8.1f}  {same}")
+
+
+#############################################################################
+# Memori: menu 3/4/5 sekaligus vs per chunk_rows
+def _run_memory_variant(stage, store_root, work_folder, chunk_rows, rules_path):
+    # Dijalankan di proses baru (spawn) agar peak RSS tiap varian terpisah
+    logging.disable(logging.WARNING)
+    baseline = _peak_rss_mb()
+    # Checkpoint aktif (default config.json) dengan journal milik varian ini
+    config = {"chunk_rows": chunk_rows, "report_dir": work_folder, "checkpoint": True,
+              "checkpoint_journal": os.path.join(work_folder, "checkpoint.db"),
+              "position": {"x": 0, "y": 0, "width": 10, "height": 10}}
+    store = ResultStore(store_root)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        if stage == "menu3":
+            main.edit_tarif_store(store, ResultStore(os.path.join(work_folder, "output_crc")), config)
+        elif stage == "menu4":
+            main.modify_store(store, main.load_modification_plan(rules_path), config, workers=1)
+        else:
+            # Folder gambar kosong: semua baris lewat scheduler sebagai not_found, yang diukur
+            # adalah memori daftar WorkItem dan antrian, bukan decode/encode gambar
+            images = os.path.join(work_folder, "images")
+            os.makedirs(images, exist_ok=True)
+            main.process_images(store, images, os.path.join(work_folder, "output"), config)
+    return time.perf_counter() - start, baseline, _peak_rss_mb()
+
+
+def _fill_journal(db_path, stage, output_folder, filenames):
+    """Journal berisi satu baris per output (seperti run menu 5 sebelumnya), agar pending() diukur."""
+    with CheckpointJournal(stage, "", db_path) as journal, journal.conn:
+        journal.conn.executemany(
+            "INSERT INTO outputs VALUES (?, ?, ?, 0, 0, '', '', 0, 0)",
+            ((stage, os.path.abspath(os.path.join(output_folder, filename)), filename) for filename in filenames))
+
+
+def bench_memory(rows_list, chunk_rows, stages, rules_path, fmt):
+    print(f"{'rows':>10} {'stage':>6} {'varian':>14} {'detik':>8} {'peak RSS (MB)':>14} {'+RSS (MB)':>10}")
+    context = multiprocessing.get_context("spawn")
+    for rows in rows_list:
+        with tempfile.TemporaryDirectory() as tmp:
+            df = make_qr_frame(rows)
+            df.insert(0, "filename", [f"ID{i:013d}_A01.png" for i in range(rows)])
+            store_root = os.path.join(tmp, "listQr")
+            ResultStore(store_root, fmt).save(df)
+            del df
+            for stage in stages:
+                store = ResultStore(store_root)
+                if stage == "menu5" and "modifiedQr" not in store.columns:
+                    # Menu 5 butuh kolom modifiedQr hasil menu 4, diisi di proses induk
+                    store.add_columns({"modifiedQr": store.load(["qrstring"])["qrstring"]})
+                for variant, chunk in (("sekaligus", 0), (f"chunk {chunk_rows}", chunk_rows)):
+                    work_folder = os.path.join(tmp, f"{stage}_{chunk}")
+                    os.makedirs(work_folder)
+                    if stage == "menu5":
+                        _fill_journal(os.path.join(work_folder, "checkpoint.db"), "attach_qr",
+                                      os.path.join(work_folder, "output"), store.load(["filename"])["filename"])
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        elapsed, baseline, peak = executor.submit(
+                            _run_memory_variant, stage, store_root, work_folder, chunk, rules_path
+                        ).result()
+                    if peak is None:
+                        print(f"{rows:>10} {stage:>6} {variant:>14} {elapsed:>8.2f} {'-':>14} {'-':>10}")
+                    else:
+                        print(f"{rows:>10} {stage:>6} {variant:>14} {elapsed:>8.2f} {peak:>14.1f} "
+                              f"{peak - baseline:>10.1f}")
+
+
+#############################################################################
+# Startup: python main.py --help / subcommand ringan tanpa dependency berat
+HEAVY_MODULES = ("pandas", "numpy", "cv2", "PIL", "qrcode", "pyzbar", "pyarrow")
+
+
+def _startup_commands():
+    return [
+        ("python -c pass", ["-c", "pass"]),
+        ("import main", ["-c", "import main"]),
+        ("main.py --help", ["main.py", "--help"]),
+        ("main.py zip --help", ["main.py", "zip", "--help"]),
+        ("main.py readme", ["main.py", "readme"]),
+        ("main.py parse", ["main.py", "parse", SAMPLE_QR]),
+        ("import semua dependency", ["-c", "import pandas, numpy, cv2, PIL.Image, qrcode, pyzbar.pyzbar"]),
+    ]
+
+
+def _imported_heavy(args, cwd):
+    # -X importtime menulis setiap modul yang di-import ke stderr
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True, cwd=cwd)
+    names = {line.rsplit("|", 1)[-1].strip().split(".")[0]
+             for line in result.stderr.splitlines() if line.startswith("import time:")}
+    return [module for module in HEAVY_MODULES if module in names]
+
+
+def bench_startup(repeat):
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    print(f"{'perintah':>24} {'median (ms)':>12} {'min (ms)':>10}  dependency berat yang di-import")
+    for label, args in _startup_commands():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           cwd=cwd, check=True)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        heavy = _imported_heavy(args, cwd)
+        print(f"{label:>24} {samples[len(samples) // 2] * 1000:>12.0f} {samples[0] * 1000:>10.0f}  "
+              f"{', '.join(heavy) or '-'}")
+
+
+#############################################################################
+# Tarif: determine_tarif lama vs TarifClassifier
+def _legacy_determine_tarif(qr_string):
+    # Implementasi lama: dict dibuat ulang per panggilan + scan substring per key
+    if not qr_string:
+        return None
+    tarif_mapping = {
+        "SBY REGULER": 6200, "SBY KHUSUS": 2000, "BMS REGULER": 3900, "BMS KHUSUS": 2000,
+        "PLG REGULER": 4000, "PLG KHUSUS": 2000, "BPN REGULER": 4500, "BPN KHUSUS": 2000,
+        "SKT REGULER": 3700, "SKT KHUSUS": 2000, "MKS REGULER": 4600, "MKS KHUSUS": 2000,
+    }
+    for key, value in tarif_mapping.items():
+        if key in qr_string:
+            return value
+    return None
+
+
+def bench_tarif(rows_list):
+    classifier = TarifClassifier(main.TARIF_MAPPING)
+    keys = list(main.TARIF_MAPPING) + ["JKT REGULER"]  # satu merchant tanpa aturan
+    print(f"{'rows':>10} {'lama (s)':>10} {'baru (s)':>10} {'speedup':>8}  sama  tanpa tarif")
+    for rows in rows_list:
+        rng = random.Random(rows)
+        qr_strings = [merchant_payload(rng.choice(keys), f"{rng.randrange(10 ** 13):013d}") for _ in range(rows)]
+
+        start = time.perf_counter()
+        legacy = [_legacy_determine_tarif(qr_string) for qr_string in qr_strings]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = TarifClassifier(main.TARIF_MAPPING).classify_many(qr_strings)
+        new_time = time.perf_counter() - start
+
+        unmatched = len(classifier.unmatched(qr_strings, new))
+        print(f"{rows:>10} {legacy_time:>10.3f} {new_time:>10.3f} {legacy_time / new_time:>7.1f}x  {legacy == new}  {unmatched}")
+
+
+#############################################################################
+# Suite: fixture sintetis -> semua stage (terpisah) + end to end
+SUITE_STAGES = ["extract", "decode", "tarif", "crc_tarif", "modify", "blank", "attach", "zip"]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run_suite_once(fixture_folder, manifest, work_folder, config_path, config, overlay_image_path, rules_path, workers):
+    """Menjalankan setiap stage secara berurutan pada fixture, mengembalikan (waktu per stage, cek)."""
+    # Config salinan di work_folder tanpa checkpoint: path fixture tidak masuk ke
+    # cache/checkpoint.db proyek dan setiap run mengukur proses penuh
+    config = dict(config, checkpoint=False, checkpoint_journal=os.path.join(work_folder, "checkpoint.db"))
+    config_path = os.path.join(work_folder, "config.json")
+    with open(config_path, "w") as f:
+        json.dump(config, f, indent=2)
+    position = config['position']
+    roi = main.load_decode_roi(config)
+    plan = main.load_modification_plan(rules_path)
+    unzipped = os.path.join(work_folder, "unzipped_files")
+    blank_folder = os.path.join(work_folder, "qrBlank")
+    modified_folder = os.path.join(work_folder, "qrModifiedOutput")
+    os.makedirs(unzipped, exist_ok=True)
+    times = {}
+
+    # Menu 1: ekstrak + decode + tarif (sama seperti batch_unzip tanpa stream)
+    start = time.perf_counter()
+    for row in manifest:
+        with zipfile.ZipFile(os.path.join(fixture_folder, row["zip"]), 'r') as zip_ref:
+            zip_ref.extractall(unzipped)
+    times["extract"] = time.perf_counter() - start
+
+    image_paths = [os.path.join(unzipped, row["member"]) for row in manifest]
+    start = time.perf_counter()
+    decoded = main.decode_files(image_paths, workers=workers, roi=roi)
+    times["decode"] = time.perf_counter() - start
+    qr_strings = [qr_string for qr_string, _, _ in decoded]
+
+    start = time.perf_counter()
+    tarifs = main.get_tarif_classifier(config).classify_many(qr_strings)
+    times["tarif"] = time.perf_counter() - start
+
+    df = pd.DataFrame({"filename": [row["member"] for row in manifest], "qrstring": qr_strings, "tarif": tarifs})
+
+    # Menu 3 (sisip tarif + CRC) dan menu 4 (aturan config.txt)
+    crc_df = df.dropna().copy()
+    start = time.perf_counter()
+    main.edit_data_after_148th_char_tarif_and_crc(crc_df, "qrstring", "tarif")
+    times["crc_tarif"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df["modifiedQr"] = main.modify_qr_frame(df.dropna(), plan, workers=workers)
+    times["modify"] = time.perf_counter() - start
+
+    # Menu 2, 5, 6
+    start = time.perf_counter()
+    main.process_images_hapusimages(df, unzipped, overlay_image_path, blank_folder, config_path)
+    times["blank"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    main.process_images(df, blank_folder, modified_folder, config)
+    times["attach"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    main.batch_zip_files(modified_folder, os.path.join(work_folder, "final_output.zip"),
+                         config.get('zip_compression', main.DEFAULT_COMPRESSION), config.get('zip_level'), workers)
+    times["zip"] = time.perf_counter() - start
+    times["end_to_end"] = sum(times[stage] for stage in SUITE_STAGES)
+
+    # Pipeline satu jalan (pipeline.py) sebagai pembanding end to end
+    import pipeline
+    start = time.perf_counter()
+    pipeline.run_pipeline(fixture_folder, os.path.join(work_folder, "pipeline_output.zip"),
+                          os.path.join(work_folder, "pipeline_manifest.csv"), pipeline.MODE_CONFIG,
+                          config_path, rules_path, overlay_image_path,
+                          config.get('zip_compression', main.DEFAULT_COMPRESSION), config.get('zip_level'))
+    times["end_to_end_pipeline"] = time.perf_counter() - start
+
+    expected = {row["member"]: row for row in manifest}
+    checks = {
+        "decoded": sum(qr_string == expected[name]["payload"] for name, qr_string in zip(df["filename"], qr_strings)),
+        "tarif_ok": sum(tarif == expected[name]["tarif"] for name, tarif in zip(df["filename"], tarifs)),
+        "attached": len(os.listdir(modified_folder)) if os.path.isdir(modified_folder) else 0,
+    }
+    with zipfile.ZipFile(os.path.join(work_folder, "final_output.zip")) as final_zip:
+        checks["zipped"] = len(final_zip.namelist())
+    return times, checks
+
+
+def bench_suite(image_counts, fixtures_root, output_path, config_path, overlay_image_path, rules_path,
+                workers, seed, keep):
+    config = main.load_config(config_path)
+    report = {
+        "commit": _git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "workers": workers,
+        "seed": seed,
+        "runs": [],
+    }
+
+    print(f"{'images':>8} {'stage':>20} {'detik':>9} {'ms/img':>9} {'img/s':>9}")
+    for count in image_counts:
+        fixture_folder = os.path.join(fixtures_root, f"n{count}_s{seed}")
+        start = time.perf_counter()
+        manifest = generate_fixtures(fixture_folder, count, seed, config['position'], workers)
+        fixture_time = time.perf_counter() - start
+
+        work_folder = tempfile.mkdtemp(prefix=f"bench_{count}_", dir=fixtures_root)
+        METRICS.reset()
+        try:
+            times, checks = _run_suite_once(fixture_folder, manifest, work_folder, config_path, config,
+                                            overlay_image_path, rules_path, workers)
+        finally:
+            if not keep:
+                shutil.rmtree(work_folder, ignore_errors=True)
+
+        stages = {
+            stage: {"seconds": round(seconds, 4), "ms_per_image": round(seconds / count * 1000, 3),
+                    "images_per_second": round(count / seconds, 2) if seconds else None}
+            for stage, seconds in times.items()
+        }
+        report["runs"].append({"images": count, "fixture_seconds": round(fixture_time, 2), "stages": stages,
+                               "checks": checks, "metrics": METRICS.snapshot()})
+        for stage, values in stages.items():
+            print(f"{count:>8} {stage:>20} {values['seconds']:>9.3f} {values['ms_per_image']:>9.2f} "
+                  f"{values['images_per_second'] or 0:>9.1f}")
+        print(f"{count:>8} {'cek':>20} {checks}")
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil benchmark disimpan ke {output_path}")
+    return report
+
+
+def compare_reports(old_path, new_path):
+    """Membandingkan dua hasil suite (mis. dua commit) per jumlah gambar dan stage."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"lama: {old.get('commit')} ({old.get('created_at')})  baru: {new.get('commit')} ({new.get('created_at')})")
+    print(f"{'images':>8} {'stage':>20} {'lama (s)':>10} {'baru (s)':>10} {'rasio':>7}")
+    old_runs = {run["images"]: run for run in old["runs"]}
+    for run in new["runs"]:
+        previous = old_runs.get(run["images"])
+        if previous is None:
+            continue
+        for stage, values in run["stages"].items():
+            if stage not in previous["stages"]:
+                continue
+            old_seconds, new_seconds = previous["stages"][stage]["seconds"], values["seconds"]
+            ratio = new_seconds / old_seconds if old_seconds else float("nan")
+            flag = "  <-- lebih lambat" if ratio > 1.1 else ""
+            print(f"{run['images']:>8} {stage:>20} {old_seconds:>10.3f} {new_seconds:>10.3f} {ratio:>6.2f}x{flag}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark modifQrStatic")
+    subparsers = parser.add_subparsers(dest="name", required=True)
+
+    menu3 = subparsers.add_parser("menu3", help="edit_data_after_148th_char_tarif_and_crc lama vs baru")
+    menu3.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+
+    tlv = subparsers.add_parser("tlv", help="modify_qr_string lama vs ModificationPlan")
+    tlv.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+
+    blank = subparsers.add_parser("blank", help="overlay_images lama vs BlankingEngine")
+    blank.add_argument("--images", default="unzipped_files")
+    blank.add_argument("--overlay", default="overlay.png")
+    blank.add_argument("--config", default="config/config.json")
+    blank.add_argument("--repeat", type=int, default=3)
+
+    decode = subparsers.add_parser("decode", help="Strategi decode lama (ROI + fallback) vs semua strategi")
+    decode.add_argument("--images", type=int, default=24, help="Jumlah fixture PTEN sintetis")
+    decode.add_argument("--fixtures", default="bench_fixtures")
+    decode.add_argument("--config", default="config/config.json")
+    decode.add_argument("--seed", type=int, default=0)
+
+    compose = subparsers.add_parser("compose", help="Menu 2 + menu 5 (dua kali encode) vs TemplateComposer")
+    compose.add_argument("--images", type=int, default=24, help="Jumlah fixture PTEN sintetis")
+    compose.add_argument("--fixtures", default="bench_fixtures")
+    compose.add_argument("--overlay", default="overlay.png")
+    compose.add_argument("--config", default="config/config.json")
+    compose.add_argument("--modes", nargs="+", choices=list(composer_module.OUTPUT_MODES),
+                         default=list(composer_module.OUTPUT_MODES))
+    compose.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    compose.add_argument("--optimize", action="store_true", help="Tambah varian dengan optimize=True")
+    compose.add_argument("--seed", type=int, default=0)
+
+    store = subparsers.add_parser("store", help="listQr.xlsx vs ResultStore (Parquet/Feather/CSV)")
+    store.add_argument("--rows", type=int, nargs="+", default=[100000])
+    store.add_argument("--formats", nargs="+", choices=["parquet", "feather", "csv"], default=list(available_formats()))
+    store.add_argument("--skip-excel", action="store_true", help="Lewati Excel (lambat pada 100k baris)")
+
+    memory = subparsers.add_parser("memory", help="Peak RSS menu 3/4/5 sekaligus vs per chunk_rows")
+    memory.add_argument("--rows", type=int, nargs="+", default=[100000, 400000])
+    memory.add_argument("--chunk-rows", type=int, default=50000)
+    memory.add_argument("--stages", nargs="+", choices=["menu3", "menu4", "menu5"],
+                        default=["menu3", "menu4", "menu5"])
+    memory.add_argument("--rules", default="config/config.txt")
+    memory.add_argument("--format", choices=["parquet", "feather", "csv"], default=available_formats()[0])
+
+    startup = subparsers.add_parser("startup", help="Waktu start main.py --help / subcommand ringan")
+    startup.add_argument("--repeat", type=int, default=10)
+
+    tarif = subparsers.add_parser("tarif", help="determine_tarif lama vs TarifClassifier")
+    tarif.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+
+    suite = subparsers.add_parser("suite", help="Semua stage + end to end pada fixture PTEN sintetis (offline)")
+    suite.add_argument("--images", type=int, nargs="+", default=[100, 1000])
+    suite.add_argument("--fixtures", default="bench_fixtures", help="Folder fixture (dipakai ulang antar run)")
+    suite.add_argument("--output", default=None, help="File JSON hasil, default reports/bench_<commit>_<waktu>.json")
+    suite.add_argument("--config", default="config/config.json")
+    suite.add_argument("--overlay", default="overlay.png")
+    suite.add_argument("--rules", default="config/config.txt")
+    suite.add_argument("--workers", type=int, default=None)
+    suite.add_argument("--seed", type=int, default=0)
+    suite.add_argument("--keep", action="store_true", help="Simpan folder kerja (unzipped, qrBlank, ...)")
+
+    compare = subparsers.add_parser("compare", help="Bandingkan dua file JSON hasil suite")
+    compare.add_argument("old")
+    compare.add_argument("new")
+
+    args = parser.parse_args()
+    if args.name == "menu3":
+        bench_menu3(args.rows)
+    elif args.name == "tlv":
+        bench_tlv(args.rows)
+    elif args.name == "blank":
+        bench_blank(args.images, args.overlay, args.config, args.repeat)
+    elif args.name == "decode":
+        bench_decode(args.images, args.fixtures, args.config, args.seed)
+    elif args.name == "compose":
+        bench_compose(args.images, args.fixtures, args.overlay, args.config, args.modes, args.levels, args.optimize,
+                      args.seed)
+    elif args.name == "store":
+        bench_store(args.rows, args.formats, not args.skip_excel)
+    elif args.name == "memory":
+        bench_memory(args.rows, args.chunk_rows, args.stages, args.rules, args.format)
+    elif args.name == "startup":
+        bench_startup(args.repeat)
+    elif args.name == "tarif":
+        bench_tarif(args.rows)
+    elif args.name == "suite":
+        output = args.output or os.path.join("reports", f"bench_{_git_commit() or 'nogit'}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        bench_suite(args.images, args.fixtures, output, args.config, args.overlay, args.rules,
+                    args.workers or main.default_workers(), args.seed, args.keep)
+    elif args.name == "compare":
+        compare_reports(args.old, args.new)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,74 @@
+##########################################################################
+#Modul Blanking Engine (hapus QR lama dengan overlay)                    #
+##########################################################################
+import io
+import hashlib
+
+from checkpoint import encode_image
+from lazy_import import lazy_import
+
+Image = lazy_import("PIL.Image")
+
+WHITE = (255, 255, 255)
+
+
+class BlankingEngine:
+    """
+    Menghapus QR lama pada template dengan overlay di posisi config.json.
+
+    Overlay dibuka, dikonversi dan di-resize sekali per engine. Jika overlay berupa kotak
+    putih penuh (opaque), area cukup diisi warna putih tanpa paste per pixel.
+    """
+
+    def __init__(self, overlay_image_path, position):
+        self.position = position
+        self.box = (
+            position['x'],
+            position['y'],
+            position['x'] + position['width'],
+            position['y'] + position['height'],
+        )
+
+        with open(overlay_image_path, 'rb') as f:
+            # Dipakai di hash config checkpoint: overlay lain berarti output lain
+            self.overlay_hash = hashlib.sha256(f.read()).hexdigest()
+
+        with Image.open(overlay_image_path) as overlay_image:
+            overlay = overlay_image.convert("RGBA").resize((position['width'], position['height']))
+
+        alpha = overlay.getchannel("A")
+        self.fill = None
+        if alpha.getextrema() == (255, 255):
+            colors = overlay.convert("RGB").getcolors(1)
+            if colors:
+                self.fill = colors[0][1]  # Overlay satu warna dan opaque: cukup isi kotak
+
+        self.overlay_rgb = overlay.convert("RGB")
+        self.overlay_mask = None if alpha.getextrema() == (255, 255) else alpha
+
+    def blank(self, base_image):
+        """Mengembalikan salinan RGB dari base_image dengan area QR tertutup overlay."""
+        # Konversi RGBA -> RGB hanya membuang alpha, jadi overlay bisa langsung ditempel di RGB
+        if base_image.mode in ("RGB", "RGBA"):
+            image = base_image.convert("RGB")
+        else:
+            image = base_image.convert("RGBA").convert("RGB")
+
+        if self.fill is not None:
+            image.paste(self.fill, self.box)
+        else:
+            image.paste(self.overlay_rgb, self.box[:2], mask=self.overlay_mask)
+        return image
+
+    def blank_file(self, base_image_path, output_path):
+        with Image.open(base_image_path) as base_image:
+            self.blank(base_image).save(output_path)
+
+    def blank_encoded(self, item, data):
+        """
+        Compute stage checkpoint.file_stages: bytes gambar input -> (sha256 input, bytes output
+        dengan format dari ekstensi item.output_path).
+        """
+        input_hash = hashlib.sha256(data).hexdigest()
+        with Image.open(io.BytesIO(data)) as base_image:
+            return input_hash, encode_image(self.blank(base_image), item.output_path)
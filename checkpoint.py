@@ -0,0 +1,245 @@
+##########################################################################
+#Modul Checkpoint Journal (resume menu 2 / menu 5 per chunk, SQLite)     #
+##########################################################################
+import io
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import partial
+
+from lazy_import import lazy_import
+from scheduler import StageFunctions, run_staged
+
+Image = lazy_import("PIL.Image")
+
+DEFAULT_JOURNAL_PATH = "cache/checkpoint.db"
+DEFAULT_CHUNK_SIZE = 256
+# Jumlah output_path per query IN (...), di bawah batas 999 parameter SQLite versi lama
+QUERY_BATCH_SIZE = 900
+
+# Satu pekerjaan: tulis output_path dari input_path; params = nilai per baris (mis. modifiedQr)
+WorkItem = namedtuple("WorkItem", ["output_path", "input_path", "params"])
+# Hasil task: status ok / error / not_found. input_hash, input_size dan input_mtime_ns
+# diambil saat input dibaca, bukan saat hasil dicatat ke journal
+ItemResult = namedtuple("ItemResult", ["item", "status", "error", "input_hash", "output_size",
+                                       "input_size", "input_mtime_ns"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    stage          TEXT NOT NULL,
+    output_path    TEXT NOT NULL,
+    input_path     TEXT NOT NULL,
+    input_size     INTEGER NOT NULL,
+    input_mtime_ns INTEGER NOT NULL,
+    input_hash     TEXT NOT NULL,
+    params_hash    TEXT NOT NULL,
+    output_size    INTEGER NOT NULL,
+    committed_at   REAL NOT NULL,
+    PRIMARY KEY (stage, output_path)
+);
+"""
+
+
+def config_fingerprint(*parts):
+    """Hash dari konfigurasi stage (posisi, hash overlay, dsb.)."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def read_input(path):
+    """Membaca file input sekali dan mengembalikan (bytes, sha256)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return data, hashlib.sha256(data).hexdigest()
+
+
+@contextmanager
+def atomic_output(output_path):
+    """
+    Menghasilkan path sementara di folder yang sama; setelah blok selesai tanpa error file
+    tersebut di-os.replace ke output_path, sehingga output tidak pernah setengah tertulis
+    jika proses berhenti di tengah jalan. Jika gagal, file sementara dihapus.
+    """
+    tmp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def encode_image(image, output_path, **save_kwargs):
+    """Encode gambar di memori dengan format dari ekstensi output_path (seperti Image.save)."""
+    extension = os.path.splitext(output_path)[1].lower()
+    image_format = save_kwargs.pop("format", None) or Image.registered_extensions().get(extension, "PNG")
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **save_kwargs)
+    return buffer.getvalue()
+
+
+def atomic_write_bytes(data, output_path):
+    """Tulis data lewat atomic_output, mengembalikan ukuran file."""
+    with atomic_output(output_path) as tmp_path:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+    return len(data)
+
+
+# -- stage untuk scheduler.run_staged -------------------------------------
+def read_stage(item):
+    """
+    Mengembalikan ((size, mtime_ns), bytes input). Stat diambil sebelum dibaca: jika file
+    berubah setelahnya, mtime di journal tidak cocok lagi dan hash dicek ulang pada run berikutnya.
+    """
+    with open(item.input_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        return (stat.st_size, stat.st_mtime_ns), f.read()
+
+
+def compute_stage(compute, item, payload):
+    # Stat input diteruskan apa adanya ke write_stage, compute hanya menerima bytes
+    input_stat, data = payload
+    return input_stat, compute(item, data)
+
+
+def write_stage(item, payload):
+    """payload dari compute_stage: ((size, mtime_ns), (input_hash, bytes output))."""
+    (input_size, input_mtime_ns), (input_hash, data) = payload
+    return ItemResult(item, "ok", None, input_hash, atomic_write_bytes(data, item.output_path),
+                      input_size, input_mtime_ns)
+
+
+def error_result(item, stage, exc):
+    if stage == "read" and isinstance(exc, FileNotFoundError):
+        return ItemResult(item, "not_found", None, None, 0, None, None)
+    return ItemResult(item, "error", str(exc), None, 0, None, None)
+
+
+def file_stages(compute):
+    """
+    StageFunctions untuk WorkItem file -> file. compute(item, data) harus mengembalikan
+    (sha256 input, bytes output); baca dan tulis (atomic) dijalankan di thread I/O.
+    """
+    return StageFunctions(read_stage, partial(compute_stage, compute), write_stage, error_result)
+
+
+class CheckpointJournal:
+    """
+    Journal output yang sudah selesai per stage. Output dilewati pada run berikutnya jika
+    file output masih ada dengan ukuran yang sama, input tidak berubah (size + mtime, atau
+    hash SHA-256 jika size/mtime berubah) dan hash config + params sama.
+    """
+
+    def __init__(self, stage, config_hash, db_path=DEFAULT_JOURNAL_PATH):
+        self.stage = stage
+        self.config_hash = config_hash
+        self.db_path = db_path
+
+        folder = os.path.dirname(db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def _params_hash(self, params):
+        return hashlib.sha256(f"{self.config_hash}|{params}".encode("utf-8")).hexdigest()
+
+    def _is_done(self, item, row):
+        if row is None:
+            return False
+        input_size, input_mtime_ns, input_hash, params_hash, output_size = row
+        if params_hash != self._params_hash(item.params):
+            return False
+        try:
+            if os.path.getsize(item.output_path) != output_size:
+                return False
+            stat = os.stat(item.input_path)
+        except OSError:
+            return False
+        if stat.st_size == input_size and stat.st_mtime_ns == input_mtime_ns:
+            return True
+        return stat.st_size == input_size and read_input(item.input_path)[1] == input_hash
+
+    def pending(self, items):
+        """
+        Item yang belum selesai (urutan input dipertahankan). Hanya baris journal untuk output
+        item ini yang dibaca (lewat primary key), bukan seluruh journal stage.
+        """
+        items = list(items)
+        keys = [os.path.abspath(item.output_path) for item in items]
+        rows = {}
+        for start in range(0, len(keys), QUERY_BATCH_SIZE):
+            batch = keys[start:start + QUERY_BATCH_SIZE]
+            rows.update(
+                (output_path, row)
+                for output_path, *row in self.conn.execute(
+                    "SELECT output_path, input_size, input_mtime_ns, input_hash, params_hash, output_size "
+                    f"FROM outputs WHERE stage = ? AND output_path IN ({', '.join('?' * len(batch))})",
+                    (self.stage, *batch))
+            )
+        return [item for item, key in zip(items, keys) if not self._is_done(item, rows.get(key))]
+
+    def commit(self, results):
+        """Catat hasil ok dari satu chunk dalam satu transaksi."""
+        now = time.time()
+        rows = []
+        for result in results:
+            if result.status != "ok":
+                continue
+            rows.append((self.stage, os.path.abspath(result.item.output_path), result.item.input_path,
+                         result.input_size, result.input_mtime_ns, result.input_hash,
+                         self._params_hash(result.item.params), result.output_size, now))
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+
+def run_checkpointed(journal, items, stages, executor=None, chunk_size=DEFAULT_CHUNK_SIZE, on_result=None,
+                     **scheduler_options):
+    """
+    Menjalankan stages (lihat file_stages) lewat scheduler.run_staged hanya untuk item yang
+    belum ada di journal.
+
+    Item yang tersisa dihitung ulang setiap kali run dimulai lalu dibagi lagi ke semua worker.
+    Hasil dicatat ke journal per chunk_size item; output sudah ditulis atomic sebelum hasilnya
+    sampai ke sini, jadi chunk yang dicatat selalu lengkap di disk.
+
+    :return: tuple (jumlah item dilewati, list ItemResult dari item yang diproses).
+    """
+    pending = journal.pending(items) if journal is not None else list(items)
+    skipped = len(items) - len(pending)
+    buffered = []
+
+    def collect(result):
+        if journal is not None:
+            buffered.append(result)
+            if len(buffered) >= chunk_size:
+                journal.commit(buffered)
+                buffered.clear()
+        if on_result is not None:
+            on_result(result)
+
+    try:
+        processed = run_staged(pending, stages, executor, on_result=collect, **scheduler_options)
+    finally:
+        if journal is not None and buffered:
+            journal.commit(buffered)
+    return skipped, processed
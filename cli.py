@@ -0,0 +1,168 @@
+##########################################################################
+#Modul CLI (subcommand headless, sama dengan pilihan menu_utama)         #
+##########################################################################
+# Contoh pemakaian (tanpa argumen, main.py tetap membuka menu interaktif):
+#   python main.py unzip zip
+#   python main.py inventory zip --output inventory.csv
+#   python main.py hapus-qr --images unzipped_files --output qrBlank
+#   python main.py tarif --excel listQr.xlsx
+#   python main.py modify --rules config/config.txt
+#   python main.py attach --compose --output qrModified
+#   python main.py zip --folder qrModified --output final_output.zip
+#   python main.py parse 00020101021126...6304ABCD
+#   python main.py --config config/produksi.json readme
+#
+# Modul ini sengaja hanya meng-import argparse: main (dan pandas / cv2 / PIL lewat
+# lazy_import) baru di-import oleh subcommand yang dijalankan, sehingga --help cepat.
+import sys
+import argparse
+
+# Nilai default path ada di main.py (EXCEL_PATH, BLANK_FOLDER, ...); opsi yang tidak diisi
+# tidak diteruskan agar default tersebut yang berlaku.
+
+
+def _options(args, **names):
+    """kwargs untuk fungsi run_* dari opsi yang diisi saja: names = {parameter: atribut args}."""
+    options = {parameter: getattr(args, attribute) for parameter, attribute in names.items()}
+    if args.config:
+        options["config_path"] = args.config
+    return {parameter: value for parameter, value in options.items() if value is not None}
+
+
+def _run(args, name, func, **kwargs):
+    import main
+    from metrics import run_report
+
+    config = main.load_config_or_default(args.config or main.CONFIG_PATH)
+    with run_report(f"cli_{name}", config.get('report_dir', "reports"), config.get('profile', False)):
+        result = func(**kwargs)
+    # None / False berarti stage berhenti karena input tidak ada (pesan sudah dicetak)
+    return 1 if result is None or result is False else 0
+
+
+def cmd_unzip(args):
+    import main
+    return _run(args, "unzip", main.run_unzip, folder_path=args.folder,
+                **_options(args, output_folder="output", excel_path="excel", workers="workers"))
+
+
+def cmd_inventory(args):
+    import main
+    return _run(args, "inventory", main.run_inventory, folder_path=args.folder,
+                **_options(args, output_path="output"))
+
+
+def cmd_hapus_qr(args):
+    import main
+    return _run(args, "hapus_qr", main.run_hapus_qr,
+                **_options(args, excel_path="excel", image_folder="images", overlay_image_path="overlay",
+                           output_folder="output"))
+
+
+def cmd_tarif(args):
+    import main
+    return _run(args, "tarif", main.run_modify_tarif,
+                **_options(args, excel_path="excel", output_store_path="output_store", crc_excel_path="crc_excel"))
+
+
+def cmd_modify(args):
+    import main
+    return _run(args, "modify", main.run_modify_config,
+                **_options(args, excel_path="excel", rules_path="rules", workers="workers", verbose="verbose"))
+
+
+def cmd_attach(args):
+    import main
+    return _run(args, "attach", main.run_attach_qr,
+                **_options(args, excel_path="excel", image_folder="images", template_folder="templates",
+                           overlay_image_path="overlay", output_folder="output", compose="compose"))
+
+
+def cmd_zip(args):
+    import main
+    return _run(args, "zip", main.run_zip, **_options(args, folder_path="folder", final_zip_path="output"))
+
+
+def cmd_parse(args):
+    import main
+    main.print_tlv(args.qr_strings)
+    return 0
+
+
+def cmd_readme(args):
+    import main
+    main.show_about()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="modifQrStatic tanpa menu: setiap subcommand sama dengan satu pilihan menu_utama. "
+                    "Tanpa subcommand, main.py membuka menu interaktif.")
+    parser.add_argument("--config", default=None, help="config.json (default config/config.json)")
+    subparsers = parser.add_subparsers(dest="command", required=True, metavar="subcommand")
+
+    unzip = subparsers.add_parser("unzip", help="Menu 1: unzip, baca QR + tarif, simpan ke result store")
+    unzip.add_argument("folder", nargs="?", default="zip", help="Folder berisi file zip (default zip)")
+    unzip.add_argument("--output", help="Folder gambar hasil ekstrak (default <folder>/../unzipped_files)")
+    unzip.add_argument("--excel", help="listQr.xlsx hasil export (default <folder>/../listQr.xlsx)")
+    unzip.add_argument("--workers", type=int, help="Jumlah process decode (default 'decode_workers' di config.json)")
+    unzip.set_defaults(func=cmd_unzip)
+
+    inventory = subparsers.add_parser("inventory", help="Baca QR + tarif langsung dari zip tanpa ekstrak (read-only)")
+    inventory.add_argument("folder", nargs="?", default="zip", help="Folder berisi file zip (default zip)")
+    inventory.add_argument("--output", help="Simpan hasil sebagai CSV (default hanya ringkasan)")
+    inventory.set_defaults(func=cmd_inventory)
+
+    hapus = subparsers.add_parser("hapus-qr", help="Menu 2: hapus QR lama dari template")
+    hapus.add_argument("--excel", help="listQr.xlsx / folder result store (default listQr.xlsx)")
+    hapus.add_argument("--images", help="Folder gambar asli (default unzipped_files)")
+    hapus.add_argument("--overlay", help="Gambar penutup QR (default overlay.png)")
+    hapus.add_argument("--output", help="Folder hasil (default qrBlank)")
+    hapus.set_defaults(func=cmd_hapus_qr)
+
+    tarif = subparsers.add_parser("tarif", help="Menu 3: sisipkan tarif (tag 54) + CRC baru")
+    tarif.add_argument("--excel", help="listQr.xlsx (default listQr.xlsx)")
+    tarif.add_argument("--output-store", help="Result store hasil (default 'result_store_crc' di config.json)")
+    tarif.add_argument("--crc-excel", help="Excel export jika export_excel (default output_crc.xlsx)")
+    tarif.set_defaults(func=cmd_tarif)
+
+    modify = subparsers.add_parser("modify", help="Menu 4: modifikasi QR sesuai config.txt")
+    modify.add_argument("--excel", help="listQr.xlsx (default listQr.xlsx)")
+    modify.add_argument("--rules", help="Aturan modifikasi (default config/config.txt)")
+    modify.add_argument("--workers", type=int, help="Jumlah process (default jumlah CPU)")
+    modify.add_argument("--verbose", action="store_true", help="Cetak tag, length dan value setiap QR hasil modifikasi")
+    modify.set_defaults(func=cmd_modify)
+
+    attach = subparsers.add_parser("attach", help="Menu 5: tempel QR hasil modifikasi ke template")
+    attach.add_argument("--excel", help="listQr.xlsx (default listQr.xlsx)")
+    attach.add_argument("--images", help="Folder template tanpa QR (default qrBlank)")
+    attach.add_argument("--templates", help="Folder template asli untuk --compose (default unzipped_files)")
+    attach.add_argument("--overlay", help="Gambar penutup QR untuk --compose (default overlay.png)")
+    attach.add_argument("--output", help="Folder hasil (default qrModified)")
+    attach.add_argument("--compose", action=argparse.BooleanOptionalAction, default=None,
+                        help="Hapus + tempel QR sekaligus dari template asli (default 'compose' di config.json)")
+    attach.set_defaults(func=cmd_attach)
+
+    zip_parser = subparsers.add_parser("zip", help="Menu 6: zip gambar QR hasil modifikasi")
+    zip_parser.add_argument("--folder", help="Folder PNG (default qrModifiedOutput)")
+    zip_parser.add_argument("--output", help="File zip akhir (default final_output.zip)")
+    zip_parser.set_defaults(func=cmd_zip)
+
+    parse = subparsers.add_parser("parse", help="Tampilkan tag TLV dari QR string")
+    parse.add_argument("qr_strings", nargs="+", metavar="qrstring")
+    parse.set_defaults(func=cmd_parse)
+
+    readme = subparsers.add_parser("readme", help="Menu 7: petunjuk pemakaian")
+    readme.set_defaults(func=cmd_readme)
+    return parser
+
+
+def main_cli(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,81 @@
+##########################################################################
+#Modul CRC-16/IBM-3740 (CRC-16/CCITT-FALSE) untuk tag 63 QRIS           #
+##########################################################################
+import binascii
+from functools import lru_cache
+
+DEFAULT_POLYNOMIAL = 0x1021
+DEFAULT_INITIAL_VALUE = 0xFFFF
+
+
+@lru_cache(maxsize=None)
+def build_table(polynomial: int = DEFAULT_POLYNOMIAL) -> tuple:
+    """
+    Membuat tabel CRC 256 entri untuk polinomial tertentu (MSB-first, tanpa refleksi).
+    Tabel di-cache per polinomial sehingga hanya dihitung sekali.
+    """
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = (crc << 1) ^ polynomial
+            else:
+                crc <<= 1
+            crc &= 0xFFFF
+        table.append(crc)
+    return tuple(table)
+
+
+CRC16_TABLE = build_table(DEFAULT_POLYNOMIAL)
+
+
+def crc16(data: bytes, polynomial: int = DEFAULT_POLYNOMIAL,
+          initial_value: int = DEFAULT_INITIAL_VALUE, fast: bool = True) -> int:
+    """
+    Menghitung CRC-16 dari data bytes dan mengembalikan nilainya sebagai integer.
+
+    :param data: Data input dalam bentuk bytes.
+    :param polynomial: Polinomial CRC (default: 0x1021).
+    :param initial_value: Nilai awal register CRC (default: 0xFFFF).
+    :param fast: Gunakan binascii.crc_hqx (implementasi C) jika polinomial 0x1021.
+    :return: Nilai CRC 16-bit.
+    """
+    if fast and polynomial == DEFAULT_POLYNOMIAL:
+        # crc_hqx adalah CRC-CCITT MSB-first dengan polinomial 0x1021
+        return binascii.crc_hqx(data, initial_value)
+
+    table = build_table(polynomial)
+    crc = initial_value
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+    return crc
+
+
+def crc16_hex(data: bytes, polynomial: int = DEFAULT_POLYNOMIAL,
+              initial_value: int = DEFAULT_INITIAL_VALUE, fast: bool = True) -> str:
+    """Menghitung CRC-16 dan mengembalikan 4 digit hexadecimal (huruf besar)."""
+    return f"{crc16(data, polynomial, initial_value, fast):04X}"
+
+
+def crc16_bulk(payloads, encoding: str = "utf-8", polynomial: int = DEFAULT_POLYNOMIAL,
+               initial_value: int = DEFAULT_INITIAL_VALUE, fast: bool = True) -> list:
+    """
+    Menghitung CRC untuk sekumpulan payload sekaligus (misal satu kolom DataFrame).
+
+    :param payloads: Iterable berisi str atau bytes.
+    :param encoding: Encoding yang dipakai untuk payload bertipe str.
+    :return: List CRC 4 digit hexadecimal dengan urutan yang sama dengan input.
+    """
+    if fast and polynomial == DEFAULT_POLYNOMIAL:
+        crc_hqx = binascii.crc_hqx
+        return [
+            f"{crc_hqx(p if isinstance(p, bytes) else p.encode(encoding), initial_value):04X}"
+            for p in payloads
+        ]
+
+    return [
+        crc16_hex(p if isinstance(p, bytes) else p.encode(encoding), polynomial, initial_value, fast=False)
+        for p in payloads
+    ]
+
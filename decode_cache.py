@@ -0,0 +1,185 @@
+##########################################################################
+#Modul Cache Hasil Decode QR (SQLite)                                    #
+##########################################################################
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+
+DEFAULT_CACHE_PATH = "cache/decode_cache.db"
+# Batas cache: jumlah baris member dan total bytes data member (member_name + qrstring + error +
+# strategy). Jika salah satu terlampaui, archive yang paling lama tidak dipakai dibuang lebih dulu.
+DEFAULT_MAX_ROWS = 500000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Dinaikkan setiap kali skema berubah; database versi lama dikosongkan lalu dibuat ulang
+SCHEMA_VERSION = 2
+
+# Ukuran data satu member dalam bytes (TEXT di-cast ke BLOB agar dihitung bytes utf-8, bukan karakter)
+_MEMBER_BYTES = ("length(CAST(m.member_name AS BLOB)) + COALESCE(length(CAST(m.qrstring AS BLOB)), 0) + "
+                 "COALESCE(length(CAST(m.error AS BLOB)), 0) + COALESCE(length(CAST(m.strategy AS BLOB)), 0)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    zip_path    TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    sha256      TEXT NOT NULL,
+    decoder_key TEXT NOT NULL,
+    last_used   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    zip_path    TEXT NOT NULL,
+    position    INTEGER NOT NULL,
+    member_name TEXT NOT NULL,
+    qrstring    TEXT,
+    error       TEXT,
+    strategy    TEXT,
+    PRIMARY KEY (zip_path, position)
+);
+"""
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DecodeCache:
+    """
+    Cache persisten hasil decode per file ZIP.
+
+    Archive dianggap sama jika path dan decoder_key sama, serta size + mtime sama
+    atau (jika size/mtime berubah) hash SHA-256 isinya sama. Setiap member menyimpan
+    (member_name, qrstring, error, strategy); tarif tidak disimpan karena selalu dihitung
+    ulang dari config/tarif.txt. evict() dipanggil oleh pemakai setelah satu batch selesai.
+    """
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_rows=DEFAULT_MAX_ROWS, max_bytes=DEFAULT_MAX_BYTES):
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+        folder = os.path.dirname(db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Isi cache bisa dibuat ulang dari zip, jadi skema lama cukup dibuang
+            self.conn.executescript("DROP TABLE IF EXISTS members; DROP TABLE IF EXISTS archives;")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    @staticmethod
+    def _key(zip_path):
+        return os.path.abspath(zip_path)
+
+    def lookup(self, zip_path, decoder_key=""):
+        """Mengembalikan list baris member jika archive masih valid di cache, selain itu None."""
+        key = self._key(zip_path)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, sha256, decoder_key FROM archives WHERE zip_path = ?", (key,)
+        ).fetchone()
+
+        if row is None or row[3] != decoder_key:
+            self.misses += 1
+            return None
+
+        stat = os.stat(zip_path)
+        size, mtime_ns, sha256, _ = row
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+            # Metadata berubah (misal file disalin ulang), cek isi dengan hash
+            if stat.st_size != size or file_sha256(zip_path) != sha256:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE archives SET mtime_ns = ? WHERE zip_path = ?", (stat.st_mtime_ns, key))
+
+        self.conn.execute("UPDATE archives SET last_used = ? WHERE zip_path = ?", (time.time(), key))
+        members = self.conn.execute(
+            "SELECT member_name, qrstring, error, strategy FROM members "
+            "WHERE zip_path = ? ORDER BY position", (key,)
+        ).fetchall()
+        self.hits += 1
+        return members
+
+    def store(self, zip_path, rows, decoder_key=""):
+        """Menyimpan hasil decode satu archive; rows berisi (member_name, qrstring, error, strategy)."""
+        key = self._key(zip_path)
+        stat = os.stat(zip_path)
+        with self.conn:
+            self.conn.execute("DELETE FROM members WHERE zip_path = ?", (key,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO archives VALUES (?, ?, ?, ?, ?, ?)",
+                (key, stat.st_size, stat.st_mtime_ns, file_sha256(zip_path), decoder_key, time.time()),
+            )
+            self.conn.executemany(
+                "INSERT INTO members VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, position, *row) for position, row in enumerate(rows)],
+            )
+
+    def stored_bytes(self):
+        """Total bytes data member yang tersimpan (dasar batas max_bytes)."""
+        return self.conn.execute(f"SELECT COALESCE(SUM({_MEMBER_BYTES}), 0) FROM members m").fetchone()[0]
+
+    def file_bytes(self):
+        """Ukuran file database di disk (page_count * page_size)."""
+        page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+    def evict(self):
+        """
+        Membuang archive yang paling lama tidak dipakai sampai jumlah member <= max_rows dan
+        total bytes data member <= max_bytes, lalu VACUUM agar file database ikut mengecil.
+        """
+        rows, size = self.conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM({_MEMBER_BYTES}), 0) FROM members m").fetchone()
+        excess_rows = rows - self.max_rows
+        excess_bytes = size - self.max_bytes
+        if excess_rows <= 0 and excess_bytes <= 0:
+            return
+
+        victims = []
+        for zip_path, count, archive_bytes in self.conn.execute(
+            f"SELECT a.zip_path, COUNT(m.position), COALESCE(SUM({_MEMBER_BYTES}), 0) FROM archives a "
+            "LEFT JOIN members m ON m.zip_path = a.zip_path "
+            "GROUP BY a.zip_path ORDER BY a.last_used"
+        ):
+            if excess_rows <= 0 and excess_bytes <= 0:
+                break
+            victims.append((zip_path,))
+            excess_rows -= count
+            excess_bytes -= archive_bytes
+
+        with self.conn:
+            self.conn.executemany("DELETE FROM members WHERE zip_path = ?", victims)
+            self.conn.executemany("DELETE FROM archives WHERE zip_path = ?", victims)
+        # DELETE hanya menandai page sebagai kosong, VACUUM mengembalikannya ke filesystem
+        self.conn.execute("VACUUM")
+        self.evicted += len(victims)
+        logging.info(f"Cache decode: {len(victims)} archive lama dibuang dari cache "
+                     f"(file {self.file_bytes() / 1024 / 1024:.1f} MB).")
+
+    def summary(self):
+        total = self.hits + self.misses
+        ratio = (self.hits / total * 100) if total else 0.0
+        return (f"Cache decode: {self.hits} hit, {self.misses} miss ({ratio:.1f}% hit), "
+                f"{self.evicted} archive dibuang.")
@@ -0,0 +1,292 @@
+##########################################################################
+#Modul Decode QR (serial & paralel)                                      #
+##########################################################################
+import os
+import time
+import logging
+import zipfile
+from collections import Counter, namedtuple
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from image_probe import InvalidImageError, probe_bytes, probe_file
+from lazy_import import lazy_import
+from metrics import METRICS, instrument
+
+# cv2 / numpy / pyzbar baru di-import saat decode pertama (lihat lazy_import)
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+pyzbar = lazy_import("pyzbar.pyzbar")
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+# Margin default (pixel) di sekitar kotak QR pada config.json saat decode ROI
+DEFAULT_ROI_MARGIN = 40
+
+# Strategi decode yang berhasil, urutan di DEFAULT_STRATEGIES adalah urutan percobaan
+STRATEGY_FULL = "full"          # decode seluruh gambar (tanpa ROI)
+STRATEGY_ROI = "roi"            # decode hanya area QR dari config.json
+STRATEGY_FALLBACK = "fallback"  # ROI gagal, scan grayscale seluruh gambar
+STRATEGY_BINARIZE = "binarize"  # threshold Otsu pada area QR (kontras rendah / background berwarna)
+STRATEGY_UPSCALE = "upscale"    # area QR diperbesar (modul terlalu kecil untuk zbar)
+STRATEGY_OPENCV = "opencv"      # cv2.QRCodeDetector, lalu detectAndDecodeMulti seluruh gambar
+DEFAULT_STRATEGIES = (STRATEGY_ROI, STRATEGY_FALLBACK, STRATEGY_BINARIZE, STRATEGY_UPSCALE, STRATEGY_OPENCV)
+
+# Batas pixel hasil upscale agar biaya satu gambar yang gagal tetap terbatas
+MAX_UPSCALE_PIXELS = 4000000
+MAX_UPSCALE_FACTOR = 2.0
+
+# Stage metrics latency decode per gambar (semua jalur: read_qr_code, decode_files, iter_zip_qr)
+DECODE_STAGE = "read_qr_code"
+
+# Hasil decode satu member ZIP, size = ukuran member (bytes) setelah diekstrak
+ZipQrRecord = namedtuple("ZipQrRecord", ["zip_name", "member_name", "qr_string", "error", "strategy", "size"])
+
+
+def load_decode_roi(config, margin=None):
+    """
+    Membuat ROI (x0, y0, x1, y1) dari config['position'] ditambah margin.
+    Margin diambil dari parameter, config['decode_margin'] atau DEFAULT_ROI_MARGIN.
+    """
+    position = config.get('position')
+    if not position:
+        return None
+    if margin is None:
+        margin = config.get('decode_margin', DEFAULT_ROI_MARGIN)
+    return (
+        max(0, position['x'] - margin),
+        max(0, position['y'] - margin),
+        position['x'] + position['width'] + margin,
+        position['y'] + position['height'] + margin,
+    )
+
+def load_decode_strategies(config):
+    """Urutan strategi dari config['decode_strategies'], default DEFAULT_STRATEGIES."""
+    strategies = tuple(config.get('decode_strategies', DEFAULT_STRATEGIES))
+    unknown = [strategy for strategy in strategies if strategy not in DEFAULT_STRATEGIES]
+    if unknown:
+        raise ValueError(f"Strategi decode {unknown} tidak dikenal, gunakan {DEFAULT_STRATEGIES}.")
+    return strategies
+
+def decoder_key(roi, strategies=None):
+    """Kunci DecodeCache: hasil lama dipakai hanya jika ROI dan strategi decode sama."""
+    return f"{roi!r}|{','.join(strategies or DEFAULT_STRATEGIES)}"
+
+def _first_qr(image):
+    # Hanya simbol QR: zbar tidak perlu mencoba semua jenis barcode 1D
+    decoded_objects = pyzbar.decode(image, symbols=[pyzbar.ZBarSymbol.QRCODE])
+    if decoded_objects:
+        return decoded_objects[0].data.decode('utf-8')
+    return None
+
+def _binarize(region):
+    _, binary = cv2.threshold(region, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return _first_qr(binary)
+
+def _upscale(region):
+    height, width = region.shape[:2]
+    factor = min(MAX_UPSCALE_FACTOR, (MAX_UPSCALE_PIXELS / max(1, height * width)) ** 0.5)
+    if factor <= 1.0:
+        return None
+    return _first_qr(cv2.resize(region, None, fx=factor, fy=factor, interpolation=cv2.INTER_CUBIC))
+
+_detector = None
+
+def _opencv(region, image):
+    global _detector
+    if _detector is None:
+        # Satu detector per proses worker
+        _detector = cv2.QRCodeDetector()
+    qr_string, _, _ = _detector.detectAndDecode(region)
+    if qr_string:
+        return qr_string
+    if region is not image:
+        ok, qr_strings, _, _ = _detector.detectAndDecodeMulti(image)
+        if ok:
+            return next((qr_string for qr_string in qr_strings if qr_string), None)
+    return None
+
+def decode_image_array(image, roi=None, strategies=None):
+    """
+    Decode QR dari array gambar dengan mencoba strategi satu per satu, mengembalikan tuple
+    (qr_string, strategy). Strategi pertama (ROI, atau seluruh gambar tanpa ROI) sama seperti
+    sebelumnya, strategi berikutnya hanya dijalankan jika sebelumnya gagal dan masing-masing
+    paling banyak sekali per gambar.
+    """
+    strategies = DEFAULT_STRATEGIES if strategies is None else strategies
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    # Slicing numpy otomatis terpotong di batas gambar
+    region = image
+    if roi is not None:
+        x0, y0, x1, y1 = roi
+        crop = image[y0:y1, x0:x1]
+        if crop.size:
+            region = crop
+
+    for strategy in strategies:
+        if strategy == STRATEGY_ROI:
+            qr_string = _first_qr(region) if region is not image else None
+        elif strategy == STRATEGY_FALLBACK:
+            qr_string = _first_qr(image)
+            if qr_string and roi is None:
+                return qr_string, STRATEGY_FULL
+        elif strategy == STRATEGY_BINARIZE:
+            qr_string = _binarize(region)
+        elif strategy == STRATEGY_UPSCALE:
+            qr_string = _upscale(region)
+        else:
+            qr_string = _opencv(region, image)
+        if qr_string:
+            return qr_string, strategy
+    return None, None
+
+def _imdecode(data, roi, name, strategies=None):
+    # Semua strategi bekerja di grayscale (zbar juga mengonversi ke grayscale)
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise InvalidImageError(f"File '{name}' bukan gambar yang valid.")
+    return decode_image_array(image, roi, strategies)
+
+def _decode_image_file(image_path, roi=None, strategies=None):
+    """
+    Decode QR dari file gambar, exception dibiarkan naik ke pemanggil.
+    File dibuka sekali: header dicek (bukan gambar / terlalu besar ditolak tanpa decode),
+    lalu bytes yang sama langsung di-decode.
+    """
+    _, data = probe_file(image_path)
+    return _imdecode(data, roi, image_path, strategies)
+
+def _decode_bytes(data, roi=None, name="<bytes>", strategies=None):
+    probe_bytes(data, name)
+    return _imdecode(data, roi, name, strategies)
+
+def decode_image_bytes(data, roi=None, strategies=None):
+    """Decode QR langsung dari isi file gambar (bytes) tanpa menulis ke disk."""
+    return _decode_bytes(data, roi, strategies=strategies)[0]
+
+# Fungsi Membaca QR Code
+@instrument(DECODE_STAGE, is_failure=lambda qr_string: qr_string is None)
+def read_qr_code(image_path, roi=None, skip_invalid=False, strategies=None):
+    """
+    Mengembalikan QR string atau None. Dengan skip_invalid=True, file yang bukan gambar
+    (atau terlalu besar) dilewati tanpa warning, pengganti validate_image + read_qr_code.
+    """
+    try:
+        return _decode_image_file(image_path, roi, strategies)[0]
+    except InvalidImageError as e:
+        if not skip_invalid:
+            logging.warning(str(e))
+        return None
+    except Exception as e:
+        logging.error(f"Error membaca QR code dari file '{image_path}': {e}")
+        return None
+
+def decode_task(image_path, roi=None, strategies=None):
+    """
+    Task untuk worker: mengembalikan tuple (qr_string, error, strategy, seconds, bytes_read).
+    Error tidak menghentikan batch, cukup dicatat sebagai pesan. Latency dan ukuran diukur di
+    worker lalu dicatat ke METRICS oleh proses induk (decode_files).
+    """
+    start = time.perf_counter()
+    size = 0
+    try:
+        _, data = probe_file(image_path)
+        size = len(data)
+        qr_string, strategy = _imdecode(data, roi, image_path, strategies)
+        return qr_string, None, strategy, time.perf_counter() - start, size
+    except Exception as e:
+        return None, str(e), None, time.perf_counter() - start, size
+
+def _record_decodes(results):
+    for qr_string, _, _, seconds, size in results:
+        METRICS.record(DECODE_STAGE, seconds, qr_string is None, bytes_read=size)
+    return [result[:3] for result in results]
+
+def summarize_strategies(strategies):
+    """Menghitung jumlah decode per strategi (roi / fallback / binarize / ... / gagal)."""
+    counts = Counter(strategy or "miss" for strategy in strategies)
+    return dict(counts)
+
+def default_workers():
+    return max(1, os.cpu_count() or 1)
+
+def default_chunksize(total, workers):
+    # Beberapa chunk per worker agar beban tetap merata tanpa overhead IPC per file
+    return max(1, total // (workers * 4))
+
+def decode_files(image_paths, workers=None, chunksize=None, roi=None, strategies=None):
+    """
+    Decode QR dari banyak file sekaligus menggunakan process pool.
+
+    :param image_paths: List path gambar.
+    :param workers: Jumlah worker (default: jumlah CPU). 1 berarti serial tanpa pool.
+    :param chunksize: Jumlah file per task yang dikirim ke worker.
+    :param roi: Area decode (x0, y0, x1, y1) dari load_decode_roi, None untuk seluruh gambar.
+    :param strategies: Urutan strategi (load_decode_strategies), None berarti DEFAULT_STRATEGIES.
+    :return: List tuple (qr_string, error, strategy) dengan urutan sama dengan image_paths.
+             Latency per gambar dicatat di stage DECODE_STAGE.
+    """
+    image_paths = list(image_paths)
+    if workers is None:
+        workers = default_workers()
+    workers = min(workers, len(image_paths)) if image_paths else 1
+
+    if workers <= 1:
+        return _record_decodes([decode_task(path, roi, strategies) for path in image_paths])
+
+    if chunksize is None:
+        chunksize = default_chunksize(len(image_paths), workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # executor.map menjaga urutan hasil sesuai urutan input
+        return _record_decodes(list(executor.map(partial(decode_task, roi=roi, strategies=strategies),
+                                                 image_paths, chunksize=chunksize)))
+
+def member_output_path(output_folder, member_name):
+    # Sama seperti extractall: buang drive, path absolut dan komponen '..'
+    parts = [p for p in member_name.replace('\\', '/').split('/') if p not in ('', '.', '..')]
+    parts = [os.path.splitdrive(p)[1] for p in parts]
+    return os.path.join(output_folder, *parts)
+
+def iter_zip_qr(zip_paths, extract_folder=None, extensions=None, roi=None, strategies=None):
+    """
+    Membaca setiap member ZIP langsung ke memori, decode QR dengan cv2.imdecode,
+    lalu menghasilkan ZipQrRecord(zip_name, member_name, qr_string, error, strategy, size).
+    Latency decode per member dicatat di stage DECODE_STAGE.
+
+    :param zip_paths: List path file ZIP.
+    :param extract_folder: Jika diisi, bytes member juga ditulis ke folder ini
+                           (untuk stage berikutnya). None berarti tanpa tulis ke disk.
+    :param extensions: Tuple ekstensi yang diproses, None berarti semua file.
+    :param roi: Area decode (x0, y0, x1, y1) dari load_decode_roi.
+    :param strategies: Urutan strategi decode, None berarti DEFAULT_STRATEGIES.
+    """
+    for zip_path in zip_paths:
+        zip_name = os.path.basename(zip_path)
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                for info in zip_ref.infolist():
+                    if info.is_dir():
+                        continue
+                    if extensions and not info.filename.lower().endswith(extensions):
+                        continue
+
+                    data = zip_ref.read(info)
+                    if extract_folder is not None:
+                        output_path = member_output_path(extract_folder, info.filename)
+                        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                        with open(output_path, 'wb') as f:
+                            f.write(data)
+
+                    start = time.perf_counter()
+                    try:
+                        qr_string, strategy = _decode_bytes(data, roi, info.filename, strategies)
+                        error = None
+                    except Exception as e:
+                        qr_string, error, strategy = None, str(e), None
+                    METRICS.record(DECODE_STAGE, time.perf_counter() - start, qr_string is None,
+                                   bytes_read=len(data))
+                    yield ZipQrRecord(zip_name, info.filename, qr_string, error, strategy, len(data))
+        except zipfile.BadZipFile:
+            logging.error(f"File '{zip_path}' rusak.")
@@ -0,0 +1,169 @@
+##########################################################################
+#Modul Fixture Sintetis (template PTEN 1400x1972 + payload QRIS)         #
+##########################################################################
+# Contoh pemakaian:
+#   python fixtures.py bench_fixtures/n1000 --images 1000
+import os
+import io
+import csv
+import json
+import random
+import argparse
+import zipfile
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw, ImageFont
+
+from tarif import DEFAULT_RULES
+from tlv import encode_items, with_crc
+from qr_render import render_qr
+
+TEMPLATE_SIZE = (1400, 1972)
+DEFAULT_POSITION = {"x": 305, "y": 628, "width": 789, "height": 789}
+MANIFEST_FILE = "fixtures_manifest.csv"
+_INFO_FILE = "fixtures.json"
+
+# Satu merchant key per aturan tarif bawaan (config/tarif.txt)
+MERCHANT_TARIF = dict(DEFAULT_RULES)
+
+
+def merchant_payload(merchant_key, nmid, terminal="A01"):
+    """
+    Payload QRIS statis dengan struktur yang sama seperti sampel asli (tag 58 mulai di
+    karakter ke-148), NMID 13 digit dan nama merchant 'KEMENHUB <key> 01'.
+    """
+    merchant_account = encode_items([
+        ("00", "ID.CO.BANKMANDIRI.WWW"),
+        ("01", f"93600008{nmid[-10:]}"),
+        ("02", nmid[-11:]),
+        ("03", "URE"),
+    ])
+    qris = encode_items([("00", "ID.CO.QRIS.WWW"), ("02", f"ID{nmid}"), ("03", "URE")])
+    payload = encode_items([
+        ("00", "01"),
+        ("01", "11"),
+        ("26", merchant_account),
+        ("51", qris),
+        ("52", "9399"),
+        ("53", "360"),
+        ("58", "ID"),
+        ("59", f"KEMENHUB {merchant_key} 01"),
+        ("60", "JAKARTA SELATAN"),
+        ("61", "12850"),
+        ("62", encode_items([("07", terminal)])),
+        ("63", "0000"),
+    ])
+    return with_crc(payload)
+
+
+def _font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=len(MERCHANT_TARIF))
+def _template(merchant_key, x, y, width, height):
+    # Template per merchant cukup dibuat sekali; per gambar hanya NMID dan QR yang berubah
+    image = Image.new("RGBA", TEMPLATE_SIZE, (255, 255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, TEMPLATE_SIZE[0], 260), fill=(200, 16, 46, 255))
+    draw.text((TEMPLATE_SIZE[0] // 2, 130), "QRIS", fill="white", font=_font(120), anchor="mm")
+    draw.text((TEMPLATE_SIZE[0] // 2, 380), f"KEMENHUB {merchant_key} 01", fill="black", font=_font(64), anchor="mm")
+    draw.rectangle((x - 20, y - 20, x + width + 20, y + height + 20), outline=(60, 60, 60, 255), width=6)
+    draw.rectangle((0, TEMPLATE_SIZE[1] - 200, TEMPLATE_SIZE[0], TEMPLATE_SIZE[1]), fill=(30, 30, 30, 255))
+    draw.text((TEMPLATE_SIZE[0] // 2, TEMPLATE_SIZE[1] - 100), "SATU QRIS UNTUK SEMUA",
+              fill="white", font=_font(56), anchor="mm")
+    return image
+
+
+def render_fixture(merchant_key, nmid, payload, position=DEFAULT_POSITION):
+    """Gambar PTEN sintetis (RGBA 1400x1972) dengan QR payload di kotak position."""
+    image = _template(merchant_key, position['x'], position['y'], position['width'], position['height']).copy()
+    draw = ImageDraw.Draw(image)
+    draw.text((TEMPLATE_SIZE[0] // 2, 480), f"NMID : ID{nmid}", fill="black", font=_font(48), anchor="mm")
+    image.paste(render_qr(payload, position['width'], position['height']), (position['x'], position['y']))
+    return image
+
+
+def _write_fixture(task):
+    output_folder, merchant_key, nmid, position, compress_level = task
+    payload = merchant_payload(merchant_key, nmid)
+    member_name = f"ID{nmid}_A01.png"
+    zip_name = f"ID{nmid}.zip"
+
+    buffer = io.BytesIO()
+    render_fixture(merchant_key, nmid, payload, position).save(buffer, format="PNG", compress_level=compress_level)
+    with zipfile.ZipFile(os.path.join(output_folder, zip_name), 'w', zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr(member_name, buffer.getvalue())
+    return zip_name, member_name, merchant_key, MERCHANT_TARIF[merchant_key], payload
+
+
+def fixture_plan(count, seed=0):
+    """List (merchant_key, nmid) yang deterministik untuk count dan seed yang sama."""
+    rng = random.Random(seed)
+    keys = list(MERCHANT_TARIF)
+    nmids = rng.sample(range(10 ** 12, 10 ** 13), count)
+    # Semua merchant key muncul bergiliran agar setiap tarif ter-cover
+    return [(keys[i % len(keys)], f"{nmid:013d}") for i, nmid in enumerate(nmids)]
+
+
+def generate_fixtures(output_folder, count, seed=0, position=DEFAULT_POSITION, workers=None, compress_level=1):
+    """
+    Membuat count file zip (masing-masing satu PNG, seperti data asli) di output_folder
+    beserta manifest CSV (zip, member, merchant_key, tarif, payload). Jika folder sudah berisi
+    fixture dengan count/seed/position yang sama, fixture dipakai ulang.
+
+    :return: list dict manifest.
+    """
+    info = {"count": count, "seed": seed, "position": position}
+    info_path = os.path.join(output_folder, _INFO_FILE)
+    manifest_path = os.path.join(output_folder, MANIFEST_FILE)
+    if os.path.exists(info_path) and os.path.exists(manifest_path):
+        with open(info_path, "r") as f:
+            if json.load(f) == info:
+                return load_manifest(output_folder)
+
+    os.makedirs(output_folder, exist_ok=True)
+    tasks = [(output_folder, key, nmid, position, compress_level) for key, nmid in fixture_plan(count, seed)]
+    workers = workers or max(1, os.cpu_count() or 1)
+    if workers > 1 and count > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rows = list(executor.map(_write_fixture, tasks, chunksize=max(1, count // (workers * 4))))
+    else:
+        rows = [_write_fixture(task) for task in tasks]
+
+    with open(manifest_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["zip", "member", "merchant_key", "tarif", "payload"])
+        writer.writerows(rows)
+    with open(info_path, "w") as f:
+        json.dump(info, f)
+    return load_manifest(output_folder)
+
+
+def load_manifest(output_folder):
+    with open(os.path.join(output_folder, MANIFEST_FILE), newline="") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row["tarif"] = int(row["tarif"])
+    return rows
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Generate fixture PTEN sintetis (zip berisi PNG 1400x1972)")
+    parser.add_argument("output_folder")
+    parser.add_argument("--images", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--compress-level", type=int, default=1, help="PNG compress_level fixture (0-9)")
+    args = parser.parse_args()
+
+    rows = generate_fixtures(args.output_folder, args.images, args.seed, workers=args.workers,
+                             compress_level=args.compress_level)
+    print(f"{len(rows)} fixture tersedia di {args.output_folder}")
+
+
+if __name__ == "__main__":
+    main_cli()
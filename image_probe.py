@@ -0,0 +1,129 @@
+##########################################################################
+#Modul Image Probe (cek tipe & dimensi dari header, tanpa decode)        #
+##########################################################################
+import os
+import struct
+from collections import namedtuple
+
+KIND_PNG = "png"
+KIND_JPEG = "jpeg"
+KIND_BMP = "bmp"
+
+# Template PTEN 1400x1972 (~2.8 MP, beberapa MB); batas jauh di atas itu
+MAX_IMAGE_BYTES = 64 * 1024 * 1024
+MAX_IMAGE_PIXELS = 50_000_000
+
+# Cukup untuk signature + IHDR/BITMAPINFOHEADER dan biasanya SOF JPEG (setelah EXIF)
+HEADER_BYTES = 64 * 1024
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# SOF0-SOF15 kecuali DHT (C4), JPG (C8) dan DAC (CC)
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Marker tanpa field panjang: TEM, RST0-RST7
+_JPEG_STANDALONE = frozenset([0x01] + list(range(0xD0, 0xD8)))
+
+ImageInfo = namedtuple("ImageInfo", ["kind", "width", "height", "size"])
+
+
+class InvalidImageError(ValueError):
+    """File tidak dapat dibaca sebagai gambar."""
+
+
+def _jpeg_dimensions(header):
+    i = 2
+    n = len(header)
+    while i + 4 <= n:
+        if header[i] != 0xFF:
+            return None
+        marker = header[i + 1]
+        if marker == 0xFF:  # byte pengisi
+            i += 1
+            continue
+        if marker in _JPEG_STANDALONE:
+            i += 2
+            continue
+        if marker in (0xD9, 0xDA):  # EOI / SOS sebelum SOF: tidak ada dimensi
+            return None
+        length = struct.unpack(">H", header[i + 2:i + 4])[0]
+        if marker in _JPEG_SOF:
+            if i + 9 > n:
+                return None
+            height, width = struct.unpack(">HH", header[i + 5:i + 9])
+            return width, height
+        i += 2 + length
+    return None
+
+
+def sniff_image(header):
+    """
+    Menentukan tipe gambar dari magic bytes dan membaca dimensi dari PNG IHDR,
+    JPEG SOF atau header BMP.
+
+    :return: tuple (kind, width, height); width/height None jika belum ada di header.
+             None jika bukan PNG/JPEG/BMP.
+    """
+    if header.startswith(_PNG_SIGNATURE):
+        if len(header) >= 24 and header[12:16] == b"IHDR":
+            width, height = struct.unpack(">II", header[16:24])
+            return KIND_PNG, width, height
+        return KIND_PNG, None, None
+
+    if header.startswith(b"\xff\xd8\xff"):
+        dims = _jpeg_dimensions(header)
+        return (KIND_JPEG,) + (dims or (None, None))
+
+    if header.startswith(b"BM") and len(header) >= 26:
+        dib_size = struct.unpack("<I", header[14:18])[0]
+        if dib_size == 12:  # BITMAPCOREHEADER (OS/2)
+            width, height = struct.unpack("<HH", header[18:22])
+        else:
+            width, height = struct.unpack("<ii", header[18:26])
+        return KIND_BMP, abs(width), abs(height)  # tinggi negatif = top-down
+
+    return None
+
+
+def _check(name, kind_dims, size, max_bytes, max_pixels):
+    if kind_dims is None:
+        raise InvalidImageError(f"File '{name}' bukan gambar yang valid.")
+    kind, width, height = kind_dims
+    if size > max_bytes:
+        raise InvalidImageError(f"File '{name}' terlalu besar ({size} byte).")
+    if width is not None and (width == 0 or height == 0 or width * height > max_pixels):
+        raise InvalidImageError(f"Dimensi gambar '{name}' tidak didukung ({width}x{height}).")
+    return ImageInfo(kind, width, height, size)
+
+
+def probe_bytes(data, name="<bytes>", max_bytes=MAX_IMAGE_BYTES, max_pixels=MAX_IMAGE_PIXELS):
+    """Cek isi gambar yang sudah ada di memori, mengembalikan ImageInfo atau InvalidImageError."""
+    return _check(name, sniff_image(data), len(data), max_bytes, max_pixels)
+
+
+def probe_file(path, max_bytes=MAX_IMAGE_BYTES, max_pixels=MAX_IMAGE_PIXELS):
+    """
+    Membuka file sekali: header dicek dulu, file yang bukan gambar atau terlalu besar
+    ditolak sebelum sisa isi file dibaca.
+
+    :return: tuple (ImageInfo, data) supaya decoder tidak perlu membuka file lagi.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        header = f.read(HEADER_BYTES)
+        kind_dims = sniff_image(header)
+        if kind_dims is not None and kind_dims[1] is None and size > len(header):
+            # SOF JPEG ada setelah metadata yang besar: dimensi dicek dari seluruh file
+            if size <= max_bytes:
+                header += f.read()
+                kind_dims = sniff_image(header)
+        info = _check(path, kind_dims, size, max_bytes, max_pixels)
+        data = header if len(header) >= size else header + f.read()
+    return info, data
+
+
+def is_image_file(path):
+    """True jika header file adalah PNG/JPEG/BMP (hanya membaca HEADER_BYTES pertama)."""
+    try:
+        with open(path, 'rb') as f:
+            return sniff_image(f.read(HEADER_BYTES)) is not None
+    except OSError:
+        return False
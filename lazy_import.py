@@ -0,0 +1,37 @@
+##########################################################################
+#Modul Lazy Import (dependency berat di-import saat pertama dipakai)     #
+##########################################################################
+import importlib
+
+
+class LazyModule:
+    """
+    Pengganti `import pandas as pd` di level modul: modul asli baru di-import saat atribut
+    pertama diakses (pd.DataFrame, cv2.imdecode, ...). Dengan begitu `import main` dan
+    `python main.py --help` tidak membayar import pandas / cv2 / PIL / qrcode / pyzbar, dan
+    setiap stage hanya meng-import dependency yang benar-benar dipakainya.
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            # importlib memakai import lock, aman dipanggil dari beberapa thread
+            module = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<LazyModule {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_import(name):
+    """LazyModule untuk modul `name` (mis. "pandas", "PIL.Image", "pyzbar.pyzbar")."""
+    return LazyModule(name)
@@ -1,49 +1,71 @@
 ##########################################################################
 #Modul Unzip File                                                        #
 ##########################################################################
+import io
 import os
+import sys
 import zipfile
-import pandas as pd
-import cv2
 import json
-import qrcode
-import shutil
+import hashlib
+import time
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 #from tqdm import tqdm
-from pyzbar.pyzbar import decode
-from PIL import Image, ImageDraw, UnidentifiedImageError
-
+from lazy_import import lazy_import
+from crc16 import crc16_hex, crc16_bulk
+from tlv import ModificationPlan, apply_plan_chunk, parse_declared
+from blanking import BlankingEngine
+from composer import TemplateComposer, load_encode_options
+from qr_render import render_qr
+from archive_writer import write_final_archive, format_stats, DEFAULT_COMPRESSION
+from decoder import (read_qr_code, decode_files, default_workers, iter_zip_qr, load_decode_roi, load_decode_strategies,
+                     summarize_strategies, decoder_key, member_output_path, ZipQrRecord, IMAGE_EXTENSIONS)
+from nested_zip import (extract_nested_zip as _extract_nested_zip, load_extract_limits, ExtractionLimitError,
+                        DEFAULT_MAX_DEPTH, DEFAULT_MAX_TOTAL_BYTES)
+from image_probe import is_image_file
+from metrics import METRICS, RateLimitedLog, instrument, measure, run_report
+from qr_validator import validate_many, summarize_errors, validation_report
+from tarif import load_tarif_classifier, DEFAULT_RULES as DEFAULT_TARIF_RULES, DEFAULT_RULES_PATH as DEFAULT_TARIF_RULES_PATH
+from result_store import ResultStore, iter_results, result_rows, DEFAULT_STORE_PATH, DEFAULT_CHUNK_ROWS
+from decode_cache import DecodeCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_ROWS, DEFAULT_MAX_BYTES
+from checkpoint import (CheckpointJournal, WorkItem, config_fingerprint, encode_image, file_stages, run_checkpointed,
+                        DEFAULT_JOURNAL_PATH, DEFAULT_CHUNK_SIZE)
+from scheduler import load_scheduler_options
+
+# pandas / PIL baru di-import oleh stage yang memakainya, bukan saat menu/CLI dibuka
+pd = lazy_import("pandas")
+Image = lazy_import("PIL.Image")
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Folder input dan output static
+# Folder input dan output static (default menu_utama, bisa diganti lewat cli.py)
 INPUT_FOLDER = "zip"
 OUTPUT_FOLDER = "unzipped_files"
+CONFIG_PATH = "config/config.json"
+EXCEL_PATH = "listQr.xlsx"
+OVERLAY_PATH = "overlay.png"
+BLANK_FOLDER = "qrBlank"
+MODIFIED_FOLDER = "qrModified"
+RULES_PATH = "config/config.txt"
+ZIP_SOURCE_FOLDER = "qrModifiedOutput"
+FINAL_ZIP_PATH = "final_output.zip"
 
 
 # Fungsi Validasi Gambar
 def validate_image(image_path):
-    try:
-        with Image.open(image_path):
-            return True
-    except UnidentifiedImageError:
-        return False
+    # Cukup cek magic bytes di header, tanpa membuka gambar dengan PIL
+    return is_image_file(image_path)
 
-def extract_nested_zip(file_path, output_folder):
-    with zipfile.ZipFile(file_path, 'r') as zip_ref:
-        temp_folder = os.path.join(output_folder, os.path.splitext(os.path.basename(file_path))[0])
-        os.makedirs(temp_folder, exist_ok=True)
-        zip_ref.extractall(temp_folder)
-
-        for root, _, files in os.walk(temp_folder):
-            for file in files:
-                nested_file_path = os.path.join(root, file)
-                if zipfile.is_zipfile(nested_file_path):
-                    extract_nested_zip(nested_file_path, output_folder)
+def extract_nested_zip(file_path, output_folder, max_depth=DEFAULT_MAX_DEPTH,
+                       max_total_bytes=DEFAULT_MAX_TOTAL_BYTES):
+    """Ekstrak zip beserta zip bersarang (lihat nested_zip.extract_nested_zip), mengembalikan list file."""
+    return _extract_nested_zip(file_path, output_folder, max_depth=max_depth, max_total_bytes=max_total_bytes)
 
 # Fungsi Proses Ekstraksi ZIP
-def process_zip_file(zip_file_name):
+def process_zip_file(zip_file_name, stream=False):
     zip_file_path = os.path.join(INPUT_FOLDER, zip_file_name)
     output_directory = os.path.join(OUTPUT_FOLDER, os.path.splitext(zip_file_name)[0])
 
@@ -51,45 +73,87 @@ def process_zip_file(zip_file_name):
         logging.error(f"File '{zip_file_path}' bukan file ZIP yang valid.")
         return
 
+    if stream:
+        # Mode streaming: decode langsung dari ZIP tanpa ekstrak ke disk
+        qr_results = [
+            {'file': os.path.basename(record.member_name), 'qr_data': record.qr_string}
+            for record in iter_zip_qr([zip_file_path], extensions=IMAGE_EXTENSIONS)
+            if record.qr_string
+        ]
+        _log_qr_results(qr_results, "Tidak ditemukan QR Code yang valid.")
+        return
+
     # Buat folder output
     os.makedirs(output_directory, exist_ok=True)
 
+    config = load_config(CONFIG_PATH) if os.path.exists(CONFIG_PATH) else {}
     try:
-        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-            zip_ref.extractall(output_directory)
-            logging.info(f"Berhasil mengekstrak file ZIP ke '{output_directory}'.")
+        # Zip bersarang ikut diekstrak ke OUTPUT_FOLDER/<nama zip bersarang>/
+        extracted = extract_nested_zip(zip_file_path, OUTPUT_FOLDER, **load_extract_limits(config))
+        logging.info(f"Berhasil mengekstrak file ZIP ke '{output_directory}'.")
     except zipfile.BadZipFile:
         logging.error(f"File '{zip_file_path}' rusak.")
         return
+    except ExtractionLimitError as e:
+        logging.error(f"Ekstraksi '{zip_file_path}' dihentikan: {e}")
+        return
 
-    # Membaca QR Code dari gambar
+    # Membaca QR Code hanya dari file yang baru diekstrak
     qr_results = []
-    for root, _, files in os.walk(output_directory):
-        for file in files:
-            if file.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
-                file_path = os.path.join(root, file)
-                if validate_image(file_path):
-                    qr_data = read_qr_code(file_path)
-                    if qr_data:
-                        qr_results.append({'file': file, 'qr_data': qr_data})
-        
+    for file_path in extracted:
+        if file_path.lower().endswith(IMAGE_EXTENSIONS):
+            qr_data = read_qr_code(file_path, skip_invalid=True)
+            if qr_data:
+                qr_results.append({'file': os.path.basename(file_path), 'qr_data': qr_data})
+
 
     # Menampilkan hasil
+    _log_qr_results(qr_results, "Tidak ditemukan QR Code yang valid.")
+
+def _log_qr_results(qr_results, empty_message):
     if qr_results:
-        logging.info("Hasil pembacaan QR Code:")
+        logging.info(f"Hasil pembacaan QR Code ({len(qr_results)} file):")
+        log = RateLimitedLog(first=20)
         for result in qr_results:
-            logging.info(f"File: {result['file']} - QR Code: {result['qr_data']}")
+            log.log("qr", f"File: {result['file']} - QR Code: {result['qr_data']}")
+        log.summary()
     else:
-        logging.warning("Tidak ditemukan QR Code yang valid.")
+        logging.warning(empty_message)
+
+@instrument("batch_unzip", items=0)
+def batch_unzip(folder_path, workers=None, chunksize=None, stream=False, roi=None, cache=None, store=None,
+                export_excel=True, classifier=None, strategies=None, output_folder=None, excel_path=None):
+    """
+    Unzip semua file zip di folder_path, baca QR dan simpan ke listQr.xlsx.
+
+    Dengan stream=True, setiap member dibaca langsung dari ZIP ke memori dan di-decode
+    dengan cv2.imdecode. Gambar tetap ditulis ke unzipped_files (dibutuhkan menu 2),
+    tetapi tidak dibaca ulang dari disk.
+
+    roi (x0, y0, x1, y1) dari load_decode_roi membatasi decode ke area QR; jika area
+    tersebut tidak menghasilkan QR, strategi berikutnya dicoba berurutan (scan seluruh gambar,
+    binarize, upscale, cv2.QRCodeDetector), lihat load_decode_strategies.
+
+    cache (DecodeCache) membuat run ulang hanya men-decode archive yang baru/berubah.
+
+    store (ResultStore) menyimpan hasil ke Parquet/Feather/CSV; listQr.xlsx hanya ditulis
+    jika export_excel=True.
+
+    classifier (TarifClassifier) menentukan tarif, default dari config/tarif.txt. QR yang
+    tidak cocok dengan aturan tarif dilaporkan di akhir.
 
-def batch_unzip(folder_path):
+    output_folder (gambar hasil ekstrak) dan excel_path (listQr.xlsx) default di sebelah
+    folder_path: <folder_path>/../unzipped_files dan <folder_path>/../listQr.xlsx.
+
+    :return: Jumlah baris yang disimpan, None jika folder tidak ada atau tidak berisi file zip.
+    """
     # Periksa apakah folder ada
     if not os.path.isdir(folder_path):
         print(f"Folder '{folder_path}' tidak ditemukan.")
         return
 
     # Buat folder untuk menyimpan hasil ekstraksi
-    output_folder = os.path.join(folder_path, "../unzipped_files")
+    output_folder = output_folder or os.path.join(folder_path, "../unzipped_files")
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
@@ -106,31 +170,157 @@ def batch_unzip(folder_path):
     # List untuk menyimpan data file, QR string, dan tarif
     data = []
 
-    for zip_file in zip_files:
-        zip_path = os.path.join(folder_path, zip_file)
-
-        # Ekstrak file zip
-        try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(output_folder)
-                print(f"Berhasil mengekstrak '{zip_file}' ke folder '{output_folder}'.")
-        except zipfile.BadZipFile:
-            print(f"Gagal mengekstrak '{zip_file}': File zip rusak.")
-
-    
+    if cache is not None:
+        zip_paths = [os.path.join(folder_path, f) for f in zip_files]
+        results = _decode_archives_cached(zip_paths, output_folder, cache, workers, chunksize, stream, roi,
+                                          strategies)
+    elif stream:
+        zip_paths = [os.path.join(folder_path, f) for f in zip_files]
+        records = list(iter_zip_qr(zip_paths, extract_folder=output_folder, roi=roi, strategies=strategies))
+        METRICS.add("batch_unzip", bytes_written=sum(record.size for record in records))
+        results = [
+            (os.path.basename(record.member_name), f"{record.zip_name}/{record.member_name}",
+             record.qr_string, record.error, record.strategy)
+            for record in records
+        ]
+    else:
+        for zip_file in zip_files:
+            zip_path = os.path.join(folder_path, zip_file)
 
-    # Baca file hasil ekstraksi dan cari QR code
-    for root, _, files in os.walk(output_folder):
-        for file in files:
-            file_path = os.path.join(root, file)
-            qr_string = read_qr_code(file_path)
-            tarif = determine_tarif(qr_string)
-            data.append({"filename": file, "qrstring": qr_string, "tarif": tarif})
+            # Ekstrak file zip
+            try:
+                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                    zip_ref.extractall(output_folder)
+                    METRICS.add("batch_unzip", bytes_written=sum(info.file_size for info in zip_ref.infolist()))
+                    print(f"Berhasil mengekstrak '{zip_file}' ke folder '{output_folder}'.")
+            except zipfile.BadZipFile:
+                print(f"Gagal mengekstrak '{zip_file}': File zip rusak.")
+
+        # Baca file hasil ekstraksi dan cari QR code
+        extracted_files = []
+        for root, _, files in os.walk(output_folder):
+            for file in files:
+                extracted_files.append((file, os.path.join(root, file)))
+
+        # Decode QR secara paralel, urutan hasil tetap sama dengan urutan file
+        decoded = decode_files([file_path for _, file_path in extracted_files],
+                               workers=workers, chunksize=chunksize, roi=roi, strategies=strategies)
+        results = [
+            (file, file_path, qr_string, error, strategy)
+            for (file, file_path), (qr_string, error, strategy) in zip(extracted_files, decoded)
+        ]
+
+    failed = 0
+    log = RateLimitedLog()
+    for file, source, qr_string, error, *_ in results:
+        if error:
+            failed += 1
+            log.log("gagal baca QR", f"Gagal membaca QR dari '{source}': {error}", logging.WARNING)
+        elif not qr_string:
+            log.log("QR tidak terbaca", f"QR tidak terbaca dengan semua strategi: '{source}'", logging.WARNING)
+        data.append({"filename": file, "qrstring": qr_string})
+    log.summary(logging.WARNING)
+
+    # Tarif sekaligus untuk satu kolom; selalu dihitung ulang agar perubahan config/tarif.txt
+    # juga berlaku untuk archive yang diambil dari cache
+    classifier = classifier or get_tarif_classifier()
+    qr_strings = [row["qrstring"] for row in data]
+    tarifs = classifier.classify_many(qr_strings)
+    for row, tarif in zip(data, tarifs):
+        row["tarif"] = tarif
+    classifier.report_unmatched([row["filename"] for row in data], qr_strings, tarifs)
+
+    METRICS.add("batch_unzip", items=len(results), failures=failed,
+                bytes_read=sum(os.path.getsize(os.path.join(folder_path, f)) for f in zip_files),
+                **summarize_strategies(row[4] for row in results))
+
+    if failed:
+        print(f"{failed} dari {len(results)} file gagal dibaca.")
+    summary = summarize_strategies(row[4] for row in results)
+    print("Decode per strategi: " + ", ".join(f"{strategy} {count}" for strategy, count in summary.items()))
+
+    if cache is not None:
+        cache.evict()
+        print(cache.summary())
+
+    _save_list_qr(data, folder_path, store, export_excel, excel_path)
+    return len(data)
+
+def _decode_archives_cached(zip_paths, output_folder, cache, workers, chunksize, stream, roi, strategies=None):
+    """
+    Decode per archive dengan cache: archive yang tidak berubah diambil dari cache,
+    hanya archive baru/berubah yang di-decode lalu disimpan ke cache.
+    Mengembalikan list (file, source, qr_string, error, strategy) sesuai urutan zip_paths;
+    tarif dihitung oleh batch_unzip.
+    """
+    # Strategi decode ikut kunci cache: QR yang dulu gagal dibaca dicoba lagi dengan strategi baru
+    cache_key = decoder_key(roi, strategies)
+    cached = {zip_path: cache.lookup(zip_path, cache_key) for zip_path in zip_paths}
+    pending = [zip_path for zip_path in zip_paths if cached[zip_path] is None]
+
+    # Decode archive yang tidak ada di cache
+    decoded = {zip_path: [] for zip_path in pending}
+    if stream:
+        by_name = {os.path.basename(zip_path): zip_path for zip_path in pending}
+        for record in iter_zip_qr(pending, extract_folder=output_folder, roi=roi, strategies=strategies):
+            decoded[by_name[record.zip_name]].append(
+                (record.member_name, record.qr_string, record.error, record.strategy))
+            METRICS.add("batch_unzip", bytes_written=record.size)
+    else:
+        members = []
+        for zip_path in pending:
+            try:
+                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                    zip_ref.extractall(output_folder)
+                    names = [info.filename for info in zip_ref.infolist() if not info.is_dir()]
+                    METRICS.add("batch_unzip", bytes_written=sum(info.file_size for info in zip_ref.infolist()))
+                members.extend((zip_path, name) for name in names)
+            except zipfile.BadZipFile:
+                print(f"Gagal mengekstrak '{os.path.basename(zip_path)}': File zip rusak.")
+        results = decode_files([member_output_path(output_folder, name) for _, name in members],
+                               workers=workers, chunksize=chunksize, roi=roi, strategies=strategies)
+        for (zip_path, name), (qr_string, error, strategy) in zip(members, results):
+            decoded[zip_path].append((name, qr_string, error, strategy))
+
+    for zip_path in pending:
+        cached[zip_path] = decoded[zip_path]
+        # Archive rusak tidak disimpan agar dicoba lagi pada run berikutnya
+        if zipfile.is_zipfile(zip_path):
+            cache.store(zip_path, cached[zip_path], cache_key)
+
+    rows = []
+    for zip_path in zip_paths:
+        if zip_path not in decoded:
+            # Cache hit: pastikan gambar tetap tersedia untuk menu 2 tanpa decode ulang
+            _extract_missing_members(zip_path, output_folder)
+        for name, qr_string, error, strategy in cached[zip_path]:
+            source = f"{os.path.basename(zip_path)}/{name}"
+            rows.append((os.path.basename(name), source, qr_string, error, strategy))
+    return rows
+
+def _extract_missing_members(zip_path, output_folder):
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for info in zip_ref.infolist():
+            if info.is_dir():
+                continue
+            output_path = member_output_path(output_folder, info.filename)
+            if not os.path.exists(output_path) or os.path.getsize(output_path) != info.file_size:
+                zip_ref.extract(info, output_folder)
+                METRICS.add("batch_unzip", bytes_written=info.file_size)
+
+def _save_list_qr(data, folder_path, store=None, export_excel=True, excel_path=None):
+    df = pd.DataFrame(data, columns=["filename", "qrstring", "tarif"])
+    if store is not None:
+        store.save(df)
+        print(f"Data berhasil disimpan ke result store: {store.root} ({store.format})")
+        if not export_excel:
+            return
 
     # Simpan data ke file Excel
-    excel_path = os.path.join(folder_path, "../listQr.xlsx")
-    df = pd.DataFrame(data)
+    excel_path = excel_path or os.path.join(folder_path, "../listQr.xlsx")
     df.to_excel(excel_path, index=False)
+    if store is not None:
+        store.mark_exported(excel_path)
 
     # Gunakan tqdm untuk menampilkan progress bar
     #with tqdm(total=len(df), desc="Menulis ke Excel", unit="baris") as pbar:
@@ -141,25 +331,8 @@ def batch_unzip(folder_path):
 
     print(f"Data berhasil disimpan ke file Excel: {excel_path}")
 
-# Fungsi Membaca QR Code
-def read_qr_code(image_path):
-    try:
-        image = cv2.imread(image_path)
-        if image is None:
-            logging.warning(f"File '{image_path}' bukan gambar yang valid.")
-            return None
-
-        decoded_objects = decode(image)
-        if decoded_objects:
-            return decoded_objects[0].data.decode('utf-8')
-        else:
-            return None
-    except Exception as e:
-        logging.error(f"Error membaca QR code dari file '{image_path}': {e}")
-        return None
-    
 # Fungsi Proses ZIP File secara Batch
-def process_all_zip_files():
+def process_all_zip_files(stream=False):
     if not os.path.exists(INPUT_FOLDER):
         os.makedirs(INPUT_FOLDER)
         logging.info(f"Folder input '{INPUT_FOLDER}' dibuat. Silakan masukkan file ZIP ke folder ini.")
@@ -171,6 +344,17 @@ def process_all_zip_files():
         logging.warning(f"Tidak ada file ZIP di folder '{INPUT_FOLDER}'.")
         return
 
+    if stream:
+        # Mode streaming: decode langsung dari ZIP tanpa ekstrak ke disk
+        zip_paths = [os.path.join(INPUT_FOLDER, f) for f in zip_files]
+        qr_results = [
+            {'file': os.path.basename(record.member_name), 'qr_data': record.qr_string}
+            for record in iter_zip_qr(zip_paths)
+            if record.qr_string
+        ]
+        _log_qr_results(qr_results, "Tidak ditemukan QR Code yang valid di file ZIP.")
+        return
+
     # Buat folder output utama jika belum ada
     os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
@@ -195,44 +379,43 @@ def process_all_zip_files():
     for root, _, files in os.walk(OUTPUT_FOLDER):
         for file in files:
             file_path = os.path.join(root, file)
-            if validate_image(file_path):
-                qr_data = read_qr_code(file_path)
-                if qr_data:
-                    qr_results.append({'file': file, 'qr_data': qr_data})
+            # File bukan gambar ditolak dari header, gambar hanya dibuka sekali
+            qr_data = read_qr_code(file_path, skip_invalid=True)
+            if qr_data:
+                qr_results.append({'file': file, 'qr_data': qr_data})
 
     # Menampilkan hasil
-    if qr_results:
-        logging.info("Hasil pembacaan QR Code:")
-        for result in qr_results:
-            logging.info(f"File: {result['file']} - QR Code: {result['qr_data']}")
-    else:
-        logging.warning("Tidak ditemukan QR Code yang valid di file hasil ekstraksi.")
+    _log_qr_results(qr_results, "Tidak ditemukan QR Code yang valid di file hasil ekstraksi.")
+
+
+# Fungsi Inventory ZIP (read-only, tanpa menulis ke disk)
+def inventory_zip_folder(folder_path, roi=None, classifier=None):
+    """Membaca QR dari semua file zip di folder_path langsung dari memori dan mengembalikan DataFrame."""
+    if not os.path.isdir(folder_path):
+        print(f"Folder '{folder_path}' tidak ditemukan.")
+        return None
+
+    zip_paths = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith('.zip')]
+    records = list(iter_zip_qr(zip_paths, roi=roi))
+    df = pd.DataFrame(records, columns=ZipQrRecord._fields)
+    df["tarif"] = (classifier or get_tarif_classifier()).classify_many(record.qr_string for record in records)
+
+    found = int(df["qr_string"].notna().sum())
+    print(f"Inventory: {len(zip_paths)} file zip, {len(df)} file, {found} QR terbaca.")
+    return df
 
+# Aturan bawaan (isi config/tarif.txt), dipakai juga oleh fixtures
+TARIF_MAPPING = DEFAULT_TARIF_RULES
 
+def get_tarif_classifier(config=None):
+    """TarifClassifier dari file aturan config['tarif_rules'] (default config/tarif.txt)."""
+    rules_path = (config or {}).get('tarif_rules', DEFAULT_TARIF_RULES_PATH)
+    return load_tarif_classifier(rules_path)
 
-def determine_tarif(qr_string):
+def determine_tarif(qr_string, classifier=None):
     if not qr_string:
         return None
-    
-    tarif_mapping = {
-        "SBY REGULER": 6200,
-        "SBY KHUSUS": 2000,
-        "BMS REGULER": 3900,
-        "BMS KHUSUS": 2000,
-        "PLG REGULER": 4000,
-        "PLG KHUSUS": 2000,
-        "BPN REGULER": 4500,
-        "BPN KHUSUS": 2000,
-        "SKT REGULER": 3700,
-        "SKT KHUSUS": 2000,
-        "MKS REGULER": 4600,
-        "MKS KHUSUS": 2000
-    }
-
-    for key, value in tarif_mapping.items():
-        if key in qr_string:
-            return value
-    return None
+    return (classifier or get_tarif_classifier()).classify(qr_string)
 
 ##########################################################################
 #hapus qr
@@ -242,47 +425,162 @@ def load_config(config_path):
         config = json.load(config_file)
     return config
 
-def overlay_images(base_image_path, overlay_image_path, output_path, position):
-    base_image = Image.open(base_image_path).convert("RGBA")
-    overlay_image = Image.open(overlay_image_path).convert("RGBA")
+def load_result_store(config, excel_path="listQr.xlsx"):
+    """
+    ResultStore dari config ('result_store', 'result_format'). listQr.xlsx di-import jika
+    store belum ada atau file Excel diedit manual setelah disimpan/di-export.
+    """
+    store = ResultStore(config.get('result_store', DEFAULT_STORE_PATH), config.get('result_format'))
+    if os.path.exists(excel_path) and (not store.exists() or store.excel_is_newer(excel_path)):
+        print(f"Import '{excel_path}' ke result store '{store.root}'...")
+        store.import_excel(excel_path)
+        store.mark_exported(excel_path)
+    return store
+
+def load_chunk_rows(config):
+    """Baris per chunk untuk menu 2-5 ('chunk_rows' di config.json), 0/None berarti tanpa chunk."""
+    return config.get('chunk_rows', DEFAULT_CHUNK_ROWS) or None
+
+def export_results(store, config, excel_path, columns=None):
+    # Excel hanya export untuk dibuka manual, tidak dibaca lagi oleh menu lain
+    if config.get('export_excel', False):
+        store.export_excel(excel_path, columns)
+        print(f"Hasil juga di-export ke {excel_path}")
+
+@lru_cache(maxsize=8)
+def _cached_blanking_engine(overlay_image_path, x, y, width, height):
+    return BlankingEngine(overlay_image_path, {'x': x, 'y': y, 'width': width, 'height': height})
+
+def get_blanking_engine(overlay_image_path, position):
+    """BlankingEngine dengan overlay yang sudah di-resize, di-cache per overlay + posisi."""
+    return _cached_blanking_engine(overlay_image_path, position['x'], position['y'],
+                                   position['width'], position['height'])
 
-    overlay_resized = overlay_image.resize((position['width'], position['height']))
-    position_tuple = (position['x'], position['y'])
+def overlay_images(base_image_path, overlay_image_path, output_path, position):
+    get_blanking_engine(overlay_image_path, position).blank_file(base_image_path, output_path)
 
-    combined = Image.new("RGBA", base_image.size)
-    combined.paste(base_image, (0, 0))
-    combined.paste(overlay_resized, position_tuple, mask=overlay_resized)
+def open_checkpoint_journal(config, stage, *config_parts):
+    """CheckpointJournal untuk stage, None jika 'checkpoint' di config.json bernilai false."""
+    if not config.get('checkpoint', True):
+        return None
+    return CheckpointJournal(stage, config_fingerprint(*config_parts),
+                             config.get('checkpoint_journal', DEFAULT_JOURNAL_PATH))
 
-    combined.convert("RGB").save(output_path)
+def _run_checkpointed_chunks(config, journal, chunks, make_items, stages, executor, on_result, name):
+    """
+    run_checkpointed per chunk baris (lihat load_chunk_rows): daftar WorkItem hanya dibuat
+    untuk satu chunk, journal dan executor dipakai ulang. Mengembalikan (total, skipped).
+    """
+    total = skipped = 0
+    for chunk in chunks:
+        items = make_items(chunk)
+        total += len(items)
+        chunk_skipped, _ = run_checkpointed(journal, items, stages, executor,
+                                            config.get('checkpoint_chunk_size', DEFAULT_CHUNK_SIZE), on_result,
+                                            name=name, **load_scheduler_options(config))
+        skipped += chunk_skipped
+    return total, skipped
+
+@instrument("process_images_hapusimages", items=0)
+def process_images_hapusimages(excel_path, folder_path, overlay_image_path, output_folder, config_path, executor=None):
+    """
+    Hapus QR pada semua file di listQr.xlsx lewat scheduler.run_staged: baca dan tulis file
+    di thread I/O, blank + encode di executor (ThreadPoolExecutor/ProcessPoolExecutor, default
+    thread pool sebanyak CPU), dibatasi 'memory_budget_mb' di config.json.
 
-def process_images_hapusimages(excel_path, folder_path, overlay_image_path, output_folder, config_path):
+    excel_path boleh berupa ResultStore, DataFrame, folder store atau file Excel/CSV, dibaca per
+    'chunk_rows' baris. Output yang sudah tercatat di checkpoint journal (input + overlay +
+    posisi sama) dilewati, sehingga run yang terhenti bisa dilanjutkan.
+    """
     # Load configuration
     config = load_config(config_path)
     position = config.get('position', {'x': 0, 'y': 0, 'width': 100, 'height': 100})
+    engine = get_blanking_engine(overlay_image_path, position)
 
-    # Load Excel file
-    df = pd.read_excel(excel_path)
-    filenames = df['filename'].tolist()
-
-    # Ensure output folder exists
+    # Cukup baca kolom filename, per chunk
+    chunks = iter_results(excel_path, ['filename'], load_chunk_rows(config))
+    total_rows = result_rows(excel_path) or "?"
     os.makedirs(output_folder, exist_ok=True)
 
-    # Process each file
-    for filename in filenames:
-        base_image_path = os.path.join(folder_path, filename)
-        output_path = os.path.join(output_folder, filename)
+    def make_items(chunk):
+        return [WorkItem(os.path.join(output_folder, filename), os.path.join(folder_path, filename), None)
+                for filename in chunk['filename']]
 
-        if os.path.exists(base_image_path):
-            try:
-                overlay_images(base_image_path, overlay_image_path, output_path, position)
-                print(f"Processed: {filename}")
-            except Exception as e:
-                print(f"Error processing {filename}: {e}")
+    # Process each file
+    log = RateLimitedLog()
+    counts = {"ok": 0, "error": 0, "not_found": 0}
+    bytes_read = bytes_written = 0
+
+    def on_result(result):
+        nonlocal bytes_read, bytes_written
+        filename = os.path.basename(result.item.output_path)
+        counts[result.status] += 1
+        if result.status == "ok":
+            bytes_read += os.path.getsize(result.item.input_path)
+            bytes_written += result.output_size
+            log.log("processed", f"Processed: {filename} ({counts['ok']}/{total_rows})")
+        elif result.status == "error":
+            log.log("error", f"Error processing {filename}: {result.error}", logging.ERROR)
         else:
-            print(f"File not found: {filename}")
+            log.log("not_found", f"File not found: {filename}", logging.WARNING)
+
+    journal = open_checkpoint_journal(config, "hapus_qr", engine.overlay_hash, position)
+    try:
+        total, skipped = _run_checkpointed_chunks(config, journal, chunks, make_items,
+                                                  file_stages(engine.blank_encoded), executor, on_result, "hapus_qr")
+    finally:
+        if journal is not None:
+            journal.close()
+    log.summary()
+
+    METRICS.add("process_images_hapusimages", items=total - skipped,
+                failures=counts["error"] + counts["not_found"],
+                bytes_read=bytes_read, bytes_written=bytes_written, skipped=skipped, **counts)
+    print(f"Hapus QR selesai: {counts['ok']} berhasil, {counts['error']} error, {counts['not_found']} tidak ditemukan, "
+          f"{skipped} dilewati (sudah ada di checkpoint).")
 
 #############################################################################
 # 3 Modify QR
+def validation_report_path(config, run_name):
+    report_dir = config.get('report_dir', "reports") or "."
+    return os.path.join(report_dir, f"qr_validation_{run_name}_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+
+@instrument("validate_qr", items=0)
+def validate_qr_frame(df, config, run_name, data_column="qrstring", report_path=None):
+    """
+    Validasi QR string sumber (CRC tag 63, panjang TLV, tag ganda / tidak urut) sebelum menu 3
+    atau menu 4 menulis ulang payload. Baris tidak valid ditulis ke report_dir/
+    qr_validation_<run>_<waktu>.csv dan (default, 'skip_invalid_qr' di config.json) tidak
+    dimodifikasi, karena CRC baru akan menutupi payload yang rusak.
+
+    :param report_path: Laporan yang sama untuk semua chunk satu run (baris ditambahkan),
+                        None berarti file baru dari validation_report_path.
+    :return: df yang akan dimodifikasi (hanya baris valid jika skip_invalid_qr).
+    """
+    qr_strings = df[data_column].tolist()
+    results = validate_many(qr_strings)
+    invalid = sum(1 for errors in results if errors)
+    summary = summarize_errors(results)
+    METRICS.add("validate_qr", items=len(results), failures=invalid, **summary)
+    if not invalid:
+        print(f"Validasi QR: {len(results)} payload valid.")
+        return df
+
+    report = validation_report(qr_strings, results,
+                               df['filename'].tolist() if 'filename' in df.columns else None)
+    report["row"] = df.index[report["row"]]
+    report_path = report_path or validation_report_path(config, run_name)
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    exists = os.path.exists(report_path)
+    report.to_csv(report_path, mode="a" if exists else "w", header=not exists, index=False)
+    print(f"Validasi QR: {invalid} dari {len(results)} payload tidak valid "
+          f"({', '.join(f'{code} {count}' for code, count in summary.items())}), laporan: {report_path}")
+
+    if config.get('skip_invalid_qr', True):
+        print(f"{invalid} baris tidak valid tidak dimodifikasi.")
+        return df[[not errors for errors in results]]
+    return df
+
 def calculate_crc(data: bytes, polynomial: int = 0x1021, initial_value: int = 0xFFFF) -> str:
 #def calculate_crc(data: str, polynomial: int = 0x1021, initial_value: int = 0xFFFF) -> str:
     """
@@ -293,133 +591,214 @@ def calculate_crc(data: bytes, polynomial: int = 0x1021, initial_value: int = 0x
     :param initial_value: Nilai awal register CRC (default: 0xFFFF).
     :return: Nilai CRC 4 digit dalam format hexadecimal.
     """
-    crc = initial_value
-
-    for byte in data:
-        crc ^= (byte << 8)  # Masukkan byte ke register CRC
-        for _ in range(8):
-            if crc & 0x8000:  # Jika bit tertinggi adalah 1
-                crc = (crc << 1) ^ polynomial
-            else:
-                crc <<= 1
-            crc &= 0xFFFF  # Pastikan CRC tetap dalam 16-bit
-
-    return f"{crc:04X}"  # Mengembalikan CRC dalam 4 digit hexadecimal
+    return crc16_hex(data, polynomial, initial_value)
 
 def calculate_crc2(data: str, polynomial: int = 0x1021, initial_value: int = 0xFFFF) -> str:
-    crc = initial_value
     data = data[:-4]  # Hilangkan 4 digit terakhir sebelum menghitung CRC
-    data_bytes = data.encode("utf-8")  # Konversi string ke bytes
-    for byte in data_bytes:
-        crc ^= (byte << 8)
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = (crc << 1) ^ polynomial
-            else:
-                crc <<= 1
-            crc &= 0xFFFF
-    return f"{crc:04X}"
+    return crc16_hex(data.encode("utf-8"), polynomial, initial_value)
+
+def edit_qr_string_tarif_and_crc(qr_string: str, tarif) -> str:
+    """Versi satu string dari edit_data_after_148th_char_tarif_and_crc (hasil identik)."""
+    tarif = str(tarif)
+    if len(qr_string) > 4:
+        data = (qr_string[:10] + "12" + qr_string[12:148] + "5404" + tarif + qr_string[148:])[:-4]
+    else:
+        data = qr_string + "5404" + tarif
+    return data + calculate_crc(data.encode('utf-8'))
+
+def format_tarif(value):
+    """
+    Tarif sebagai teks untuk tag 54, None jika kosong (NaN/None/""). Kolom tarif menjadi float
+    jika ada baris tanpa tarif, 2000.0 tetap ditulis "2000".
+    """
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    text = str(value).strip()
+    return text or None
 
-def edit_data_after_148th_char_tarif_and_crc(df: pd.DataFrame, data_column: str, tarif_column: str):
+def edit_data_after_148th_char_tarif_and_crc(df: "pd.DataFrame", data_column: str, tarif_column: str):
     """
     Mengedit data dengan menambahkan string "5404" setelah karakter ke-148, menambahkan nilai kolom tarif setelah karakter ke-148,
     menghapus 4 karakter terakhir, dan menambahkan nilai CRC setelah karakter terakhir pada setiap baris.
+    Baris tanpa tarif (merchant tidak cocok dengan config/tarif.txt) dilaporkan dan tidak diubah.
 
     :param df: DataFrame yang akan diedit.
     :param data_column: Nama kolom data yang akan diedit.
     :param tarif_column: Nama kolom tarif yang nilainya akan disisipkan.
+    :return: Jumlah baris tanpa tarif yang dilewati.
     """
     if data_column in df.columns and tarif_column in df.columns:
-        df[data_column] = df.apply(
-            lambda row: (
-                # row[data_column][:148] + "5404" 
-                row[data_column][:10] + "12" + row[data_column][12:148] + "5404" + str(row[tarif_column]) + row[data_column][148:]
-            )[:-4] if len(row[data_column]) > 4 else row[data_column] + "5404" + str(row[tarif_column]),
-            axis=1
-        )
-        df[data_column] = df[data_column].astype(str).apply(
-            lambda x: x + calculate_crc(x.encode('utf-8'))
-        )
+        tarifs = [format_tarif(value) for value in df[tarif_column].tolist()]
+        has_tarif = [tarif is not None for tarif in tarifs]
+        skipped = len(tarifs) - sum(has_tarif)
+        if skipped:
+            names = df['filename'] if 'filename' in df.columns else df.index.to_series()
+            missing = [str(name) for name, ok in zip(names.tolist(), has_tarif) if not ok]
+            print(f"{skipped} baris tanpa tarif tidak dimodifikasi: {', '.join(missing[:10])}"
+                  f"{' ...' if skipped > 10 else ''}")
+
+        data = df.loc[has_tarif, data_column]
+        if data.empty:
+            return skipped
+        tarif = pd.Series([tarif for tarif in tarifs if tarif is not None], index=data.index, dtype=object)
+
+        # Operasi per kolom (tanpa apply per baris), hasil sama persis dengan versi lama
+        spliced = (
+            data.str.slice(0, 10) + "12" + data.str.slice(12, 148) + "5404" + tarif + data.str.slice(148)
+        ).str.slice(0, -4)
+        data = spliced.where(data.str.len() > 4, data + "5404" + tarif)
+
+        data_values = data.astype(str).tolist()
+        df.loc[has_tarif, data_column] = [x + crc for x, crc in zip(data_values, crc16_bulk(data_values))]
         print(f"Setiap baris defpada kolom '{data_column}' telah diperbarui dengan menambahkan '5404' setelah karakter ke-148, nilai tarif setelah karakter ke-148, menghapus 4 karakter terakhir, dan menambahkan nilai CRC di akhir baris.")
+        return skipped
     else:
         print(f"Kolom '{data_column}' atau '{tarif_column}' tidak ditemukan dalam file Excel.")
+        return 0
 
 
 
+@instrument("edit_tarif_store", items=0)
+def edit_tarif_store(store, output_store, config, data_column="qrstring", tarif_column="tarif"):
+    """
+    Menu 3 per 'chunk_rows' baris: setiap chunk dari store divalidasi, diedit (tarif + CRC) lalu
+    ditambahkan ke output_store, sehingga memori tidak bertambah dengan jumlah baris.
+
+    :return: Jumlah baris yang ditulis ke output_store.
+    """
+    report_path = validation_report_path(config, "menu3")
+    with output_store.chunk_writer(replace=True) as writer:
+        for chunk in store.iter_chunks(chunk_size=load_chunk_rows(config)):
+            # Payload sumber yang rusak dilaporkan (dan dilewati) sebelum CRC dihitung ulang
+            valid = validate_qr_frame(chunk, config, "menu3", data_column, report_path)
+            if len(valid) == len(chunk):
+                chunk = chunk.copy()
+                edit_data_after_148th_char_tarif_and_crc(chunk, data_column, tarif_column)
+            else:
+                # Baris tidak valid tetap ditulis dengan qrstring (dan CRC) asli, sama seperti menu 4
+                valid = valid.copy()
+                edit_data_after_148th_char_tarif_and_crc(valid, data_column, tarif_column)
+                chunk = chunk.copy()
+                chunk.loc[valid.index, data_column] = valid[data_column]
+            writer.append(chunk)
+    METRICS.add("edit_tarif_store", items=writer.rows)
+    return writer.rows
+
 #############################################################################
 
 #############################################################################
 #attach qr to aspi
-def generate_qr_code(data):
-    """Generate a QR code from a given string and return it as a PIL Image."""
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-    return qr.make_image(fill_color="black", back_color="white")
-
-def overlay_qr_on_image(image_path, qr_image, output_path, config):
-    """Overlay a QR code on a specific position in an image and save it."""
-    with Image.open(image_path) as base_image:
-        base_image = base_image.convert("RGBA")
-
-        # Resize QR code based on config
-        qr_width = config['position']['width']
-        qr_height = config['position']['height']
-        qr_image = qr_image.resize((qr_width, qr_height))
-
-        # Position QR code based on config
-        qr_position = (
-            config['position']['x'],
-            config['position']['y']
-        )
-
-        base_image.paste(qr_image, qr_position, qr_image if qr_image.mode == 'RGBA' else None)
-        base_image.save(output_path)
-
-def process_images(excel_file, image_folder, output_folder, config):
-    """Read Excel file, generate QR codes, and overlay them on images."""
-    # Load data from Excel
-    df = pd.read_excel(excel_file)
+def attach_encoded(config, item, data):
+    """
+    Compute stage menu 5 (checkpoint.file_stages): item.params berisi modifiedQr, data adalah
+    bytes template tanpa QR. Mengembalikan (sha256 input, bytes PNG hasil).
+    """
+    # Latency per gambar masuk histogram stage attach_qr
+    with measure("attach_qr") as span:
+        input_hash = hashlib.sha256(data).hexdigest()
+        # QR dirender langsung seukuran kotak config (integer scaling, di-cache per payload)
+        qr_image = render_qr(str(item.params), config['position']['width'], config['position']['height'])
+        with Image.open(io.BytesIO(data)) as base_image:
+            base_image = base_image.convert("RGBA")
+        base_image.paste(qr_image, (config['position']['x'], config['position']['y']),
+                         qr_image if qr_image.mode == 'RGBA' else None)
+        output = encode_image(base_image, item.output_path)
+        span.add_bytes(read=len(data), written=len(output))
+    return input_hash, output
+
+def compose_encoded(composer, item, data):
+    """Compute stage menu 5 mode compose: hapus QR lama + tempel QR baru, satu kali encode."""
+    with measure("compose_qr") as span:
+        input_hash, output = composer.compose_encoded(item, data)
+        span.add_bytes(read=len(data), written=len(output))
+    return input_hash, output
+
+def get_template_composer(overlay_image_path, config):
+    """TemplateComposer dengan BlankingEngine ter-cache dan opsi encode PNG dari config.json."""
+    position = config.get('position', {'x': 0, 'y': 0, 'width': 100, 'height': 100})
+    return TemplateComposer(get_blanking_engine(overlay_image_path, position), position,
+                            load_encode_options(config))
 
-    # Ensure output folder exists
-    os.makedirs(output_folder, exist_ok=True)
+@instrument("process_images", items=0)
+def process_images(excel_file, image_folder, output_folder, config, executor=None, composer=None):
+    """
+    Read results (ResultStore, DataFrame, store folder or Excel file), generate QR codes,
+    and overlay them on images. Reads and writes run on I/O threads while QR rendering and
+    PNG encoding run on executor (see scheduler.run_staged), so disk and CPU overlap.
 
-    for _, row in df.iterrows():
-        filename = row['filename']
-        #qrstring = row['qrstring']
-        qrstring = row['modifiedQr']
+    With composer (TemplateComposer), image_folder holds the original templates (menu 1
+    output) and the old QR is removed and the new one attached in one step with a single
+    PNG encode, so menu 2 is not needed.
 
-        image_path = os.path.join(image_folder, filename)
-        output_path = os.path.join(output_folder, filename)
+    Outputs already recorded in the checkpoint journal with the same input image, modifiedQr
+    and position are skipped, so an interrupted run resumes where it stopped.
 
-        if os.path.exists(image_path):
-            print(f"Processing {filename}...")
-            qr_image = generate_qr_code(qrstring)
-            overlay_qr_on_image(image_path, qr_image, output_path, config)
+    Rows are streamed in chunks of 'chunk_rows' (config.json), so only one chunk of work
+    items is held in memory however long the sheet is.
+    """
+    # Load only the columns needed, one chunk at a time
+    chunks = iter_results(excel_file, ['filename', 'modifiedQr'], load_chunk_rows(config))
+
+    # Ensure output folder exists
+    os.makedirs(output_folder, exist_ok=True)
+
+    def make_items(chunk):
+        # Rows without modifiedQr were not modified in menu 4
+        chunk = chunk.dropna(subset=['modifiedQr'])
+        return [WorkItem(os.path.join(output_folder, filename), os.path.join(image_folder, filename), str(qrstring))
+                for filename, qrstring in zip(chunk['filename'], chunk['modifiedQr'])]
+
+    log = RateLimitedLog()
+    counts = {"ok": 0, "error": 0, "not_found": 0}
+
+    def on_result(result):
+        filename = os.path.basename(result.item.output_path)
+        counts[result.status] += 1
+        if result.status == "ok":
+            log.log("processing", f"Processed {filename}")
+        elif result.status == "error":
+            METRICS.add("process_images", failures=1, error=1)
+            log.log("error", f"Error processing {filename}: {result.error}", logging.ERROR)
         else:
-            print(f"Image {filename} not found in {image_folder}. Skipping.")
+            METRICS.add("process_images", failures=1, not_found=1)
+            log.log("not_found", f"Image {filename} not found in {image_folder}. Skipping.", logging.WARNING)
+
+    if composer is None:
+        stage, compute, parts = "attach_qr", partial(attach_encoded, config), (config['position'],)
+    else:
+        stage, compute = "compose_qr", partial(compose_encoded, composer)
+        parts = (composer.engine.overlay_hash, composer.position, composer.options)
+    journal = open_checkpoint_journal(config, stage, *parts)
+    try:
+        total, skipped = _run_checkpointed_chunks(config, journal, chunks, make_items, file_stages(compute),
+                                                  executor, on_result, stage)
+    finally:
+        if journal is not None:
+            journal.close()
+    log.summary()
+    METRICS.add("process_images", items=total - skipped, skipped=skipped)
+    print(f"Attach QR selesai: {counts['ok']} berhasil, {counts['error']} error, {counts['not_found']} tidak ditemukan, "
+          f"{skipped} dilewati (sudah ada di checkpoint).")
 
 #############################################################################
 #zip
 # Fungsi untuk melakukan batch zip pada file PNG
-# Fungsi untuk melakukan batch zip pada file PNG
-def batch_zip_files():
-    folder_path = "qrModifiedOutput"
-    final_folder = "final"
-    
+@instrument("batch_zip_files", items=0)
+def batch_zip_files(folder_path="qrModifiedOutput", final_zip_path="final_output.zip",
+                    compression=DEFAULT_COMPRESSION, level=None, workers=None):
+    """
+    Zip setiap PNG di folder_path menjadi <nama>.zip secara paralel dan langsung dimasukkan
+    ke final_zip_path, tanpa menyimpan zip perantara di folder 'final'.
+
+    :param compression: 'store' (default, PNG sudah terkompresi) atau 'deflate'.
+    :param level: Level deflate (0-9) jika compression='deflate'.
+    """
     # Cek apakah folder ada
     if not os.path.exists(folder_path):
         print(f"Folder '{folder_path}' tidak ditemukan!")
         return
-    
-    # Cek apakah folder final ada, jika tidak buat folder tersebut
-    if not os.path.exists(final_folder):
-        os.makedirs(final_folder)
 
     # Dapatkan daftar file PNG di dalam folder
     png_files = [f for f in os.listdir(folder_path) if f.endswith('.png')]
@@ -428,44 +807,15 @@ def batch_zip_files():
         print("Tidak ada file PNG di folder tersebut.")
         return
 
-    # Proses batch zip untuk setiap file PNG
-    for png_file in png_files:
-        # Tentukan path file PNG dan path file ZIP
-        png_file_path = os.path.join(folder_path, png_file)
-        zip_file_name = f"{os.path.splitext(png_file)[0]}.zip"
-        zip_file_path = os.path.join(folder_path, zip_file_name)
-        
-        # Buat file ZIP dan masukkan file PNG
-        with zipfile.ZipFile(zip_file_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            zipf.write(png_file_path, os.path.basename(png_file))
-
-        print(f"{png_file} telah di-zip menjadi {zip_file_path}")
-
-        # Pindahkan file ZIP ke folder final
-        shutil.move(zip_file_path, os.path.join(final_folder, zip_file_name))
-        print(f"{zip_file_name} dipindahkan ke folder 'final'.")
-
-    # Setelah semua file ZIP dipindahkan, lakukan zip seluruh file ZIP di folder final
-    zip_final_file(final_folder)
-
-
-# Fungsi untuk meng-zip seluruh file di dalam folder final
-def zip_final_file(final_folder):
-    final_zip_path = "final_output.zip"
-
-    # Dapatkan daftar semua file ZIP di dalam folder final
-    zip_files = [f for f in os.listdir(final_folder) if f.endswith('.zip')]
-
-    if not zip_files:
-        print("Tidak ada file ZIP di folder 'final' untuk di-zip.")
-        return
+    png_paths = [os.path.join(folder_path, png_file) for png_file in png_files]
+    stats = write_final_archive(png_paths, final_zip_path, compression, level, workers)
+    METRICS.add("batch_zip_files", items=stats["files"], bytes_read=stats["bytes_read"],
+                bytes_written=stats["bytes_written"])
+    print(f"Seluruh file ZIP telah digabungkan menjadi {final_zip_path}")
+    print(format_stats(stats))
+    return stats
 
-    # Buat file ZIP final dan masukkan seluruh file ZIP
-    with zipfile.ZipFile(final_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for zip_file in zip_files:
-            zipf.write(os.path.join(final_folder, zip_file), zip_file)
 
-    print(f"Seluruh file ZIP telah digabungkan menjadi {final_zip_path}")
 #############################################################################
 #Readme
 def show_about():
@@ -478,8 +828,13 @@ def show_about():
     Usage:
     1. Letakkan semua file gambar dalam format zip dalam folder zip atau folder lainnya yang berada selevel dengan file main.exe, 
     2. menu "1. Unzip File dan Simpan String QR serta nama file ke  File Excel", aplikasi akan melakukan unzip file dan membuat file excel dengan nama listQr.xlsx yang berisi field filename dan qrstring dan tarif
+       hasil disimpan di folder results/listQr (Parquet/Feather/CSV, lihat "result_store" di config.json); listQr.xlsx hanya di-export jika "export_excel": true.
+       listQr.xlsx yang diedit manual (mis. tambah kolom parameter) otomatis di-import lagi oleh menu 2-5
+       decode QR berjalan paralel dengan "decode_workers" process (0 = jumlah CPU) di config.json
     3. menu "2. Create Template PTEN without QR image" hapus QR existing dengan cara overlay gambar QR dengan kotak putih
     4. Menu "3. Modify QR mode Khusus Tarif" Modify QR mode Khusus Tarif, Tarif di isi dengan cara maping conten string code dengan excel dari list Merchant , contoh KEMENHUB SBY KHUSUS tarif 2000
+       sebelum menu 3 dan menu 4 menulis ulang payload, QR sumber divalidasi (CRC tag 63, panjang TLV, tag ganda / tidak urut);
+       baris tidak valid dilaporkan di reports/qr_validation_*.csv dan tetap ditulis dengan qrstring asli tanpa dimodifikasi ("skip_invalid_qr" di config.json)
     5. Menu "4. Modify QR String Dynamic by Config" 
        - Seting file config yang berada di /config/config.txt dengan format pie delimiter yang terdiri dari 4 kolom 
        kolom pertama flaging "+" untuk tambah dan "-" untuk menghapus
@@ -492,10 +847,19 @@ def show_about():
          +|54||$tarif --> menambahkan tag 54 dengan mengambil value parameter tarif pada file listQr.xlsx, untuk nama parameter bisa diisi apa saja namun harus di tambahkan juga di file excel, untuk length pada config tidak perlu diisi karena akan menghitung length pada value di excel
          -|54|| --> menghapus tag 54
     6. Menu "5. Attach QR Modified to Template PTEN" attach QRcode yang sudah di modifikasi pada template image qr yang lama (qr kosong), selain gambar qr conten lain tidak diubah 
+       jika "compose": true di config.json, menu 5 membaca template asli dari unzipped_files lalu hapus QR + tempel QR baru sekaligus (menu 2 tidak perlu),
+       ukuran/waktu encode PNG diatur dengan "png_compress_level" (0-9), "png_optimize" dan "png_mode" (RGBA, RGB atau P/palette)
+       menu 2 dan 5 bisa dilanjutkan jika terhenti: file yang sudah selesai dicatat di cache/checkpoint.db dan dilewati
+       selama gambar input, overlay/posisi dan modifiedQr tidak berubah (set "checkpoint": false di config.json untuk proses ulang semua)
+       menu 2-5 membaca result store per "chunk_rows" baris (default 200000, 0 = sekaligus) sehingga memori tetap datar untuk listQr yang sangat besar
     7. Menu "6. Zip Image QR Modified" melakukan proses Zip untuk gambar qr yang sudah di modifikasi
     8. Menu "7. Readme" Petunjuk pemakaian aplikasi
     9. Menu "8. Exit" keluar aplikasi
 
+    Tanpa menu (headless): python main.py <subcommand> [opsi], daftar subcommand lihat python main.py --help
+       unzip, inventory (baca QR dari zip tanpa ekstrak), hapus-qr, tarif, modify, attach, zip, parse, readme (sama dengan menu 1-7), path input/output bisa diganti dengan opsi
+       contoh: python main.py attach --compose --output qrModified, python main.py --config config/produksi.json tarif
+
     Developed by: masCha https://github.com/chaturap/modifQrStatic
     """
     print(about_text)
@@ -504,33 +868,7 @@ def show_about():
 #############################################################################
 
 def parse_tlv(data):
-    parsed_data = []
-    index = 0
-    while index < len(data):
-        tag = data[index:index+2]  # Tag terdiri dari 2 digit
-        length = int(data[index+2:index+4])  # Panjang terdiri dari 2 digit
-        value = data[index+4:index+4+length]  # Ambil nilai berdasarkan panjang
-        parsed_data.append({"tag": tag, "length": length, "value": value})
-        index += 4 + length
-    return parsed_data
-
-# Membaca file Excel dan mengambil kolom "qr string"
-def read_excel_file(file_path):
-    df = pd.read_excel(file_path)
-    if "qrstring" not in df.columns or "tarif" not in df.columns:
-        raise ValueError("Kolom yang diperlukan tidak ditemukan dalam file Excel.")
-    return df[["qrstring", "tarif"]].dropna()
-
-def parse_tlv(data):
-    parsed_data = []
-    index = 0
-    while index < len(data):
-        tag = data[index:index+2]  # Tag terdiri dari 2 digit
-        length = int(data[index+2:index+4])  # Panjang terdiri dari 2 digit
-        value = data[index+4:index+4+length]  # Ambil nilai berdasarkan panjang
-        parsed_data.append({"tag": tag, "length": length, "value": value})
-        index += 4 + length
-    return parsed_data
+    return [{"tag": item.tag, "length": item.length, "value": item.value} for item in parse_declared(data)]
 
 # Membaca file Excel dan mengambil kolom "qr string"
 def read_excel_file(file_path):
@@ -549,31 +887,253 @@ def read_config_file(file_path):
                 modifications.append({"action": "-", "tag": parts[1]})
     return modifications
 
+# Kompilasi config.txt sekali untuk dipakai ke semua baris
+def load_modification_plan(file_path):
+    return ModificationPlan.compile(read_config_file(file_path))
+
 # Memodifikasi QR string berdasarkan konfigurasi
+@instrument("modify_qr_string")
 def modify_qr_string(qr_string, row, modifications):
-    parsed = parse_tlv(qr_string)
-    parsed_dict = {item["tag"]: item for item in parsed}
-    
-    for mod in modifications:
-        if mod["action"] == "-":
-            parsed_dict.pop(mod["tag"], None)
-        elif mod["action"] == "+":
-            value = mod["value"]
-            if value.startswith("$"):
-                column_name = value[1:]  # Ambil nama kolom setelah $
-                if column_name in row:
-                    value = str(row[column_name])  # Ambil nilai dari kolom
-                else:
-                    print(f"Peringatan: Kolom '{column_name}' tidak ditemukan dalam file Excel.")
-                    continue
-            parsed_dict[mod["tag"]] = {"tag": mod["tag"], "length": len(value), "value": value}
-    
-    sorted_tags = sorted(parsed_dict.keys())
-    modified_qr = "".join(f"{parsed_dict[tag]['tag']}{parsed_dict[tag]['length']:02}{parsed_dict[tag]['value']}" for tag in sorted_tags)
-    #modified_qr = modified_qr[:-4] + calculate_crc2(modified_qr[:-4])  # Ganti 4 digit terakhir dengan CRC baru
-    modified_qr = modified_qr[:-4] + calculate_crc2(modified_qr)  # Ganti 4 digit terakhir dengan CRC baru
-    
-    return modified_qr # parse_tlv(modified_qr)  # Kembalikan QR yang dimodifikasi dan hasil parsing
+    """
+    modifications bisa berupa list dari read_config_file atau ModificationPlan yang sudah
+    dikompilasi (disarankan untuk banyak baris agar config tidak diproses ulang per baris).
+    """
+    if not isinstance(modifications, ModificationPlan):
+        modifications = ModificationPlan.compile(modifications)
+    return modifications.apply(qr_string, row)  # Tag diurutkan dan 4 digit terakhir diganti CRC baru
+
+# Jumlah baris minimum sebelum modifikasi dibagi ke process pool
+MODIFY_POOL_MIN_ROWS = 200000
+
+# Memodifikasi seluruh kolom QR string sekaligus
+@instrument("modify_qr_frame", items=0)
+def modify_qr_frame(df, modifications, data_column="qrstring", workers=None, chunk_size=None, verbose=False):
+    """
+    Memodifikasi semua QR string pada DataFrame dan mengembalikan kolom modifiedQr (Series).
+
+    Referensi "$kolom" di-resolve sekali per kolom, bukan per baris. Jika workers > 1 dan
+    jumlah baris >= MODIFY_POOL_MIN_ROWS, pekerjaan dibagi per chunk ke process pool.
+    Latency per baris dicatat di stage modify_qr_string.
+    Detail tag per baris hanya dicetak jika verbose=True.
+    """
+    plan = modifications if isinstance(modifications, ModificationPlan) else ModificationPlan.compile(modifications)
+
+    missing = [column_name for column_name in dict.fromkeys(plan.columns) if column_name not in df.columns]
+    for column_name in missing:
+        print(f"Peringatan: Kolom '{column_name}' tidak ditemukan dalam file Excel.")
+    if missing:
+        plan = plan.without_columns(missing)
+
+    qr_strings = df[data_column].tolist()
+    column_values = {
+        column_name: [str(value) for value in df[column_name].tolist()]
+        for column_name in dict.fromkeys(plan.columns)
+    }
+
+    total = len(qr_strings)
+    if workers and workers > 1 and total >= MODIFY_POOL_MIN_ROWS:
+        chunk_size = chunk_size or -(-total // (workers * 4))
+        tasks = [
+            (plan.steps, qr_strings[start:start + chunk_size],
+             {name: values[start:start + chunk_size] for name, values in column_values.items()})
+            for start in range(0, total, chunk_size)
+        ]
+        modified, timings = [], []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk, chunk_timings in executor.map(apply_plan_chunk, tasks):
+                modified.extend(chunk)
+                timings.extend(chunk_timings)
+    else:
+        timings = []
+        modified = plan.apply_columns(qr_strings, column_values, timings)
+    # Latency per QR string (p50/p95/p99) di stage yang sama dengan modify_qr_string
+    METRICS.record_many("modify_qr_string", timings)
+
+    if verbose:
+        for modified_qr in modified:
+            print(f"Modified QR String: {modified_qr}")
+            for item in parse_tlv(modified_qr):
+                print(f"Tag: {item['tag']}, Length: {item['length']}, Value: {item['value']}")
+
+    METRICS.add("modify_qr_frame", items=total)
+    return pd.Series(modified, index=df.index, name="modifiedQr")
+
+@instrument("modify_store", items=0)
+def modify_store(store, modifications, config, workers=None, verbose=False):
+    """
+    Menu 4 per 'chunk_rows' baris: setiap chunk divalidasi dan dimodifikasi, lalu kolom
+    modifiedQr ditulis bertahap (ResultStore.chunk_writer), kolom lain tidak ditulis ulang.
+    verbose=True mencetak detail tag setiap QR hasil modifikasi (lihat modify_qr_frame).
+
+    :return: Jumlah QR string yang dimodifikasi.
+    """
+    columns = [c for c in store.columns if c != "modifiedQr"]
+    report_path = validation_report_path(config, "menu4")
+    modified_rows = 0
+    with store.chunk_writer() as writer:
+        for chunk in store.iter_chunks(columns, load_chunk_rows(config)):
+            # Sama seperti read_excel_file: baris dengan nilai kosong tidak dimodifikasi
+            df = validate_qr_frame(chunk.dropna(), config, "menu4", report_path=report_path)
+            modified = modify_qr_frame(df, modifications, workers=workers, verbose=verbose)
+            writer.append(modified.reindex(chunk.index).to_frame())
+            modified_rows += len(df)
+    METRICS.add("modify_store", items=modified_rows)
+    return modified_rows
+
+#############################################################################
+# API tanpa menu: satu fungsi per pilihan menu dengan path yang bisa diatur,
+# dipakai oleh menu_utama dan cli.py (python main.py <subcommand>)
+def load_config_or_default(config_path=CONFIG_PATH):
+    """config.json, atau {} jika file tidak ada (nilai default setiap stage berlaku)."""
+    return load_config(config_path) if os.path.exists(config_path) else {}
+
+def run_unzip(folder_path, config_path=CONFIG_PATH, output_folder=None, excel_path=None, workers=None):
+    """
+    Menu 1: unzip semua zip di folder_path, baca QR + tarif, simpan ke result store.
+    workers: jumlah process decode, default 'decode_workers' di config.json (0 = jumlah CPU).
+
+    :return: ResultStore hasil, None jika folder tidak ada atau tidak berisi file zip.
+    """
+    config = load_config_or_default(config_path)
+    store = ResultStore(config.get('result_store', DEFAULT_STORE_PATH), config.get('result_format'))
+    with DecodeCache(config.get('decode_cache', DEFAULT_CACHE_PATH),
+                     config.get('decode_cache_max_rows', DEFAULT_MAX_ROWS),
+                     config.get('decode_cache_max_bytes', DEFAULT_MAX_BYTES)) as cache:
+        rows = batch_unzip(folder_path, workers=workers or config.get('decode_workers') or None,
+                           roi=load_decode_roi(config), cache=cache, store=store,
+                           export_excel=config.get('export_excel', False),
+                           classifier=get_tarif_classifier(config), strategies=load_decode_strategies(config),
+                           output_folder=output_folder, excel_path=excel_path)
+    return None if rows is None else store
+
+def run_hapus_qr(excel_path=EXCEL_PATH, image_folder=OUTPUT_FOLDER, overlay_image_path=OVERLAY_PATH,
+                 output_folder=BLANK_FOLDER, config_path=CONFIG_PATH, executor=None):
+    """
+    Menu 2: hapus QR lama pada gambar image_folder, hasil di output_folder.
+
+    :return: output_folder, None jika config, result store atau folder gambar tidak ada.
+    """
+    if not os.path.exists(config_path):
+        print(f"Error: Configuration file {config_path} not found.")
+        return None
+    # listQr.xlsx di-import jika lebih baru dari result store
+    store = load_result_store(load_config(config_path), excel_path)
+    if not store.exists():
+        print("Error: Result store / Excel file not found.")
+        return None
+    if not os.path.exists(image_folder):
+        print("Error: Image folder not found.")
+        return None
+    process_images_hapusimages(store, image_folder, overlay_image_path, output_folder, config_path, executor)
+    return output_folder
+
+def run_modify_tarif(excel_path=EXCEL_PATH, config_path=CONFIG_PATH, output_store_path=None,
+                     crc_excel_path="output_crc.xlsx", data_column="qrstring", tarif_column="tarif"):
+    """Menu 3: sisipkan tag 54 (tarif) + CRC baru, hasil di result store 'result_store_crc'."""
+    config = load_config_or_default(config_path)
+    store = load_result_store(config, excel_path)
+    if data_column not in store.columns or tarif_column not in store.columns:
+        print(f"Kolom '{data_column}' atau '{tarif_column}' tidak ditemukan dalam file Excel.")
+        return None
+
+    # Edit data pada setiap baris dan tambahkan CRC, per chunk langsung ke output store
+    output_store = ResultStore(output_store_path or config.get('result_store_crc', "results/output_crc"),
+                               config.get('result_format'))
+    edit_tarif_store(store, output_store, config, data_column, tarif_column)
+    print(f"Hasil CRC telah disimpan ke {output_store.root}")
+    export_results(output_store, config, crc_excel_path)
+    return output_store
+
+def run_modify_config(excel_path=EXCEL_PATH, rules_path=RULES_PATH, config_path=CONFIG_PATH, workers=None,
+                      verbose=False):
+    """
+    Menu 4: modifikasi QR sesuai rules_path (config.txt), hasil di kolom modifiedQr (verbose: cetak tag).
+
+    :return: Jumlah QR yang dimodifikasi, None jika result store atau rules_path tidak ada.
+    """
+    config = load_config_or_default(config_path)
+    store = load_result_store(config, excel_path)
+    if not store.exists():
+        print("Error: Result store / Excel file not found.")
+        return None
+    if not os.path.exists(rules_path):
+        print(f"Error: File aturan {rules_path} not found.")
+        return None
+    modifications = load_modification_plan(rules_path)
+
+    # Hanya kolom modifiedQr yang ditulis (per chunk), kolom lain di store tidak ditulis ulang
+    modified_rows = modify_store(store, modifications, config, workers=workers or default_workers(), verbose=verbose)
+    print(f"{modified_rows} QR string telah dimodifikasi.")
+    print(f"Hasil modifikasi QR telah disimpan dalam result store {store.root}.")
+    try:
+        export_results(store, config, excel_path)
+    except PermissionError:
+        print("Error: Tidak dapat menyimpan file. File Excel mungkin masih terbuka. Tutup file dan coba lagi.")
+    return modified_rows
+
+def run_attach_qr(excel_path=EXCEL_PATH, image_folder=BLANK_FOLDER, output_folder=MODIFIED_FOLDER,
+                  overlay_image_path=OVERLAY_PATH, config_path=CONFIG_PATH, compose=None,
+                  template_folder=OUTPUT_FOLDER, executor=None):
+    """
+    Menu 5: tempel modifiedQr ke template di image_folder. compose=True (default dari
+    'compose' di config.json) memakai template asli di template_folder, menu 2 tidak perlu.
+
+    :return: False jika config, result store atau folder gambar tidak ada.
+    """
+    if not os.path.exists(config_path):
+        print(f"Error: Configuration file {config_path} not found.")
+        return False
+    config = load_config(config_path)
+
+    store = load_result_store(config, excel_path)
+    if not store.exists():
+        print("Error: Result store / Excel file not found.")
+        return False
+    if "modifiedQr" not in store.columns:
+        print("Error: Kolom 'modifiedQr' tidak ditemukan, jalankan menu 4 terlebih dahulu.")
+        return False
+
+    # Mode compose: langsung dari template asli (menu 1), menu 2 tidak perlu dijalankan
+    composer = None
+    if config.get('compose', False) if compose is None else compose:
+        image_folder = template_folder
+        composer = get_template_composer(overlay_image_path, config)
+
+    if not os.path.exists(image_folder):
+        print("Error: Image folder not found.")
+        return False
+
+    process_images(store, image_folder, output_folder, config, executor, composer)
+    return True
+
+def run_zip(folder_path=ZIP_SOURCE_FOLDER, final_zip_path=FINAL_ZIP_PATH, config_path=CONFIG_PATH):
+    """Menu 6: zip setiap PNG di folder_path lalu gabungkan ke final_zip_path."""
+    config = load_config_or_default(config_path)
+    return batch_zip_files(folder_path, final_zip_path,
+                           compression=config.get('zip_compression', DEFAULT_COMPRESSION),
+                           level=config.get('zip_level'))
+
+def run_inventory(folder_path=INPUT_FOLDER, config_path=CONFIG_PATH, output_path=None):
+    """
+    Inventory read-only: baca QR + tarif dari semua zip di folder_path tanpa ekstrak ke disk.
+    output_path (opsional) menyimpan hasilnya sebagai CSV.
+
+    :return: DataFrame hasil, None jika folder tidak ada.
+    """
+    config = load_config_or_default(config_path)
+    df = inventory_zip_folder(folder_path, roi=load_decode_roi(config), classifier=get_tarif_classifier(config))
+    if df is not None and output_path:
+        df.to_csv(output_path, index=False)
+        print(f"Hasil inventory disimpan ke {output_path}")
+    return df
+
+def print_tlv(qr_strings):
+    """Cetak tag, length dan value setiap QR string."""
+    for qr in qr_strings:
+        print(f"QR String: {qr}")
+        for item in parse_tlv(qr):
+            print(f"Tag: {item['tag']}, Length: {item['length']}, Value: {item['value']}")
+        print("-")
 
 ########################
 
@@ -592,127 +1152,46 @@ def menu_utama():
         # Ambil input dari pengguna
         pilihan = input("Pilih opsi (1-8): ")
 
-        # Panggil fungsi sesuai dengan pilihan pengguna
-        if pilihan == '1':
-            #process_all_zip_files()
-            print("Unzip File")
-            folder_path = input("Masukkan path folder: ").strip()
-            batch_unzip(folder_path)
-            print("Processing complete. Check the output folder for results on folder "+folder_path)
-        elif pilihan == '2':
-            print("Hapus QR.")
-            excel_path = "listQr.xlsx"  # Path to the Excel file
-            folder_path = "unzipped_files"  # Folder containing base images
-            overlay_image_path = "overlay.png"  # Path to the overlay image
-            output_folder = "qrBlank"  # Folder to save output images
-            config_path = "config/config.json"  # Path to the configuration file
-
-           
-            process_images_hapusimages(excel_path, folder_path, overlay_image_path, output_folder, config_path)
-            print("Processing complete. Check the output folder for results on folder "+folder_path)
-            
-        elif pilihan == '3':
-            print("Modify QR")
-            #file_path = input("Masukkan path file Excel: ")
-            file_path ="listQr.xlsx"
-            sheet_name ="Sheet1"
-            #sheet_name = input("Masukkan nama sheet (kosongkan untuk default): ")
-            
-            try:
-                if sheet_name:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name)
-                else:
-                    df = pd.read_excel(file_path)
-                
-                # Asumsi kolom pertama berisi data untuk dihitung CRC
-                # data_column = input("Masukkan nama kolom yang berisi data: ")
-                data_column = "qrstring"
-                tarif_column = "tarif"
-                #tarif_column = input("Masukkan nama kolom yang berisi tarif: ")
-                if data_column not in df.columns or tarif_column not in df.columns:
-                    print(f"Kolom '{data_column}' atau '{tarif_column}' tidak ditemukan dalam file Excel.")
-                else:
-                    # Edit data pada setiap baris dan tambahkan CRC
-                    edit_data_after_148th_char_tarif_and_crc(df, data_column, tarif_column)
-                    
-                    # Simpan hasilnya
-                    output_file = "output_crc.xlsx"
-                    df.to_excel(output_file, index=False)
-                    print(f"Hasil CRC telah disimpan ke {output_file}")
-            except Exception as e:
-                print(f"Terjadi kesalahan: {e}")
-        elif pilihan == '5':
-            print("Attach QR to ASPI Format.")
-            # Static paths
-            #excel_file = "output_crc.xlsx"
-            excel_file = "listQr.xlsx"
-            image_folder = "qrBlank"
-            output_folder = "qrModified"
-
-            # Load configuration
-            config_file = "config/config.json"
-            if not os.path.exists(config_file):
-                print(f"Error: Configuration file {config_file} not found.")
-                continue
-
-            with open(config_file, 'r') as f:
-                config = json.load(f)
-
-            if not os.path.exists(excel_file):
-                print("Error: Excel file not found.")
-                continue
-
-            if not os.path.exists(image_folder):
-                print("Error: Image folder not found.")
-                continue
-
-            process_images(excel_file, image_folder, output_folder, config)
-            print("Processing complete. Check the output folder for results on folder "+output_folder)
-        elif pilihan == '6':
-             batch_zip_files()
-        elif pilihan == '9': #parsing
-             file_path = "listQr.xlsx"
-             qr_strings = read_excel_file(file_path)
-            
-             for qr in qr_strings:
-                parsed_data = parse_tlv(qr)  # Menggunakan langsung string sebagai input
-                
-                print(f"QR String: {qr}")
-                for item in parsed_data:
-                    print(f"Tag: {item['tag']}, Length: {item['length']}, Value: {item['value']}")
-                print("-")
-        elif pilihan == '4':
-             file_path = "listQr.xlsx"
-             df = read_excel_file(file_path)
-             config_path = "config/config.txt"
-             modifications = read_config_file(config_path)
-
-             modified_qr_list = []
-             for _, row in df.iterrows():
-                modified_qr = modify_qr_string(row["qrstring"], row, modifications)
-                modified_qr_list.append(modified_qr)
-                print(f"Modified QR String: {modified_qr}")
-                parsed_modified = parse_tlv(modified_qr)
-                for item in parsed_modified:
-                    print(f"Tag: {item['tag']}, Length: {item['length']}, Value: {item['value']}")
-
-             df["modifiedQr"] = modified_qr_list
-             try:
-                df.to_excel(file_path, index=False)
-                print("Hasil modifikasi QR telah disimpan dalam listQr.xlsx.")
-             except PermissionError:
-                print("Error: Tidak dapat menyimpan file. File Excel mungkin masih terbuka. Tutup file dan coba lagi.")
-                
-        elif pilihan == '7':
-             show_about()
-        elif pilihan == '8':
-            print("Keluar dari program., Terimakasih Assalamu'alaykum...")
-            break  # Keluar dari loop, program selesai
+        # Setiap pilihan menu adalah satu run: metrics dicatat ke reports/ (lihat config.json)
+        run_config = load_config_or_default(CONFIG_PATH)
+        with run_report(f"menu{pilihan}", run_config.get('report_dir', "reports"), run_config.get('profile', False)):
+            # Panggil fungsi sesuai dengan pilihan pengguna
+            if pilihan == '1':
+                print("Unzip File")
+                folder_path = input("Masukkan path folder: ").strip()
+                run_unzip(folder_path)
+                print("Processing complete. Check the output folder for results on folder "+folder_path)
+            elif pilihan == '2':
+                print("Hapus QR.")
+                run_hapus_qr()
+                print("Processing complete. Check the output folder for results on folder "+OUTPUT_FOLDER)
+            elif pilihan == '3':
+                print("Modify QR")
+                try:
+                    run_modify_tarif()
+                except Exception as e:
+                    print(f"Terjadi kesalahan: {e}")
+            elif pilihan == '4':
+                run_modify_config()
+            elif pilihan == '5':
+                print("Attach QR to ASPI Format.")
+                if run_attach_qr():
+                    print("Processing complete. Check the output folder for results on folder "+MODIFIED_FOLDER)
+            elif pilihan == '6':
+                run_zip()
+            elif pilihan == '9': #parsing
+                print_tlv(read_excel_file(EXCEL_PATH)["qrstring"])
+            elif pilihan == '7':
+                show_about()
+            elif pilihan == '8':
+                print("Keluar dari program., Terimakasih Assalamu'alaykum...")
+                break  # Keluar dari loop, program selesai
 
 # Panggil menu utama
 if __name__ == "__main__":
-<<<<<<< HEAD
-    menu_utama()
-=======
+    multiprocessing.freeze_support()  # Diperlukan untuk process pool pada main.exe (PyInstaller)
+    if len(sys.argv) > 1:
+        # Mode headless: python main.py <subcommand> ... (lihat cli.py)
+        from cli import main_cli
+        sys.exit(main_cli())
     menu_utama()
->>>>>>> 9917ff74dda5dff7fe7bbb8333eb6919f8adeaa1
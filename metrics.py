@@ -0,0 +1,284 @@
+##########################################################################
+#Modul Metrics (counter, histogram latency, byte, laporan JSON per run)  #
+##########################################################################
+import os
+import io
+import json
+import math
+import time
+import random
+import logging
+import threading
+import cProfile
+import pstats
+from contextlib import contextmanager
+from functools import wraps
+
+# Sample latency per stage dibatasi (reservoir sampling) agar memori tetap kecil pada 100k+ file
+MAX_SAMPLES = 10000
+PROFILE_TOP = 25
+
+
+def _percentile(sorted_samples, q):
+    if not sorted_samples:
+        return None
+    # Nearest-rank
+    index = max(0, math.ceil(q / 100 * len(sorted_samples)) - 1)
+    return sorted_samples[index]
+
+
+class StageStats:
+    """Statistik satu stage: jumlah panggilan, item, gagal, byte dan histogram latency."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.items = 0
+        self.failures = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.counters = {}
+        self._samples = []
+        self._rng = random.Random(0)
+
+    def observe(self, seconds):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if len(self._samples) < MAX_SAMPLES:
+            self._samples.append(seconds)
+        else:
+            slot = self._rng.randrange(self.calls)
+            if slot < MAX_SAMPLES:
+                self._samples[slot] = seconds
+
+    def to_dict(self):
+        samples = sorted(self._samples)
+        ms = lambda value: None if value is None else round(value * 1000, 3)
+        return {
+            "calls": self.calls,
+            "items": self.items,
+            "failures": self.failures,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "total_seconds": round(self.total_seconds, 4),
+            "items_per_second": round(self.items / self.total_seconds, 2) if self.total_seconds else None,
+            "latency_ms": {
+                "mean": ms(self.total_seconds / self.calls) if self.calls else None,
+                "p50": ms(_percentile(samples, 50)),
+                "p95": ms(_percentile(samples, 95)),
+                "p99": ms(_percentile(samples, 99)),
+                "max": ms(self.max_seconds),
+            },
+            "counters": dict(self.counters),
+        }
+
+
+class MetricsRegistry:
+    """Kumpulan StageStats, aman dipakai dari beberapa thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def _stage(self, name):
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = StageStats(name)
+        return stage
+
+    def record(self, name, seconds, failed=False, items=1, bytes_read=0, bytes_written=0):
+        with self._lock:
+            stage = self._stage(name)
+            stage.observe(seconds)
+            stage.items += items
+            stage.failures += bool(failed)
+            stage.bytes_read += bytes_read
+            stage.bytes_written += bytes_written
+
+    def record_many(self, name, seconds, failures=0, bytes_read=0, bytes_written=0):
+        """Seperti record() untuk banyak item sekaligus (latency per item diukur di worker)."""
+        with self._lock:
+            stage = self._stage(name)
+            for value in seconds:
+                stage.observe(value)
+            stage.items += len(seconds)
+            stage.failures += failures
+            stage.bytes_read += bytes_read
+            stage.bytes_written += bytes_written
+
+    def add(self, name, items=0, failures=0, bytes_read=0, bytes_written=0, **counters):
+        """Menambah angka ke stage tanpa mencatat latency (mis. hasil dari worker pool)."""
+        with self._lock:
+            stage = self._stage(name)
+            stage.items += items
+            stage.failures += failures
+            stage.bytes_read += bytes_read
+            stage.bytes_written += bytes_written
+            for counter, value in counters.items():
+                stage.counters[counter] = stage.counters.get(counter, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+    def __bool__(self):
+        return bool(self._stages)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stage.to_dict() for name, stage in self._stages.items()}
+
+
+METRICS = MetricsRegistry()
+
+
+class _Span:
+    __slots__ = ("items", "failed", "bytes_read", "bytes_written")
+
+    def __init__(self, items):
+        self.items = items
+        self.failed = False
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def add_bytes(self, read=0, written=0):
+        self.bytes_read += read
+        self.bytes_written += written
+
+
+@contextmanager
+def measure(name, items=1, registry=METRICS):
+    """
+    Mengukur satu blok sebagai satu panggilan stage. Exception dihitung sebagai gagal.
+
+        with measure("batch_zip_files") as span:
+            ...
+            span.add_bytes(read=..., written=...)
+    """
+    span = _Span(items)
+    start = time.perf_counter()
+    try:
+        yield span
+    except BaseException:
+        span.failed = True
+        raise
+    finally:
+        registry.record(name, time.perf_counter() - start, span.failed, span.items,
+                        span.bytes_read, span.bytes_written)
+
+
+def instrument(name, is_failure=None, items=1, registry=METRICS):
+    """
+    Decorator: setiap panggilan dicatat (latency) sebagai `items` item stage 'name'.
+    is_failure(result) opsional untuk fungsi yang mengembalikan None saat gagal.
+    Fungsi batch memakai items=0 lalu menambah jumlah item sendiri lewat registry.add().
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = bool(is_failure and is_failure(result))
+                return result
+            finally:
+                registry.record(name, time.perf_counter() - start, failed, items)
+        return wrapper
+    return decorator
+
+
+class RateLimitedLog:
+    """
+    Log per file dibatasi: `first` pesan pertama per key selalu ditulis, setelah itu
+    maksimal satu pesan per `interval` detik. Jumlah pesan yang ditahan dilaporkan di summary().
+    """
+
+    def __init__(self, logger=None, first=5, interval=5.0):
+        self.logger = logger or logging.getLogger()
+        self.first = first
+        self.interval = interval
+        self._counts = {}
+        self._suppressed = {}
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def log(self, key, message, level=logging.INFO):
+        now = time.monotonic()
+        with self._lock:
+            count = self._counts[key] = self._counts.get(key, 0) + 1
+            if count > self.first and now - self._last.get(key, 0) < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return
+            suppressed = self._suppressed.pop(key, 0)
+            self._last[key] = now
+        if suppressed:
+            message = f"{message} (+{suppressed} pesan '{key}' sebelumnya tidak ditampilkan)"
+        self.logger.log(level, message)
+
+    def summary(self, level=logging.INFO):
+        """Tulis total per key, mengembalikan dict {key: jumlah}."""
+        with self._lock:
+            counts = dict(self._counts)
+        for key, count in counts.items():
+            if count > self.first:
+                self.logger.log(level, f"{key}: total {count} pesan")
+        return counts
+
+
+def write_report(path, run_name, wall_seconds, registry=METRICS, profile_stats=None, extra=None):
+    """Menulis laporan JSON run (stage, latency, byte, gagal, profil opsional)."""
+    report = {
+        "run": run_name,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(time.time() - wall_seconds)),
+        "wall_seconds": round(wall_seconds, 4),
+        "pid": os.getpid(),
+        "stages": registry.snapshot(),
+    }
+    if profile_stats is not None:
+        report["profile"] = profile_stats
+    if extra:
+        report.update(extra)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def _profile_summary(profiler, prof_path):
+    profiler.dump_stats(prof_path)
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({"function": f"{os.path.basename(filename)}:{line}({function})", "calls": calls,
+                     "tottime": round(total, 4), "cumtime": round(cumulative, 4)})
+    rows.sort(key=lambda row: row["cumtime"], reverse=True)
+    return {"file": prof_path, "top_cumulative": rows[:PROFILE_TOP]}
+
+
+@contextmanager
+def run_report(run_name, report_dir="reports", profile=False, registry=METRICS):
+    """
+    Satu run (mis. satu pilihan menu): metrics di-reset di awal, laporan JSON ditulis ke
+    report_dir/<run>_<waktu>.json jika ada stage yang tercatat. profile=True menambahkan cProfile.
+    """
+    registry.reset()
+    profiler = cProfile.Profile() if profile else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield registry
+    finally:
+        if profiler:
+            profiler.disable()
+        wall_seconds = time.perf_counter() - start
+        if registry and report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+            base = os.path.join(report_dir, f"{run_name}_{time.strftime('%Y%m%d_%H%M%S')}")
+            profile_stats = _profile_summary(profiler, base + ".prof") if profiler else None
+            write_report(base + ".json", run_name, wall_seconds, registry, profile_stats)
+            logging.info(f"Laporan run ditulis ke {base}.json")
@@ -0,0 +1,124 @@
+##########################################################################
+#Modul Ekstraksi ZIP Bersarang (work queue + batas depth/ukuran)         #
+##########################################################################
+import io
+import os
+import logging
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from decoder import member_output_path
+
+DEFAULT_MAX_DEPTH = 5
+DEFAULT_MAX_TOTAL_BYTES = 2 * 1024 ** 3  # 2 GB hasil ekstraksi per bundle
+_READ_BLOCK = 1 << 20
+
+
+class ExtractionLimitError(Exception):
+    """Ekstraksi dihentikan karena melewati batas ukuran total."""
+
+
+class _ByteBudget:
+    """Penghitung byte hasil ekstraksi yang dipakai bersama oleh semua worker."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self, size):
+        with self._lock:
+            if self.used + size > self.limit:
+                raise ExtractionLimitError(
+                    f"Total hasil ekstraksi melebihi batas {self.limit} byte."
+                )
+            self.used += size
+
+
+def load_extract_limits(config):
+    """Batas ekstraksi dari config: 'nested_max_depth' dan 'nested_max_bytes'."""
+    return {
+        "max_depth": config.get('nested_max_depth', DEFAULT_MAX_DEPTH),
+        "max_total_bytes": config.get('nested_max_bytes', DEFAULT_MAX_TOTAL_BYTES),
+    }
+
+
+def _read_member(zip_ref, info, budget):
+    # Baca per blok dan hitung ukuran asli, tidak percaya file_size di header zip
+    chunks = []
+    with zip_ref.open(info) as member:
+        while True:
+            block = member.read(_READ_BLOCK)
+            if not block:
+                break
+            budget.take(len(block))
+            chunks.append(block)
+    return b"".join(chunks)
+
+
+def _extract_archive(source, name, depth, output_folder, max_depth, budget):
+    """
+    Ekstrak satu archive. Member biasa ditulis ke output_folder/<nama archive>/,
+    zip bersarang dikembalikan sebagai bytes untuk diproses berikutnya (tanpa ditulis ke disk).
+    """
+    target_folder = os.path.join(output_folder, os.path.splitext(os.path.basename(name))[0])
+    written = []
+    nested = []
+
+    with zipfile.ZipFile(source, 'r') as zip_ref:
+        for info in zip_ref.infolist():
+            if info.is_dir():
+                continue
+            data = _read_member(zip_ref, info, budget)
+
+            if data[:4] == b"PK\x03\x04" and zipfile.is_zipfile(io.BytesIO(data)):
+                if depth < max_depth:
+                    nested.append((data, info.filename, depth + 1))
+                    continue
+                logging.warning(f"Zip '{info.filename}' di '{name}' melewati batas depth {max_depth}, tidak diekstrak.")
+
+            output_path = member_output_path(target_folder, info.filename)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(output_path, 'wb') as f:
+                f.write(data)
+            written.append(output_path)
+
+    return written, nested
+
+
+def extract_nested_zip(file_path, output_folder, max_depth=DEFAULT_MAX_DEPTH,
+                       max_total_bytes=DEFAULT_MAX_TOTAL_BYTES, workers=None):
+    """
+    Ekstrak file zip beserta zip di dalamnya memakai work queue.
+
+    Setiap archive hanya memeriksa member yang baru diekstrak (tanpa os.walk ulang), zip
+    bersarang dibuka langsung dari memori, dan archive diproses paralel oleh beberapa thread.
+
+    :param max_depth: Kedalaman maksimum zip bersarang (zip utama = 0).
+    :param max_total_bytes: Batas total byte hasil ekstraksi; melewati batas -> ExtractionLimitError.
+    :return: List path file yang diekstrak.
+    """
+    workers = workers or min(4, os.cpu_count() or 1)
+    budget = _ByteBudget(max_total_bytes)
+    extracted = []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_extract_archive, file_path, file_path, 0, output_folder, max_depth, budget)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    written, nested = future.result()
+                except ExtractionLimitError:
+                    for other in pending:
+                        other.cancel()
+                    raise
+                extracted.extend(written)
+                for data, name, depth in nested:
+                    pending.add(executor.submit(
+                        _extract_archive, io.BytesIO(data), name, depth, output_folder, max_depth, budget
+                    ))
+
+    logging.info(f"Ekstraksi '{file_path}' selesai: {len(extracted)} file, {budget.used} byte.")
+    return extracted
@@ -0,0 +1,157 @@
+##########################################################################
+#Pipeline satu jalan: zip -> decode -> modify -> render -> zip           #
+##########################################################################
+# Contoh pemakaian:
+#   python pipeline.py zip --mode config
+#   python pipeline.py zip --mode tarif --output final_output.zip --manifest pipeline_manifest.csv
+import io
+import os
+import argparse
+import logging
+import zipfile
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+import main
+from decoder import IMAGE_EXTENSIONS, decode_image_array, load_decode_roi, load_decode_strategies
+from composer import encode_png
+from checkpoint import atomic_output
+from qr_validator import validate_payload
+from archive_writer import (inner_zip_bytes, zip_options, COMPRESSION_STORE, COMPRESSION_DEFLATE,
+                            DEFAULT_COMPRESSION)
+
+MODE_TARIF = "tarif"    # aturan menu 3 (sisip tag 54 tarif setelah karakter ke-148)
+MODE_CONFIG = "config"  # aturan menu 4 (config/config.txt)
+
+# Kolom status di manifest
+STATUS_OK = "ok"
+STATUS_SKIPPED = "dilewati"  # QR sumber tidak valid atau tidak ada tarif, gambar tidak ditulis
+STATUS_ERROR = "gagal"       # zip rusak, gambar/QR tidak terbaca, error lain
+MANIFEST_COLUMNS = ["zip", "member", "filename", "qrstring", "tarif", "modifiedQr", "status", "error"]
+
+
+def run_pipeline(zip_folder, output_zip="final_output.zip", manifest_path="pipeline_manifest.csv",
+                 mode=MODE_CONFIG, config_path="config/config.json", rules_path="config/config.txt",
+                 overlay_image_path="overlay.png", compression=DEFAULT_COMPRESSION, level=None):
+    """
+    Proses semua file zip di zip_folder dalam satu jalan. Setiap gambar hanya ada di memori:
+    decode QR, modifikasi payload, hapus QR lama + tempel QR baru, lalu langsung ditulis
+    sebagai member zip di output_zip. Selain output_zip hanya manifest (CSV) yang ditulis.
+
+    compression/level: 'store' (default) atau 'deflate' dengan level tertentu, untuk zip per
+    gambar maupun output_zip.
+
+    Sama seperti menu 3/4: QR sumber divalidasi (qr_validator) dan, jika 'skip_invalid_qr'
+    (default true), payload rusak tidak diberi CRC baru. Tarif dari aturan 'tarif_rules'; baris
+    tanpa tarif dilewati pada mode tarif (atau jika config.txt memakai $tarif). Baris yang
+    dilewati tercatat di manifest dengan status "dilewati" dan alasan di kolom error.
+    """
+    if not os.path.isdir(zip_folder):
+        print(f"Folder '{zip_folder}' tidak ditemukan.")
+        return None
+
+    zip_files = sorted(f for f in os.listdir(zip_folder) if f.endswith('.zip'))
+    if not zip_files:
+        print("Tidak ada file zip di folder ini.")
+        return None
+
+    config = main.load_config(config_path)
+    roi = load_decode_roi(config)
+    strategies = load_decode_strategies(config)
+    plan = main.load_modification_plan(rules_path) if mode == MODE_CONFIG else None
+    classifier = main.get_tarif_classifier(config)
+    skip_invalid = config.get('skip_invalid_qr', True)
+    needs_tarif = mode == MODE_TARIF or "tarif" in plan.columns
+
+    # Overlay cukup dibuka dan di-resize sekali untuk semua gambar; hapus + tempel QR satu kali encode
+    composer = main.get_template_composer(overlay_image_path, config)
+
+    manifest = []
+    method, compresslevel = zip_options(compression, level)
+    with atomic_output(output_zip) as tmp_path, \
+            zipfile.ZipFile(tmp_path, 'w', method, compresslevel=compresslevel) as final_zip:
+        for zip_file in zip_files:
+            zip_path = os.path.join(zip_folder, zip_file)
+            try:
+                source_zip = zipfile.ZipFile(zip_path, 'r')
+            except zipfile.BadZipFile:
+                logging.error(f"File '{zip_path}' rusak.")
+                manifest.append({"zip": zip_file, "member": None, "filename": None, "qrstring": None,
+                                 "tarif": None, "modifiedQr": None, "status": STATUS_ERROR, "error": "zip rusak"})
+                continue
+
+            with source_zip:
+                for info in source_zip.infolist():
+                    if info.is_dir() or not info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                        continue
+
+                    filename = os.path.basename(info.filename)
+                    record = {"zip": zip_file, "member": info.filename, "filename": filename,
+                              "qrstring": None, "tarif": None, "modifiedQr": None, "status": STATUS_ERROR,
+                              "error": None}
+                    manifest.append(record)
+                    try:
+                        with Image.open(io.BytesIO(source_zip.read(info))) as image:
+                            template = image.convert("RGBA")
+
+                        qr_string, _ = decode_image_array(np.asarray(template.convert("L")), roi, strategies)
+                        if not qr_string:
+                            record["error"] = "QR tidak terbaca"
+                            continue
+
+                        tarif = classifier.classify(qr_string)
+                        record["qrstring"], record["tarif"] = qr_string, tarif
+                        errors = validate_payload(qr_string)
+                        if errors and skip_invalid:
+                            # CRC baru tidak boleh menutupi payload sumber yang rusak
+                            record["status"], record["error"] = STATUS_SKIPPED, "QR tidak valid: " + "; ".join(errors)
+                            continue
+                        if tarif is None and needs_tarif:
+                            record["status"], record["error"] = STATUS_SKIPPED, "tidak ada tarif untuk merchant"
+                            continue
+                        if mode == MODE_TARIF:
+                            modified_qr = main.edit_qr_string_tarif_and_crc(qr_string, tarif)
+                        else:
+                            row = {"filename": filename, "qrstring": qr_string, "tarif": tarif}
+                            modified_qr = plan.apply(qr_string, row)
+                        record["modifiedQr"] = modified_qr
+
+                        png_data = encode_png(composer.compose(template, modified_qr), composer.options)
+                        final_zip.writestr(f"{os.path.splitext(filename)[0]}.zip", inner_zip_bytes(filename, png_data, compression, level))
+                        record["status"] = STATUS_OK
+                        if errors:
+                            record["error"] = "QR tidak valid: " + "; ".join(errors)
+                    except Exception as e:
+                        record["error"] = str(e)
+                        logging.error(f"Gagal memproses '{zip_file}/{info.filename}': {e}")
+
+    df = pd.DataFrame(manifest, columns=MANIFEST_COLUMNS)
+    df.to_csv(manifest_path, index=False)
+
+    counts = df["status"].value_counts()
+    print(f"Pipeline selesai: {counts.get(STATUS_OK, 0)} gambar diproses, {counts.get(STATUS_SKIPPED, 0)} dilewati, "
+          f"{counts.get(STATUS_ERROR, 0)} gagal. Output: {output_zip}, manifest: {manifest_path}")
+    return df
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Pipeline zip -> decode -> modify -> render -> zip tanpa file perantara")
+    parser.add_argument("zip_folder", help="Folder berisi file zip sumber")
+    parser.add_argument("--mode", choices=[MODE_CONFIG, MODE_TARIF], default=MODE_CONFIG,
+                        help="config = aturan menu 4 (config.txt), tarif = aturan menu 3")
+    parser.add_argument("--output", default="final_output.zip")
+    parser.add_argument("--manifest", default="pipeline_manifest.csv")
+    parser.add_argument("--config", default="config/config.json")
+    parser.add_argument("--rules", default="config/config.txt")
+    parser.add_argument("--overlay", default="overlay.png")
+    parser.add_argument("--compression", choices=[COMPRESSION_STORE, COMPRESSION_DEFLATE], default=DEFAULT_COMPRESSION)
+    parser.add_argument("--level", type=int, default=None, help="Level deflate 0-9")
+    args = parser.parse_args()
+
+    run_pipeline(args.zip_folder, args.output, args.manifest, args.mode,
+                 args.config, args.rules, args.overlay, args.compression, args.level)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,62 @@
+##########################################################################
+#Modul Render QR (matrix modul + scaling integer NumPy)                  #
+##########################################################################
+from functools import lru_cache
+
+from lazy_import import lazy_import
+
+np = lazy_import("numpy")
+qrcode = lazy_import("qrcode")
+Image = lazy_import("PIL.Image")
+
+QR_BORDER = 4
+# Matrix modul kecil (< 20 KB) sehingga bisa di-cache banyak, gambar hasil render lebih besar
+MATRIX_CACHE_SIZE = 4096
+RENDER_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=MATRIX_CACHE_SIZE)
+def qr_module_matrix(data):
+    """Matrix modul QR (termasuk quiet zone) sebagai array bool read-only, True = modul hitam."""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=1,
+        border=QR_BORDER,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    matrix = np.array(qr.get_matrix(), dtype=bool)
+    matrix.setflags(write=False)
+    return matrix
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def render_qr(data, width, height):
+    """
+    Render QR langsung ke ukuran kotak (width x height) sebagai gambar mode "L".
+
+    Setiap modul diperbesar dengan faktor integer yang sama (nearest-neighbour) sehingga
+    tepi modul tetap tajam; sisa pixel menjadi tambahan quiet zone putih di sekeliling QR.
+    Gambar hasil di-cache per payload, jangan diubah oleh pemanggil.
+    """
+    matrix = qr_module_matrix(data)
+    modules = matrix.shape[0]
+    scale = min(width, height) // modules
+
+    if scale == 0:
+        # Kotak lebih kecil dari jumlah modul: tidak bisa integer scaling
+        small = Image.fromarray(np.where(matrix, 0, 255).astype(np.uint8))
+        return small.resize((width, height), Image.NEAREST)
+
+    pixels = np.full((height, width), 255, dtype=np.uint8)
+    size = modules * scale
+    top = (height - size) // 2
+    left = (width - size) // 2
+    scaled = np.repeat(np.repeat(matrix, scale, axis=0), scale, axis=1)
+    pixels[top:top + size, left:left + size][scaled] = 0
+    return Image.fromarray(pixels)
+
+
+def cache_info():
+    return {"matrix": qr_module_matrix.cache_info(), "render": render_qr.cache_info()}
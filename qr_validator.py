@@ -0,0 +1,143 @@
+##########################################################################
+#Modul Validasi Payload QR (CRC tag 63, panjang TLV, urutan tag)         #
+##########################################################################
+from collections import Counter
+
+from crc16 import crc16_bulk
+from lazy_import import lazy_import
+from tlv import TEMPLATE_TAGS, CRC_TAG
+
+pd = lazy_import("pandas")
+
+# Kode error (kolom errors di laporan: "kode" atau "kode:detail", dipisah "; ")
+ERR_EMPTY = "kosong"
+ERR_HEADER = "header_terpotong"        # sisa payload kurang dari 4 karakter tag + panjang
+ERR_LENGTH = "panjang_bukan_angka"
+ERR_OVERRUN = "panjang_melebihi_payload"
+ERR_TAG = "tag_bukan_angka"
+ERR_DUPLICATE = "tag_ganda"
+ERR_ORDER = "tag_tidak_urut"
+ERR_CRC_MISSING = "crc_tidak_ada"      # payload tidak diakhiri tag 63 panjang 04
+ERR_CRC = "crc_salah"
+ERR_TEMPLATE = "template"              # error di dalam template bersarang (26-51, 62)
+
+
+def _header_error(header, index, prefix):
+    if len(header) < 4:
+        return f"{prefix}{ERR_HEADER}@{index}"
+    if not (header[:2].isascii() and header[:2].isdigit()):
+        return f"{prefix}{ERR_TAG}@{index}:{header[:2]}"
+    return f"{prefix}{ERR_LENGTH}@{index}:{header[:2]}={header[2:]}"
+
+
+def _walk(data, errors, prefix=""):
+    """
+    Membaca header TLV satu kali jalan dan mengembalikan list (tag, start, length).
+    Berhenti pada error struktur pertama karena posisi tag berikutnya tidak bisa dipercaya.
+    """
+    items = []
+    previous = ""
+    index = 0
+    end = len(data)
+    while index < end:
+        header = data[index:index + 4]
+        # Tag dan panjang sama-sama 2 digit ASCII, dicek sekaligus
+        if len(header) < 4 or not (header.isascii() and header.isdigit()):
+            errors.append(_header_error(header, index, prefix))
+            break
+        tag = header[:2]
+        start = index + 4
+        index = start + int(header[2:])
+        if index > end:
+            errors.append(f"{prefix}{ERR_OVERRUN}@{start - 4}:{tag}={header[2:]}")
+            break
+        # Tag yang naik terus pasti unik, set tag hanya dicek jika urutan turun/sama
+        if tag <= previous:
+            if any(item[0] == tag for item in items):
+                errors.append(f"{prefix}{ERR_DUPLICATE}:{tag}")
+            else:
+                errors.append(f"{prefix}{ERR_ORDER}:{tag}<{previous}")
+        previous = tag
+        items.append((tag, start, index - start))
+    return items
+
+
+def _check_structure(qr_string):
+    """Error struktur TLV (tanpa CRC) dan flag apakah payload diakhiri tag 63 yang bisa dicek."""
+    errors = []
+    items = _walk(qr_string, errors)
+    for tag, start, length in items:
+        if tag in TEMPLATE_TAGS:
+            _walk(qr_string[start:start + length], errors, f"{ERR_TEMPLATE} {tag}/")
+    has_crc = bool(items) and items[-1][0] == CRC_TAG and items[-1][2] == 4 \
+        and items[-1][1] + 4 == len(qr_string)
+    if not has_crc:
+        errors.append(ERR_CRC_MISSING)
+    return errors, has_crc
+
+
+def validate_many(qr_strings):
+    """
+    Validasi satu kolom QR string dalam satu kali jalan. CRC seluruh baris dihitung
+    sekaligus dengan crc16_bulk (binascii.crc_hqx).
+
+    :return: List error per baris (list kosong berarti valid), urutan sama dengan input.
+    """
+    results = []
+    crc_rows = []
+    crc_bodies = []
+    for row, qr_string in enumerate(qr_strings):
+        if not isinstance(qr_string, str) or not qr_string:
+            results.append([ERR_EMPTY])
+            continue
+        errors, has_crc = _check_structure(qr_string)
+        results.append(errors)
+        if has_crc:
+            crc_rows.append(row)
+            # CRC dihitung dari awal payload sampai "6304" (termasuk)
+            crc_bodies.append(qr_string[:-4])
+
+    for row, expected in zip(crc_rows, crc16_bulk(crc_bodies)):
+        found = qr_strings[row][-4:]
+        if found.upper() != expected:
+            results[row].append(f"{ERR_CRC}:{found}!={expected}")
+    return results
+
+
+def validate_payload(qr_string):
+    """List error untuk satu QR string (list kosong berarti valid)."""
+    return validate_many([qr_string])[0]
+
+
+def error_code(error):
+    """Kode error tanpa detail/posisi, untuk ringkasan (mis. 'crc_salah')."""
+    code = error.split(":", 1)[0].split("@", 1)[0]
+    return code.split("/", 1)[0] if code.startswith(ERR_TEMPLATE) else code
+
+
+def summarize_errors(results):
+    """Jumlah baris per kode error."""
+    counts = Counter()
+    for errors in results:
+        counts.update({error_code(error) for error in errors})
+    return dict(counts)
+
+
+def validation_report(qr_strings, results, names=None):
+    """
+    DataFrame ringkas berisi baris yang tidak valid saja:
+    row (index baris di input), filename (jika names diisi), qrstring, errors.
+    """
+    qr_strings = list(qr_strings)
+    names = list(names) if names is not None else None
+    rows = []
+    for row, errors in enumerate(results):
+        if errors:
+            record = {"row": row}
+            if names is not None:
+                record["filename"] = names[row]
+            record["qrstring"] = qr_strings[row]
+            record["errors"] = "; ".join(errors)
+            rows.append(record)
+    columns = ["row"] + (["filename"] if names is not None else []) + ["qrstring", "errors"]
+    return pd.DataFrame(rows, columns=columns)
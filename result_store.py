@@ -0,0 +1,448 @@
+##########################################################################
+#Modul Result Store (Parquet/Feather/CSV per kolom, Excel hanya export)  #
+##########################################################################
+import os
+import json
+
+from lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+FORMAT_PARQUET = "parquet"
+FORMAT_FEATHER = "feather"
+FORMAT_CSV = "csv"
+FORMATS = (FORMAT_PARQUET, FORMAT_FEATHER, FORMAT_CSV)
+
+DEFAULT_STORE_PATH = "results/listQr"
+_META_FILE = "_meta.json"
+
+# Jumlah baris per chunk untuk iter_chunks / iter_results ('chunk_rows' di config.json)
+DEFAULT_CHUNK_ROWS = 200000
+# Row group Parquet / record batch Feather: iter_chunks hanya membaca blok yang dibutuhkan
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+
+def available_formats():
+    """Parquet/Feather butuh pyarrow; CSV selalu tersedia."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return (FORMAT_CSV,)
+    return FORMATS
+
+
+def default_format():
+    return available_formats()[0]
+
+
+def _safe_name(column):
+    # Nama kolom dari Excel bisa berisi karakter bebas, nama file dibuat aman
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in str(column))
+
+
+def _is_text(series):
+    return series.dtype == object or pd.api.types.is_string_dtype(series)
+
+
+class ResultStore:
+    """
+    Menyimpan DataFrame hasil (filename, qrstring, tarif, modifiedQr, ...) dengan satu
+    file per kolom di folder root. Menambah kolom hanya menulis file kolom tersebut,
+    dan load(columns) hanya membaca kolom yang diminta.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_PATH, fmt=None):
+        self.root = root
+        self._meta = self._read_meta()
+        if self._meta is not None:
+            self.format = self._meta["format"]
+        else:
+            self.format = fmt or default_format()
+        if self.format not in FORMATS:
+            raise ValueError(f"Format '{self.format}' tidak dikenal, gunakan salah satu dari {FORMATS}.")
+
+    # -- metadata ---------------------------------------------------------
+    def _meta_path(self):
+        return os.path.join(self.root, _META_FILE)
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.root, _META_FILE), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self):
+        tmp_path = self._meta_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._meta, f, indent=2)
+        os.replace(tmp_path, self._meta_path())
+
+    def exists(self):
+        return self._meta is not None
+
+    @property
+    def columns(self):
+        return list(self._meta["columns"]) if self._meta else []
+
+    def __len__(self):
+        return self._meta["rows"] if self._meta else 0
+
+    # -- file per kolom ---------------------------------------------------
+    def _file_path(self, name):
+        return os.path.join(self.root, f"{name}.{self.format}")
+
+    def _path(self, column):
+        return self._file_path(self._meta['files'][column])
+
+    def _write_column(self, column, series):
+        frame = series.reset_index(drop=True).to_frame(name=str(column))
+        path = self._path(column)
+        tmp_path = path + ".tmp"
+        if self.format == FORMAT_PARQUET:
+            frame.to_parquet(tmp_path, index=False, row_group_size=DEFAULT_ROW_GROUP_SIZE)
+        elif self.format == FORMAT_FEATHER:
+            frame.to_feather(tmp_path)
+        else:
+            frame.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def _read_column(self, column):
+        path = self._path(column)
+        if self.format == FORMAT_PARQUET:
+            series = pd.read_parquet(path).iloc[:, 0]
+        elif self.format == FORMAT_FEATHER:
+            series = pd.read_feather(path).iloc[:, 0]
+        else:
+            # QR string / filename harus tetap string (mis. NMID diawali 0)
+            dtype = str if self._meta["dtypes"].get(column) == "object" else None
+            series = pd.read_csv(path, dtype=dtype).iloc[:, 0]
+        return series.rename(column)
+
+    def _iter_column(self, column, chunk_size):
+        """Series per chunk_size baris (chunk terakhir boleh lebih pendek)."""
+        path = self._path(column)
+        if self.format == FORMAT_CSV:
+            dtype = str if self._meta["dtypes"].get(column) == "object" else None
+            for frame in pd.read_csv(path, dtype=dtype, chunksize=chunk_size):
+                yield frame.iloc[:, 0].rename(column)
+            return
+
+        import pyarrow as pa
+        if self.format == FORMAT_PARQUET:
+            import pyarrow.parquet as pq
+            batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size)
+        else:
+            reader = pa.ipc.open_file(pa.memory_map(path))
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+
+        # Batas batch di file tiap kolom bisa berbeda, dipotong ulang agar semua kolom sejajar
+        pending, rows = [], 0
+        for batch in batches:
+            pending.append(batch)
+            rows += batch.num_rows
+            while rows >= chunk_size:
+                table = pa.Table.from_batches(pending)
+                yield table.slice(0, chunk_size).to_pandas().iloc[:, 0].rename(column)
+                rest = table.slice(chunk_size)
+                pending, rows = rest.to_batches(), rest.num_rows
+        if rows:
+            yield pa.Table.from_batches(pending).to_pandas().iloc[:, 0].rename(column)
+
+    # -- API ----------------------------------------------------------------
+    def save(self, df):
+        """Menulis ulang seluruh store dari df."""
+        os.makedirs(self.root, exist_ok=True)
+        old_files = set(self._meta["files"].values()) if self._meta else set()
+        self._meta = {"format": self.format, "rows": len(df), "columns": [], "files": {}, "dtypes": {}}
+        for column in df.columns:
+            self._add(column, df[column])
+        self._write_meta()
+        for name in old_files - set(self._meta["files"].values()):
+            self._remove_file(name)
+
+    def _add(self, column, series):
+        if column not in self._meta["files"]:
+            self._meta["columns"].append(column)
+            self._meta["files"][column] = f"{len(self._meta['files']):03d}_{_safe_name(column)}"
+        self._meta["dtypes"][column] = "object" if _is_text(series) else str(series.dtype)
+        self._write_column(column, series)
+
+    def _remove_file(self, name):
+        try:
+            os.remove(self._file_path(name))
+        except FileNotFoundError:
+            pass
+
+    def add_columns(self, columns):
+        """
+        Menambah/mengganti kolom tanpa menulis ulang kolom lain.
+
+        :param columns: dict {nama kolom: Series/list} atau DataFrame, panjang harus sama dengan store.
+        """
+        if self._meta is None:
+            raise FileNotFoundError(f"Result store '{self.root}' belum ada, gunakan save() dulu.")
+        items = columns.items() if isinstance(columns, dict) else ((c, columns[c]) for c in columns.columns)
+        for column, values in items:
+            series = values if isinstance(values, pd.Series) else pd.Series(values)
+            if len(series) != self._meta["rows"]:
+                raise ValueError(f"Kolom '{column}' berisi {len(series)} baris, store berisi {self._meta['rows']} baris.")
+            self._add(column, series)
+        self._write_meta()
+
+    def _check_columns(self, columns):
+        if self._meta is None:
+            raise FileNotFoundError(f"Result store '{self.root}' tidak ditemukan.")
+        columns = self.columns if columns is None else list(columns)
+        missing = [c for c in columns if c not in self._meta["files"]]
+        if missing:
+            raise KeyError(f"Kolom {missing} tidak ada di result store '{self.root}'.")
+        return columns
+
+    def load(self, columns=None):
+        """Membaca kolom tertentu saja (default semua kolom) sebagai DataFrame."""
+        columns = self._check_columns(columns)
+        return pd.DataFrame({column: self._read_column(column) for column in columns}, columns=columns)
+
+    def iter_chunks(self, columns=None, chunk_size=DEFAULT_CHUNK_ROWS):
+        """
+        Membaca store per chunk_size baris sebagai DataFrame dengan index nomor baris di store,
+        sehingga memori tidak bertambah dengan jumlah baris. chunk_size None/0 berarti satu
+        chunk berisi seluruh store (sama dengan load).
+        """
+        columns = self._check_columns(columns)
+        if not chunk_size:
+            yield self.load(columns)
+            return
+        release = None
+        if self.format != FORMAT_CSV:
+            import pyarrow as pa
+            # Buffer Arrow chunk sebelumnya dikembalikan ke OS, bukan ditahan memory pool
+            release = pa.default_memory_pool().release_unused
+        start = 0
+        for parts in zip(*(self._iter_column(column, chunk_size) for column in columns)):
+            rows = len(parts[0])
+            chunk = pd.DataFrame({part.name: part.reset_index(drop=True) for part in parts}, columns=columns)
+            chunk.index = pd.RangeIndex(start, start + rows)
+            start += rows
+            yield chunk
+            if release is not None:
+                release()
+
+    def chunk_writer(self, replace=False):
+        """
+        ChunkWriter untuk menulis hasil per chunk (append) tanpa menahan seluruh kolom di memori.
+
+        :param replace: True menulis ulang seluruh store (seperti save), False menambah/mengganti
+                        kolom (seperti add_columns, jumlah baris harus sama dengan store).
+        """
+        if not replace and self._meta is None:
+            raise FileNotFoundError(f"Result store '{self.root}' belum ada, gunakan save() dulu.")
+        os.makedirs(self.root, exist_ok=True)
+        return ChunkWriter(self, replace)
+
+    def import_excel(self, excel_path, **kwargs):
+        """Memuat listQr.xlsx lama (atau hasil edit manual) ke store."""
+        df = pd.read_excel(excel_path, **kwargs)
+        self.save(df)
+        return df
+
+    def export_excel(self, excel_path, columns=None):
+        """Excel hanya untuk export (dibuka manual), bukan untuk dibaca stage berikutnya."""
+        self.load(columns).to_excel(excel_path, index=False)
+        self.mark_exported(excel_path)
+        return excel_path
+
+    def mark_exported(self, excel_path):
+        """Catat mtime file Excel yang isinya sama dengan store."""
+        self._meta.setdefault("exports", {})[os.path.abspath(excel_path)] = os.path.getmtime(excel_path)
+        self._write_meta()
+
+    def excel_is_newer(self, excel_path):
+        """True jika file Excel diubah (mis. diedit manual) setelah store terakhir ditulis."""
+        if self._meta is None:
+            return True
+        mtime = os.path.getmtime(excel_path)
+        if self._meta.get("exports", {}).get(os.path.abspath(excel_path)) == mtime:
+            return False
+        return mtime > os.path.getmtime(self._meta_path())
+
+
+class _ColumnAppender:
+    """Satu file kolom yang ditulis bertahap ke path .tmp (Parquet row group / Feather batch / CSV)."""
+
+    def __init__(self, name, path, fmt, column):
+        self.name = name
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.format = fmt
+        self.column = str(column)
+        self.text = None
+        self.dtype = None
+        self._started = False
+        self._writer = None
+        self._schema = None
+
+    def append(self, series):
+        frame = series.reset_index(drop=True).to_frame(name=self.column)
+        if self.text is None:
+            self.text = _is_text(series)
+            self.dtype = "object" if self.text else str(series.dtype)
+        if self.format == FORMAT_CSV:
+            frame.to_csv(self.tmp_path, mode="a" if self._started else "w", header=not self._started, index=False)
+            self._started = True
+            return
+
+        import pyarrow as pa
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self._schema is None:
+            self._schema = table.schema
+            if self.text:
+                # Chunk yang seluruhnya kosong (NaN) tidak boleh menentukan tipe kolom teks
+                self._schema = self._schema.set(0, pa.field(self.column, pa.string()))
+            if self.format == FORMAT_PARQUET:
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self.tmp_path, self._schema,
+                                               options=pa.ipc.IpcWriteOptions(compression="lz4"))
+        table = table.cast(self._schema)
+        if self.format == FORMAT_PARQUET:
+            self._writer.write_table(table, row_group_size=DEFAULT_ROW_GROUP_SIZE)
+        else:
+            self._writer.write_table(table, max_chunksize=DEFAULT_ROW_GROUP_SIZE)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def commit(self):
+        self.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.close()
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class ChunkWriter:
+    """
+    Menulis DataFrame per chunk ke ResultStore, dibuat lewat ResultStore.chunk_writer().
+    Setiap kolom ditulis ke file .tmp dan baru menggantikan file lama (serta _meta.json) saat
+    close(), sehingga run yang gagal di tengah tidak merusak store.
+
+        with store.chunk_writer() as writer:
+            for chunk in store.iter_chunks(["qrstring"]):
+                writer.append(hasil_chunk)
+    """
+
+    def __init__(self, store, replace):
+        self.store = store
+        self.replace = replace
+        self.rows = 0
+        self._appenders = None
+        self._next_index = 0 if replace else len(store._meta["files"])
+
+    def _appender(self, column):
+        files = {} if self.replace else self.store._meta["files"]
+        if column in files:
+            name = files[column]
+        else:
+            name = f"{self._next_index:03d}_{_safe_name(column)}"
+            self._next_index += 1
+        return _ColumnAppender(name, self.store._file_path(name), self.store.format, column)
+
+    def append(self, df):
+        """Menambah satu chunk; semua chunk harus berisi kolom yang sama."""
+        if self._appenders is None:
+            self._appenders = {column: self._appender(column) for column in df.columns}
+        elif list(df.columns) != list(self._appenders):
+            raise ValueError(f"Kolom chunk {list(df.columns)} berbeda dengan chunk pertama {list(self._appenders)}.")
+        for column, appender in self._appenders.items():
+            appender.append(df[column])
+        self.rows += len(df)
+
+    def close(self):
+        store = self.store
+        if not self.replace and self.rows != store._meta["rows"]:
+            self.abort()
+            raise ValueError(f"Chunk berisi {self.rows} baris, store berisi {store._meta['rows']} baris.")
+
+        old_files = set()
+        if self.replace:
+            old_files = set(store._meta["files"].values()) if store._meta else set()
+            store._meta = {"format": store.format, "rows": self.rows, "columns": [], "files": {}, "dtypes": {}}
+        for column, appender in (self._appenders or {}).items():
+            appender.commit()
+            if column not in store._meta["files"]:
+                store._meta["columns"].append(column)
+                store._meta["files"][column] = appender.name
+            store._meta["dtypes"][column] = appender.dtype
+        store._write_meta()
+        for name in old_files - set(store._meta["files"].values()):
+            store._remove_file(name)
+
+    def abort(self):
+        for appender in (self._appenders or {}).values():
+            appender.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def read_results(source, columns=None):
+    """
+    Membaca hasil dari ResultStore, DataFrame, folder store atau file .xlsx/.csv.
+    Stage seperti menu 2/5 bisa menerima salah satu sumber tersebut.
+    """
+    if isinstance(source, pd.DataFrame):
+        return source if columns is None else source[list(columns)]
+    if isinstance(source, ResultStore):
+        return source.load(columns)
+    if os.path.isdir(source):
+        return ResultStore(source).load(columns)
+    if source.lower().endswith(".csv"):
+        return pd.read_csv(source, usecols=columns)
+    return pd.read_excel(source, usecols=columns)
+
+
+def result_rows(source):
+    """Jumlah baris jika bisa diketahui tanpa membaca isi (ResultStore / folder store / DataFrame)."""
+    if isinstance(source, (pd.DataFrame, ResultStore)):
+        return len(source)
+    if isinstance(source, str) and os.path.isdir(source):
+        return len(ResultStore(source))
+    return None
+
+
+def iter_results(source, columns=None, chunk_size=DEFAULT_CHUNK_ROWS):
+    """
+    Seperti read_results tetapi per chunk_size baris (None/0 berarti satu chunk). ResultStore dan
+    CSV dibaca bertahap; Excel tetap dibaca utuh oleh pandas lalu dipotong.
+    """
+    if isinstance(source, ResultStore):
+        yield from source.iter_chunks(columns, chunk_size)
+        return
+    if isinstance(source, str) and os.path.isdir(source):
+        yield from ResultStore(source).iter_chunks(columns, chunk_size)
+        return
+    if chunk_size and isinstance(source, str) and source.lower().endswith(".csv"):
+        yield from pd.read_csv(source, usecols=columns, chunksize=chunk_size)
+        return
+    df = read_results(source, columns)
+    if not chunk_size:
+        yield df
+        return
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
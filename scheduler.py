@@ -0,0 +1,188 @@
+##########################################################################
+#Modul Scheduler (asyncio: baca -> compute -> tulis dengan antrian)      #
+##########################################################################
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from lazy_import import lazy_import
+from metrics import METRICS
+
+asyncio = lazy_import("asyncio")
+
+DEFAULT_IO_WORKERS = 8
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+DEFAULT_QUEUE_SIZE = 64
+
+# read(item) -> payload, compute(item, payload) -> payload, write(item, payload) -> hasil.
+# on_error(item, stage, exc) -> hasil untuk item yang gagal di salah satu stage.
+StageFunctions = namedtuple("StageFunctions", ["read", "compute", "write", "on_error"])
+
+_DONE = object()
+
+
+def payload_size(payload):
+    """Jumlah byte yang ditahan payload antar stage (bytes, atau tuple yang berisi bytes)."""
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return len(payload)
+    if isinstance(payload, tuple):
+        return sum(payload_size(part) for part in payload)
+    return 0
+
+
+class _MemoryBudget:
+    """
+    Batas byte payload yang ditahan di antrian. Item yang lebih besar dari seluruh budget
+    tetap boleh jalan jika budget sedang kosong, agar tidak deadlock.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, size):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.used == 0 or self.used + size <= self.limit)
+            self._add(size)
+
+    async def resize(self, old_size, new_size):
+        # Dipakai setelah compute: output sudah ada di memori, jadi tidak menunggu
+        async with self._condition:
+            self._add(new_size - old_size)
+            self._condition.notify_all()
+
+    async def release(self, size):
+        async with self._condition:
+            self._add(-size)
+            self._condition.notify_all()
+
+    def _add(self, size):
+        self.used += size
+        self.peak = max(self.peak, self.used)
+
+
+async def _run_stages(items, stages, cpu_executor, io_executor, io_workers, cpu_workers, memory_budget,
+                      queue_size, on_result, name, stats):
+    loop = asyncio.get_running_loop()
+    budget = _MemoryBudget(memory_budget)
+    item_queue = asyncio.Queue()
+    compute_queue = asyncio.Queue(maxsize=queue_size)
+    write_queue = asyncio.Queue(maxsize=queue_size)
+    results = []
+
+    for item in items:
+        item_queue.put_nowait(item)
+
+    def finish(result):
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    async def timed(stage, executor, func, *args):
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        finally:
+            METRICS.record(f"{name}_{stage}", time.perf_counter() - start, items=1)
+
+    async def reader():
+        while not item_queue.empty():
+            item = item_queue.get_nowait()
+            try:
+                payload = await timed("read", io_executor, stages.read, item)
+            except Exception as e:
+                finish(stages.on_error(item, "read", e))
+                continue
+            size = payload_size(payload)
+            # Backpressure: reader berhenti membaca selama budget memori penuh
+            await budget.acquire(size)
+            await compute_queue.put((item, payload, size))
+
+    async def computer():
+        while True:
+            entry = await compute_queue.get()
+            if entry is _DONE:
+                return
+            item, payload, size = entry
+            try:
+                output = await timed("compute", cpu_executor, stages.compute, item, payload)
+            except Exception as e:
+                await budget.release(size)
+                finish(stages.on_error(item, "compute", e))
+                continue
+            output_size = payload_size(output)
+            await budget.resize(size, output_size)
+            await write_queue.put((item, output, output_size))
+
+    async def writer():
+        while True:
+            entry = await write_queue.get()
+            if entry is _DONE:
+                return
+            item, output, size = entry
+            try:
+                result = await timed("write", io_executor, stages.write, item, output)
+            except Exception as e:
+                result = stages.on_error(item, "write", e)
+            finally:
+                await budget.release(size)
+            finish(result)
+
+    readers = [asyncio.create_task(reader()) for _ in range(io_workers)]
+    computers = [asyncio.create_task(computer()) for _ in range(cpu_workers)]
+    writers = [asyncio.create_task(writer()) for _ in range(io_workers)]
+
+    await asyncio.gather(*readers)
+    for _ in computers:
+        await compute_queue.put(_DONE)
+    await asyncio.gather(*computers)
+    for _ in writers:
+        await write_queue.put(_DONE)
+    await asyncio.gather(*writers)
+
+    stats["peak_buffered_bytes"] = budget.peak
+    return results
+
+
+def run_staged(items, stages, executor=None, io_workers=DEFAULT_IO_WORKERS, cpu_workers=None,
+               memory_budget=DEFAULT_MEMORY_BUDGET, queue_size=DEFAULT_QUEUE_SIZE, on_result=None,
+               name="scheduler"):
+    """
+    Menjalankan stages untuk setiap item dengan baca, compute dan tulis yang saling tumpang
+    tindih: baca/tulis file di thread pool I/O, compute di executor (ThreadPoolExecutor atau
+    ProcessPoolExecutor). Antar stage ada antrian terbatas, dan reader berhenti membaca jika
+    byte payload yang tertahan melebihi memory_budget.
+
+    :param executor: Executor untuk compute, None berarti thread pool sebanyak jumlah CPU.
+    :param cpu_workers: Jumlah compute yang berjalan bersamaan, default max_workers executor.
+    :return: list hasil (urutan selesai, bukan urutan input).
+    """
+    items = list(items)
+    if not items:
+        return []
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max(1, os.cpu_count() or 1))
+    cpu_workers = cpu_workers or getattr(executor, "_max_workers", None) or max(1, os.cpu_count() or 1)
+    stats = {}
+    try:
+        with ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io") as io_executor:
+            results = asyncio.run(_run_stages(items, stages, executor, io_executor, io_workers, cpu_workers,
+                                              memory_budget, queue_size, on_result, name, stats))
+    finally:
+        if own_executor:
+            executor.shutdown()
+    METRICS.add(name, peak_buffered_bytes=stats.get("peak_buffered_bytes", 0))
+    return results
+
+
+def load_scheduler_options(config):
+    """Opsi run_staged dari config.json ('io_workers', 'memory_budget_mb', 'queue_size')."""
+    return {
+        "io_workers": config.get('io_workers', DEFAULT_IO_WORKERS),
+        "memory_budget": int(config.get('memory_budget_mb', DEFAULT_MEMORY_BUDGET // (1024 * 1024)) * 1024 * 1024),
+        "queue_size": config.get('queue_size', DEFAULT_QUEUE_SIZE),
+    }
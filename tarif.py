@@ -0,0 +1,180 @@
+##########################################################################
+#Modul Tarif Classifier (aturan merchant -> tarif dari config)           #
+##########################################################################
+import os
+import re
+import logging
+from functools import lru_cache
+
+DEFAULT_RULES_PATH = "config/tarif.txt"
+MERCHANT_NAME_TAG = "59"
+
+# Dipakai jika config/tarif.txt tidak ada (sama dengan isi file bawaan)
+DEFAULT_RULES = {
+    "SBY REGULER": 6200,
+    "SBY KHUSUS": 2000,
+    "BMS REGULER": 3900,
+    "BMS KHUSUS": 2000,
+    "PLG REGULER": 4000,
+    "PLG KHUSUS": 2000,
+    "BPN REGULER": 4500,
+    "BPN KHUSUS": 2000,
+    "SKT REGULER": 3700,
+    "SKT KHUSUS": 2000,
+    "MKS REGULER": 4600,
+    "MKS KHUSUS": 2000,
+}
+
+
+def read_rules_file(file_path):
+    """
+    Membaca aturan 'potongan nama merchant|tarif' per baris (format pipe seperti config.txt).
+    Baris kosong dan baris diawali '#' diabaikan.
+    """
+    rules = {}
+    with open(file_path, "r") as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split("|")
+            if len(parts) != 2 or not parts[0].strip():
+                raise ValueError(f"{file_path}:{line_number}: format harus 'nama merchant|tarif', ditemukan '{line}'")
+            rules[parts[0].strip()] = int(parts[1].strip())
+    return rules
+
+
+# Tag 58 (negara) selalu "ID" untuk QRIS dan tag 59 langsung menyusul (tag terurut)
+_NAME_ANCHOR = "5802ID" + MERCHANT_NAME_TAG
+_NAME_OFFSET = len(_NAME_ANCHOR)
+
+
+def _walk_merchant_name(qr_string):
+    index = 0
+    end = len(qr_string)
+    try:
+        while index + 4 <= end:
+            tag = qr_string[index:index + 2]
+            length = int(qr_string[index + 2:index + 4])
+            if tag == MERCHANT_NAME_TAG:
+                return qr_string[index + 4:index + 4 + length]
+            index += 4 + length
+    except ValueError:
+        pass
+    return None
+
+
+def _anchored_name(qr_string):
+    # Jalur cepat: tag 59 tepat setelah "5802ID", None jika anchor tidak ditemukan
+    index = qr_string.find(_NAME_ANCHOR)
+    if index >= 0:
+        start = index + _NAME_OFFSET + 2
+        length = qr_string[start - 2:start]
+        if length.isdigit():
+            return qr_string[start:start + int(length)]
+    return None
+
+
+def merchant_name(qr_string):
+    """
+    Nilai tag 59 (nama merchant) dari payload QRIS, None jika tidak ada atau payload tidak valid.
+    Jalur cepat mencari "5802ID59" (str.find), selain itu header TLV dibaca satu per satu.
+    """
+    name = _anchored_name(qr_string)
+    return name if name is not None else _walk_merchant_name(qr_string)
+
+
+_MISSING = object()
+
+
+class TarifClassifier:
+    """
+    Aturan dikompilasi sekali menjadi satu regex (alternatif terpanjang lebih dulu), dicari di
+    nama merchant (tag 59). Jika tag 59 tidak terbaca, seluruh QR string yang dicari seperti
+    determine_tarif lama. Hasil per nama merchant di-cache karena nama sangat berulang.
+    """
+
+    def __init__(self, rules):
+        self.rules = dict(rules)
+        keys = sorted(self.rules, key=len, reverse=True)
+        self._pattern = re.compile("|".join(re.escape(key) for key in keys)) if keys else None
+        self._by_name = {}
+
+    @classmethod
+    def from_file(cls, file_path=DEFAULT_RULES_PATH):
+        if not os.path.exists(file_path):
+            logging.warning(f"File aturan tarif '{file_path}' tidak ditemukan, memakai aturan bawaan.")
+            return cls(DEFAULT_RULES)
+        return cls(read_rules_file(file_path))
+
+    def _match(self, text):
+        if self._pattern is None:
+            return None
+        found = self._pattern.search(text)
+        return self.rules[found.group(0)] if found else None
+
+    def _classify_name(self, name):
+        tarif = self._by_name[name] = self._match(name)
+        return tarif
+
+    def classify(self, qr_string):
+        """Tarif untuk satu QR string, None jika tidak ada aturan yang cocok."""
+        if not isinstance(qr_string, str) or not qr_string:
+            return None
+        name = merchant_name(qr_string)
+        if name is None:
+            return self._match(qr_string)
+        tarif = self._by_name.get(name, _MISSING)
+        return self._classify_name(name) if tarif is _MISSING else tarif
+
+    def classify_many(self, qr_strings):
+        """Tarif untuk seluruh kolom/list QR string (urutan sama dengan input)."""
+        by_name = self._by_name
+        classify = self.classify
+        tarifs = []
+        append = tarifs.append
+        for qr_string in qr_strings:
+            # Jalur cepat merchant_name (sama persis) + cache nama tanpa lewat classify per baris
+            name = _anchored_name(qr_string) if isinstance(qr_string, str) else None
+            if name is not None:
+                tarif = by_name.get(name, _MISSING)
+                append(self._classify_name(name) if tarif is _MISSING else tarif)
+            else:
+                append(classify(qr_string))
+        return tarifs
+
+    def unmatched(self, qr_strings, tarifs=None):
+        """
+        Index baris yang punya QR string tetapi tidak cocok dengan aturan mana pun
+        (QR kosong/gagal decode tidak dihitung di sini).
+        """
+        qr_strings = list(qr_strings)
+        if tarifs is None:
+            tarifs = self.classify_many(qr_strings)
+        return [index for index, (qr_string, tarif) in enumerate(zip(qr_strings, tarifs))
+                if isinstance(qr_string, str) and qr_string and tarif is None]
+
+    def report_unmatched(self, names, qr_strings, tarifs, limit=10):
+        """Cetak ringkasan baris tanpa tarif, mengembalikan list nama (mis. filename) yang tidak cocok."""
+        qr_strings = list(qr_strings)
+        indexes = self.unmatched(qr_strings, tarifs)
+        names = list(names)
+        missing = [names[index] for index in indexes]
+        if missing:
+            print(f"{len(missing)} QR tidak cocok dengan aturan tarif:")
+            for index in indexes[:limit]:
+                print(f"  {names[index]}: merchant '{merchant_name(qr_strings[index])}'")
+            if len(missing) > limit:
+                print(f"  ... dan {len(missing) - limit} lainnya")
+        return missing
+
+
+@lru_cache(maxsize=4)
+def _cached_classifier(file_path, mtime):
+    return TarifClassifier.from_file(file_path)
+
+
+def load_tarif_classifier(file_path=DEFAULT_RULES_PATH):
+    """TarifClassifier dari file aturan, dibuat ulang hanya jika file berubah."""
+    mtime = os.path.getmtime(file_path) if os.path.exists(file_path) else None
+    return _cached_classifier(file_path, mtime)
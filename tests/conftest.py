@@ -0,0 +1,5 @@
+# Modul aplikasi berada di root repo (bukan package), tambahkan ke sys.path untuk pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
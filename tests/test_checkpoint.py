@@ -0,0 +1,64 @@
+##########################################################################
+#Test checkpoint journal: resume menu 2 / menu 5                        #
+##########################################################################
+import hashlib
+import os
+
+from checkpoint import CheckpointJournal, WorkItem, file_stages, run_checkpointed
+
+
+def copy_compute(item, data):
+    return hashlib.sha256(data).hexdigest(), data
+
+
+def rewrite_input_compute(item, data):
+    # Input diganti (isi lain, ukuran sama) setelah dibaca dan di-hash, sebelum hasil dicatat
+    with open(item.input_path, 'wb') as f:
+        f.write(data.upper())
+    stat = os.stat(item.input_path)
+    os.utime(item.input_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    return copy_compute(item, data)
+
+
+def make_items(tmp_path, count):
+    items = []
+    for i in range(count):
+        input_path = tmp_path / f"in{i}.bin"
+        input_path.write_bytes(f"input {i}".encode())
+        items.append(WorkItem(str(tmp_path / f"out{i}.bin"), str(input_path), f"param {i}"))
+    return items
+
+
+def run(journal, items, compute=copy_compute):
+    return run_checkpointed(journal, items, file_stages(compute), io_workers=2, cpu_workers=1)
+
+
+def test_done_items_are_skipped(tmp_path):
+    items = make_items(tmp_path, 5)
+    with CheckpointJournal("test", "cfg", str(tmp_path / "journal.db")) as journal:
+        skipped, processed = run(journal, items)
+        assert skipped == 0 and len(processed) == 5
+        assert all(result.status == "ok" for result in processed)
+        assert journal.pending(items) == []
+
+        # Params berubah atau output hilang: item diproses ulang
+        changed = items[0]._replace(params="lain")
+        os.remove(items[1].output_path)
+        assert journal.pending([changed] + items[1:]) == [changed, items[1]]
+
+
+def test_pending_reads_only_requested_items(tmp_path):
+    items = make_items(tmp_path, 3)
+    with CheckpointJournal("test", "cfg", str(tmp_path / "journal.db")) as journal:
+        run(journal, items)
+        extra = WorkItem(str(tmp_path / "baru.bin"), items[0].input_path, None)
+        assert journal.pending([extra, items[2]]) == [extra]
+
+
+def test_input_changed_during_run_is_not_skipped(tmp_path):
+    items = make_items(tmp_path, 2)
+    with CheckpointJournal("test", "cfg", str(tmp_path / "journal.db")) as journal:
+        _, processed = run(journal, items, rewrite_input_compute)
+        assert all(result.status == "ok" for result in processed)
+        # Journal menyimpan stat saat input dibaca, jadi isi baru tidak dianggap selesai
+        assert journal.pending(items) == items
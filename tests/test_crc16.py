@@ -0,0 +1,72 @@
+##########################################################################
+#Test CRC-16: engine tabel, binascii.crc_hqx dan crc16_bulk harus sama   #
+#dengan implementasi bit per bit lama (calculate_crc di main.py)         #
+##########################################################################
+import pytest
+
+from crc16 import DEFAULT_POLYNOMIAL, crc16, crc16_bulk, crc16_hex
+
+SAMPLE_QR = (
+    "00020101021126690021ID.CO.BANKMANDIRI.WWW01189360000801715058110211717150581170303URE"
+    "51440014ID.CO.QRIS.WWW0215ID20253684458000303URE5204939953033605802ID5923KEMENHUB SBY "
+    "REGULER 016015JAKARTA SELATAN61051285062070703A01630455B1"
+)
+
+SAMPLES = [
+    b"",
+    b"1",
+    b"123456789",
+    SAMPLE_QR[:-4].encode("utf-8"),
+    # Payload dengan karakter non-ASCII (nama merchant), di-encode utf-8 seperti di main.py
+    "5923KOPI KENANGAN É6304".encode("utf-8"),
+    bytes(range(256)),
+]
+
+
+def legacy_crc(data: bytes, polynomial: int = 0x1021, initial_value: int = 0xFFFF) -> str:
+    # Salinan calculate_crc sebelum engine tabel (bit per bit)
+    crc = initial_value
+    for byte in data:
+        crc ^= (byte << 8)
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = (crc << 1) ^ polynomial
+            else:
+                crc <<= 1
+            crc &= 0xFFFF
+    return f"{crc:04X}"
+
+
+@pytest.mark.parametrize("polynomial", [DEFAULT_POLYNOMIAL, 0x8005])
+@pytest.mark.parametrize("data", SAMPLES)
+def test_table_matches_legacy(data, polynomial):
+    assert crc16_hex(data, polynomial, fast=False) == legacy_crc(data, polynomial)
+
+
+@pytest.mark.parametrize("data", SAMPLES)
+def test_crc_hqx_matches_legacy(data):
+    assert crc16_hex(data) == legacy_crc(data)
+    assert crc16(data) == crc16(data, fast=False)
+
+
+@pytest.mark.parametrize("initial_value", [0xFFFF, 0x0000, 0x1D0F])
+def test_initial_value_matches_legacy(initial_value):
+    for data in SAMPLES:
+        assert crc16_hex(data, initial_value=initial_value) == legacy_crc(data, initial_value=initial_value)
+
+
+@pytest.mark.parametrize("polynomial", [DEFAULT_POLYNOMIAL, 0x8005])
+def test_bulk_matches_legacy(polynomial):
+    # str di-encode utf-8, bytes dipakai apa adanya
+    payloads = SAMPLES + [SAMPLE_QR[:-4], "5923KOPI KENANGAN É6304"]
+    expected = [legacy_crc(p if isinstance(p, bytes) else p.encode("utf-8"), polynomial) for p in payloads]
+    assert crc16_bulk(payloads, polynomial=polynomial) == expected
+    assert crc16_bulk(payloads, polynomial=polynomial, fast=False) == expected
+
+
+def test_known_values():
+    # Check value CRC-16/IBM-3740 dan CRC tag 63 dari QR asli
+    assert crc16_hex(b"123456789") == "29B1"
+    assert crc16_hex(SAMPLE_QR[:-4].encode("utf-8")) == "55B1"
+    assert crc16_bulk([SAMPLE_QR[:-4]]) == [SAMPLE_QR[-4:]]
+    assert crc16_hex(b"") == "FFFF"
@@ -0,0 +1,61 @@
+##########################################################################
+#Test menu 3: sisip tag 54 (tarif) + CRC baru per kolom                  #
+##########################################################################
+import pandas as pd
+
+import main
+from crc16 import crc16_hex
+from qr_validator import validate_payload
+
+SAMPLE_QR = (
+    "00020101021126690021ID.CO.BANKMANDIRI.WWW01189360000801715058110211717150581170303URE"
+    "51440014ID.CO.QRIS.WWW0215ID20253684458000303URE5204939953033605802ID5923KEMENHUB SBY "
+    "REGULER 016015JAKARTA SELATAN61051285062070703A01630455B1"
+)
+
+
+def legacy_edit(qr_string, tarif):
+    # Versi per baris lama (df.apply) untuk satu QR string
+    if len(qr_string) > 4:
+        data = (qr_string[:10] + "12" + qr_string[12:148] + "5404" + str(tarif) + qr_string[148:])[:-4]
+    else:
+        data = qr_string + "5404" + str(tarif)
+    return data + crc16_hex(data.encode("utf-8"))
+
+
+def test_matches_legacy_when_every_row_has_tarif():
+    qr_strings = [SAMPLE_QR, SAMPLE_QR.replace("SBY", "PLG"), "ABC"]
+    df = pd.DataFrame({"qrstring": qr_strings, "tarif": [6200, 4000, 2000]})
+    assert main.edit_data_after_148th_char_tarif_and_crc(df, "qrstring", "tarif") == 0
+    assert df["qrstring"].tolist() == [legacy_edit(q, t) for q, t in zip(qr_strings, [6200, 4000, 2000])]
+    assert not validate_payload(df["qrstring"][0])
+
+
+def test_missing_tarif_is_skipped_not_crashed():
+    # Merchant tanpa aturan tarif: kolom tarif berisi NaN sehingga dtype menjadi float
+    df = pd.DataFrame({"filename": ["a.png", "b.png", "c.png"],
+                       "qrstring": [SAMPLE_QR, SAMPLE_QR, SAMPLE_QR],
+                       "tarif": [6200, None, float("nan")]})
+    assert df["tarif"].dtype == float
+    assert main.edit_data_after_148th_char_tarif_and_crc(df, "qrstring", "tarif") == 2
+    # 6200.0 tetap ditulis "6200", baris tanpa tarif tidak diubah
+    assert df["qrstring"][0] == legacy_edit(SAMPLE_QR, 6200)
+    assert df["qrstring"][1] == SAMPLE_QR
+    assert df["qrstring"][2] == SAMPLE_QR
+    assert "None" not in df["qrstring"][0] and "nan" not in df["qrstring"][0]
+
+
+def test_all_rows_missing_tarif():
+    df = pd.DataFrame({"qrstring": [SAMPLE_QR], "tarif": [None]})
+    assert main.edit_data_after_148th_char_tarif_and_crc(df, "qrstring", "tarif") == 1
+    assert df["qrstring"].tolist() == [SAMPLE_QR]
+
+
+def test_format_tarif():
+    assert main.format_tarif(2000) == "2000"
+    assert main.format_tarif(2000.0) == "2000"
+    assert main.format_tarif("2500") == "2500"
+    assert main.format_tarif(float("nan")) is None
+    assert main.format_tarif(None) is None
+    assert main.format_tarif(pd.NA) is None
+    assert main.format_tarif("") is None
@@ -0,0 +1,104 @@
+##########################################################################
+#Test ModificationPlan dan parse_tlv: harus sama dengan modify_qr_string #
+#lama, termasuk untuk payload rusak (value terpotong, tag ganda)         #
+##########################################################################
+import random
+
+import pandas as pd
+
+import main
+from crc16 import crc16_hex
+from tlv import ModificationPlan
+
+SAMPLE_QR = (
+    "00020101021126690021ID.CO.BANKMANDIRI.WWW01189360000801715058110211717150581170303URE"
+    "51440014ID.CO.QRIS.WWW0215ID20253684458000303URE5204939953033605802ID5923KEMENHUB SBY "
+    "REGULER 016015JAKARTA SELATAN61051285062070703A01630455B1"
+)
+
+MODIFICATIONS = [
+    {"action": "-", "tag": "62"},
+    {"action": "+", "tag": "54", "value": "$tarif"},
+    {"action": "+", "tag": "01", "value": "12"},
+    {"action": "+", "tag": "59", "value": "$nama"},
+]
+
+
+def legacy_parse_tlv(data):
+    # Salinan parse_tlv lama (list, tag ganda tetap ada)
+    parsed_data = []
+    index = 0
+    while index < len(data):
+        tag = data[index:index+2]
+        length = int(data[index+2:index+4])
+        value = data[index+4:index+4+length]
+        parsed_data.append({"tag": tag, "length": length, "value": value})
+        index += 4 + length
+    return parsed_data
+
+
+def legacy_modify_qr_string(qr_string, row, modifications):
+    # Salinan modify_qr_string lama
+    parsed_dict = {item["tag"]: item for item in legacy_parse_tlv(qr_string)}
+    for mod in modifications:
+        if mod["action"] == "-":
+            parsed_dict.pop(mod["tag"], None)
+        elif mod["action"] == "+":
+            value = mod["value"]
+            if value.startswith("$"):
+                column_name = value[1:]
+                if column_name in row:
+                    value = str(row[column_name])
+                else:
+                    continue
+            parsed_dict[mod["tag"]] = {"tag": mod["tag"], "length": len(value), "value": value}
+    modified_qr = "".join(f"{parsed_dict[tag]['tag']}{parsed_dict[tag]['length']:02}{parsed_dict[tag]['value']}"
+                          for tag in sorted(parsed_dict))
+    return modified_qr[:-4] + crc16_hex(modified_qr[:-4].encode("utf-8"))
+
+
+def mutated_payloads(count, seed=7):
+    # Payload dipotong di posisi acak (value terakhir terpotong) atau diberi tag ganda
+    rng = random.Random(seed)
+    payloads = []
+    while len(payloads) < count:
+        qr = SAMPLE_QR
+        if rng.random() < 0.5:
+            qr = qr[:rng.randrange(8, len(qr))]
+        else:
+            cut = 12 + 4 * rng.randrange(2)
+            qr = qr[:cut] + "5802ID" + qr[cut:]
+        try:
+            legacy_parse_tlv(qr)
+        except ValueError:
+            continue  # Header rusak juga gagal di versi lama
+        payloads.append(qr)
+    return payloads
+
+
+def test_parse_tlv_keeps_duplicates_and_declared_length():
+    data = "0102AB0102CD5905XY"
+    assert main.parse_tlv(data) == legacy_parse_tlv(data)
+    assert [item["length"] for item in main.parse_tlv(data)] == [2, 2, 5]
+
+
+def test_plan_matches_legacy_on_valid_payload():
+    plan = ModificationPlan.compile(MODIFICATIONS)
+    row = pd.Series({"tarif": 6200, "nama": "KEMENHUB PLG"})
+    for qr in [SAMPLE_QR, SAMPLE_QR.replace("SBY", "PLG")]:
+        assert plan.apply(qr, row) == legacy_modify_qr_string(qr, row, MODIFICATIONS)
+
+
+def test_plan_matches_legacy_on_malformed_payloads():
+    plan = ModificationPlan.compile(MODIFICATIONS)
+    row = pd.Series({"tarif": 6200, "nama": "KEMENHUB PLG"})
+    for qr in mutated_payloads(500):
+        assert plan.apply(qr, row) == legacy_modify_qr_string(qr, row, MODIFICATIONS), qr
+
+
+def test_missing_column_keeps_original_tag():
+    plan = ModificationPlan.compile(MODIFICATIONS)
+    row = pd.Series({"tarif": 6200})
+    truncated = SAMPLE_QR[:120]
+    for qr in [SAMPLE_QR, truncated]:
+        assert plan.apply(qr, row) == legacy_modify_qr_string(qr, row, MODIFICATIONS)
@@ -0,0 +1,297 @@
+##########################################################################
+#Modul TLV Codec EMVCo (QRIS)                                            #
+##########################################################################
+import re
+import time
+from collections import namedtuple
+from itertools import repeat
+from crc16 import crc16_hex
+
+# Tag template yang isinya berupa TLV bersarang
+TEMPLATE_TAGS = frozenset([f"{tag:02d}" for tag in range(26, 52)] + ["62"])
+CRC_TAG = "63"
+
+TlvItem = namedtuple("TlvItem", ["tag", "length", "value"])
+
+
+def parse_items(data):
+    """
+    Parse string TLV menjadi dict {tag: value} dalam satu kali jalan.
+    Jika ada tag ganda, nilai terakhir yang dipakai (posisi tetap di kemunculan pertama).
+    """
+    items = {}
+    index = 0
+    end = len(data)
+    while index < end:
+        length = int(data[index + 2:index + 4])  # Panjang terdiri dari 2 digit
+        items[data[index:index + 2]] = data[index + 4:index + 4 + length]
+        index += 4 + length
+    return items
+
+
+def parse_declared(data):
+    """
+    Parse string TLV menjadi list TlvItem apa adanya: tag ganda tetap ada dan length
+    adalah panjang yang tertulis di header (bisa lebih besar dari value yang terpotong).
+    """
+    items = []
+    index = 0
+    end = len(data)
+    while index < end:
+        length = int(data[index + 2:index + 4])
+        items.append(TlvItem(data[index:index + 2], length, data[index + 4:index + 4 + length]))
+        index += 4 + length
+    return items
+
+
+def encode_items(items):
+    """Serialisasi pasangan (tag, value) menjadi string TLV sesuai urutan input."""
+    return "".join([f"{tag}{len(value):02}{value}" for tag, value in items])
+
+
+def with_crc(payload):
+    """Ganti 4 digit terakhir (nilai tag 63) dengan CRC dari payload tanpa 4 digit tersebut."""
+    body = payload[:-4]
+    return body + crc16_hex(body.encode("utf-8"))
+
+
+class TlvPayload:
+    """
+    Representasi ringkas hasil parse QR: tuple tag dan tuple value yang sejajar.
+    Template bersarang (tag 26-51 dan 62) di-parse saat dibutuhkan lewat template().
+    """
+    __slots__ = ("tags", "values")
+
+    def __init__(self, tags, values):
+        self.tags = tuple(tags)
+        self.values = tuple(values)
+
+    @classmethod
+    def parse(cls, data):
+        items = parse_items(data)
+        return cls(items.keys(), items.values())
+
+    def __len__(self):
+        return len(self.tags)
+
+    def __iter__(self):
+        for tag, value in zip(self.tags, self.values):
+            yield TlvItem(tag, len(value), value)
+
+    def __contains__(self, tag):
+        return tag in self.tags
+
+    def get(self, tag, default=None):
+        try:
+            return self.values[self.tags.index(tag)]
+        except ValueError:
+            return default
+
+    def template(self, tag):
+        """Parse nilai tag template (26-51, 62) menjadi TlvPayload bersarang."""
+        if tag not in TEMPLATE_TAGS:
+            raise ValueError(f"Tag {tag} bukan template TLV.")
+        value = self.get(tag)
+        return None if value is None else TlvPayload.parse(value)
+
+    def encode(self):
+        return encode_items(zip(self.tags, self.values))
+
+    def to_dict(self):
+        return dict(zip(self.tags, self.values))
+
+
+# Jenis potongan pada _ShapeProgram
+_SLICE, _LITERAL, _COLUMN = 0, 1, 2
+
+
+class _ShapeProgram:
+    """
+    Program hasil kompilasi plan untuk satu "bentuk" payload (urutan tag + panjang).
+    Payload dengan bentuk yang sama cukup dicek dengan satu regex lalu disusun ulang
+    dari potongan string asli, tanpa parse per tag.
+    """
+    __slots__ = ("regex", "pieces")
+
+    def __init__(self, regex, pieces):
+        self.regex = regex
+        self.pieces = pieces
+
+
+class ModificationPlan:
+    """
+    Hasil kompilasi list modifikasi dari read_config_file, dipakai ulang untuk banyak payload.
+    steps mengikuti urutan config, berisi ("-", tag), ("+", tag, value) atau ("$", tag, nama_kolom).
+    """
+    __slots__ = ("steps", "columns", "static_only", "_programs")
+
+    # Batas jumlah bentuk payload yang di-cache per plan
+    MAX_PROGRAMS = 256
+
+    def __init__(self, steps):
+        self.steps = tuple(steps)
+        self.columns = tuple(step[2] for step in self.steps if step[0] == "$")
+        self.static_only = not self.columns
+        self._programs = {}
+
+    @classmethod
+    def compile(cls, modifications):
+        steps = []
+        for mod in modifications:
+            if mod["action"] == "-":
+                steps.append(("-", mod["tag"]))
+            elif mod["action"] == "+":
+                value = mod["value"]
+                if value.startswith("$"):
+                    steps.append(("$", mod["tag"], value[1:]))  # Ambil nama kolom setelah $
+                else:
+                    steps.append(("+", mod["tag"], value))
+        return cls(steps)
+
+    def _compile_shape(self, qr_string):
+        """Membuat _ShapeProgram dari payload, None jika payload tidak bisa dipakai sebagai pola."""
+        spans = []
+        index = 0
+        end = len(qr_string)
+        while index < end:
+            header = qr_string[index:index + 4]
+            try:
+                length = int(header[2:])
+            except ValueError:
+                return None
+            # Hanya header kanonik "TTLL" dengan value lengkap yang bisa disalin apa adanya
+            if header[2:] != f"{length:02}" or index + 4 + length > end:
+                return None
+            spans.append((header[:2], index, index + 4 + length))
+            index += 4 + length
+
+        tags = [tag for tag, _, _ in spans]
+        if len(set(tags)) != len(tags):
+            return None
+
+        # Simulasi plan pada level tag: sumber tiap tag berupa span asli, literal, atau kolom
+        sources = {tag: (_SLICE, start, stop) for tag, start, stop in spans}
+        for step in self.steps:
+            if step[0] == "-":
+                sources.pop(step[1], None)
+            elif step[0] == "+":
+                sources[step[1]] = (_LITERAL, f"{step[1]}{len(step[2]):02}{step[2]}", None)
+            else:
+                sources[step[1]] = (_COLUMN, step[1], step[2])
+
+        pieces = []
+        for tag in sorted(sources):
+            source = sources[tag]
+            # Gabungkan span yang bersebelahan menjadi satu potongan
+            if source[0] == _SLICE and pieces and pieces[-1][0] == _SLICE and pieces[-1][2] == source[1]:
+                pieces[-1] = (_SLICE, pieces[-1][1], source[2])
+            else:
+                pieces.append(source)
+
+        pattern = "".join(f"{re.escape(qr_string[start:start + 4])}.{{{stop - start - 4}}}" for _, start, stop in spans)
+        return _ShapeProgram(re.compile(pattern, re.DOTALL), tuple(pieces))
+
+    def _program_for(self, qr_string):
+        candidates = self._programs.get(len(qr_string))
+        if candidates:
+            for program in candidates:
+                if program.regex.fullmatch(qr_string):
+                    return program
+
+        if sum(len(c) for c in self._programs.values()) >= self.MAX_PROGRAMS:
+            return None
+        program = self._compile_shape(qr_string)
+        if program is not None:
+            self._programs.setdefault(len(qr_string), []).append(program)
+        return program
+
+    def apply(self, qr_string, row=None):
+        """
+        Terapkan plan ke satu QR string lalu hitung ulang CRC.
+
+        :param row: Mapping nama kolom -> nilai (misal baris DataFrame) untuk value "$kolom".
+        """
+        program = self._program_for(qr_string)
+        if program is None:
+            return self._apply_parsed(qr_string, row)
+
+        parts = []
+        for kind, first, second in program.pieces:
+            if kind == _SLICE:
+                parts.append(qr_string[first:second])
+            elif kind == _LITERAL:
+                parts.append(first)
+            elif row is not None and second in row:
+                value = str(row[second])  # Ambil nilai dari kolom
+                parts.append(f"{first}{len(value):02}{value}")
+            else:
+                # Kolom tidak ada: urutan tag bisa berubah, gunakan jalur parse biasa
+                return self._apply_parsed(qr_string, row)
+        return with_crc("".join(parts))
+
+    def _apply_parsed(self, qr_string, row=None):
+        # Jalur payload tidak kanonik (tag ganda, value terpotong, header aneh): sama seperti
+        # modify_qr_string lama, tag ganda terakhir yang dipakai dan tag yang tidak diubah
+        # ditulis ulang dengan panjang dari header aslinya
+        items = {item.tag: item for item in parse_declared(qr_string)}
+        for step in self.steps:
+            action, tag = step[0], step[1]
+            if action == "-":
+                items.pop(tag, None)
+            elif action == "+":
+                items[tag] = TlvItem(tag, len(step[2]), step[2])
+            else:
+                column_name = step[2]
+                if row is not None and column_name in row:
+                    value = str(row[column_name])  # Ambil nilai dari kolom
+                    items[tag] = TlvItem(tag, len(value), value)
+                else:
+                    print(f"Peringatan: Kolom '{column_name}' tidak ditemukan dalam file Excel.")
+
+        return with_crc("".join([f"{tag}{items[tag].length:02}{items[tag].value}" for tag in sorted(items)]))
+
+    def apply_many(self, qr_strings, rows=None):
+        """Terapkan plan ke banyak QR string; rows (opsional) sejajar dengan qr_strings."""
+        if rows is None:
+            return [self.apply(qr_string) for qr_string in qr_strings]
+        return [self.apply(qr_string, row) for qr_string, row in zip(qr_strings, rows)]
+
+    def apply_columns(self, qr_strings, column_values, timings=None):
+        """
+        Terapkan plan ke banyak QR string dengan nilai "$kolom" yang sudah di-resolve per kolom.
+
+        :param column_values: dict nama kolom -> list nilai string, sejajar dengan qr_strings.
+        :param timings: List opsional, diisi latency (detik) per QR string untuk metrics.
+        """
+        if self.static_only:
+            if timings is None:
+                return self.apply_many(qr_strings)
+            rows = repeat(None)
+        else:
+            names = tuple(column_values)
+            rows = (dict(zip(names, values)) for values in zip(*column_values.values()))
+        if timings is None:
+            return [self.apply(qr_string, row) for qr_string, row in zip(qr_strings, rows)]
+
+        modified = []
+        clock = time.perf_counter
+        for qr_string, row in zip(qr_strings, rows):
+            start = clock()
+            modified.append(self.apply(qr_string, row))
+            timings.append(clock() - start)
+        return modified
+
+    def without_columns(self, columns):
+        """Plan baru tanpa langkah "$kolom" untuk kolom yang tidak tersedia (sama seperti dilewati)."""
+        columns = set(columns)
+        return ModificationPlan(step for step in self.steps if not (step[0] == "$" and step[2] in columns))
+
+
+def apply_plan_chunk(task):
+    """
+    Task untuk process pool: task berisi (steps, qr_strings, column_values).
+    Mengembalikan (list QR hasil, list latency per QR) agar metrics dicatat di proses induk.
+    """
+    steps, qr_strings, column_values = task
+    timings = []
+    return ModificationPlan(steps).apply_columns(qr_strings, column_values, timings), timings